@@ -0,0 +1,71 @@
+"""
+Compare the size and decode speed of JSON and binary replay logs.
+
+All fixtures are concatenated (repeated a number of times) into one log,
+which is then written as a JSON list, as NDJSON and as a binary log.
+
+Usage::
+
+    python -m benchmarks.binlog [repeat]
+"""
+import glob
+import io
+import json
+import os
+import sys
+import time
+
+from cacofonisk.binlog import BinlogReader, BinlogWriter
+from cacofonisk.runners.file_runner import iter_json_array, iter_ndjson
+
+FIXTURES = os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'fixtures', '**', '*.json')
+
+
+def load_events(repeat):
+    events = []
+    for filename in sorted(glob.glob(FIXTURES)):
+        with open(filename) as f:
+            events.extend(json.load(f))
+    return events * repeat
+
+
+def timed(decode, data):
+    start = time.perf_counter()
+    count = sum(1 for _ in decode(data))
+    return count, time.perf_counter() - start
+
+
+def main(repeat=20):
+    events = load_events(repeat)
+
+    json_data = json.dumps(events).encode('utf-8')
+    ndjson_data = '\n'.join(json.dumps(event) for event in events).encode(
+        'utf-8')
+    binlog_file = io.BytesIO()
+    writer = BinlogWriter(binlog_file)
+    for event in events:
+        writer.write(event)
+    binlog_data = binlog_file.getvalue()
+
+    formats = (
+        ('json', json_data, lambda data: iter_json_array(
+            io.TextIOWrapper(io.BytesIO(data)))),
+        ('ndjson', ndjson_data, lambda data: iter_ndjson(
+            io.TextIOWrapper(io.BytesIO(data)))),
+        ('binlog', binlog_data, lambda data: BinlogReader(io.BytesIO(data))),
+    )
+
+    print('{} events'.format(len(events)))
+    print('{:8} {:>12} {:>8} {:>12}'.format(
+        'format', 'bytes', 'ratio', 'events/s'))
+
+    for name, data, decode in formats:
+        count, duration = timed(decode, data)
+        assert count == len(events)
+        print('{:8} {:>12} {:>8.2f} {:>12.0f}'.format(
+            name, len(data), len(data) / len(json_data), count / duration))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
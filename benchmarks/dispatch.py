@@ -0,0 +1,75 @@
+"""
+Measure the per-event overhead of looking up the handler of an event.
+
+Compares building the handler dict for every event (as on_event used to do
+by calling event_handlers()) with a lookup in the dispatch table, and shows
+the throughput of EventHandler.on_event (filtering in the loop, like the
+runners used to) and EventHandler.on_events over all fixtures.
+
+Usage::
+
+    python -m benchmarks.dispatch [repeat]
+"""
+import glob
+import json
+import logging
+import os
+import sys
+import time
+
+from cacofonisk import BaseReporter, EventHandler
+
+FIXTURES = os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'fixtures', '**', '*.json')
+
+
+def load_events(repeat):
+    events = []
+    for filename in sorted(glob.glob(FIXTURES)):
+        with open(filename) as f:
+            events.extend(json.load(f))
+    return events * repeat
+
+
+def per_event(lookup, names):
+    start = time.perf_counter()
+    for name in names:
+        lookup(name)
+    return (time.perf_counter() - start) / len(names) * 1e9
+
+
+def replay(events):
+    start = time.perf_counter()
+    handler = EventHandler(BaseReporter())
+    interesting_events = handler.event_handlers().keys()
+    for event in events:
+        if event['Event'] in interesting_events:
+            handler.on_event(event)
+    return len(events) / (time.perf_counter() - start)
+
+
+def replay_batch(events):
+    start = time.perf_counter()
+    EventHandler(BaseReporter()).on_events(events)
+    return len(events) / (time.perf_counter() - start)
+
+
+def main(repeat=20):
+    # Replaying all fixtures as one log makes the handler warn a lot.
+    logging.disable(logging.CRITICAL)
+
+    events = load_events(repeat)
+    names = [event['Event'] for event in events]
+    dispatch = EventHandler.get_dispatch()
+
+    print('{} events'.format(len(events)))
+    print('rebuilt dict:   {:8.1f} ns/event'.format(per_event(
+        lambda name: EventHandler.event_handlers().get(name), names)))
+    print('dispatch table: {:8.1f} ns/event'.format(per_event(
+        dispatch.get, names)))
+    print('on_event:       {:8.0f} events/s'.format(replay(events)))
+    print('on_events:      {:8.0f} events/s'.format(replay_batch(events)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,161 @@
+"""
+Measure the cost of a call which is forwarded through a chain of Locals.
+
+Builds a synthetic call where the caller dials a Local channel, which dials
+the next Local channel and so on, until the last one dials a phone. The
+phone rings and answers, after which every hop is put in a bridge. This is
+what long follow-me or forwarding chains look like.
+
+Reports the time per hop for the whole call and for finding the dialing
+channel of the phone with an empty cache. Nothing recurses, so chains may
+be as long as MAX_TRAVERSAL_DEPTH in cacofonisk.channel.
+
+Usage::
+
+    python -m benchmarks.localchain [hops ...]
+"""
+import logging
+import sys
+import time
+
+from cacofonisk import BaseReporter, EventHandler
+
+from benchmarks.ringgroup import dial, hangup, new_channel, new_state
+
+
+def bridge_event(event_name, bridge, channel=None):
+    event = {
+        'Event': event_name,
+        'BridgeUniqueid': '{:08x}-0000-0000-0000-000000000000'.format(bridge),
+        'BridgeType': 'basic',
+        'BridgeTechnology': 'simple_bridge',
+        'BridgeCreator': '<unknown>',
+        'BridgeVideoSourceMode': 'none',
+    }
+    if channel:
+        event['Channel'] = channel['Channel']
+        event['Uniqueid'] = channel['Uniqueid']
+    return event
+
+
+def local_chain(hops):
+    """
+    Create the events of a call through a chain of Local channels.
+
+    Args:
+        hops (int): The number of Local channel pairs.
+
+    Returns:
+        list: The events of the call.
+    """
+    caller = new_channel('SIP/150010001-00000000', '195176c06ab8-1529936170.0',
+                         state='4')
+    events = [caller]
+    # The channels which are bridged together, per hop.
+    pairs = []
+    last = caller
+
+    for number in range(hops):
+        local = 'Local/ID{}@osvpi_route_phoneaccount-{:08x}'.format(
+            number, number)
+        local_one = new_channel(
+            local + ';1', '195176c06ab8-1529936170.{}'.format(2 * number + 1))
+        local_two = new_channel(
+            local + ';2', '195176c06ab8-1529936170.{}'.format(2 * number + 2),
+            state='4')
+
+        events.extend([
+            local_one,
+            local_two,
+            {
+                'Event': 'LocalBridge',
+                'LocalOneUniqueid': local_one['Uniqueid'],
+                'LocalTwoUniqueid': local_two['Uniqueid'],
+            },
+            dial('DialBegin', last, local_one),
+        ])
+        pairs.append((last, local_one))
+        last = local_two
+
+    phone = new_channel('SIP/150010002-00000001',
+                        '195176c06ab8-1529936170.{}'.format(2 * hops + 1))
+    events.extend([
+        phone,
+        dial('DialBegin', last, phone),
+        new_state(phone, '5'),
+        new_state(phone, '6'),
+        dial('DialEnd', last, phone, 'ANSWER'),
+    ])
+    pairs.append((last, phone))
+
+    for a_chan, b_chan in reversed(pairs[:-1]):
+        events.append(dial('DialEnd', a_chan, b_chan, 'ANSWER'))
+
+    for number, (a_chan, b_chan) in enumerate(pairs):
+        events.extend([
+            bridge_event('BridgeCreate', number),
+            bridge_event('BridgeEnter', number, a_chan),
+            bridge_event('BridgeEnter', number, b_chan),
+        ])
+
+    for number, (a_chan, b_chan) in enumerate(pairs):
+        events.extend([
+            bridge_event('BridgeLeave', number, a_chan),
+            bridge_event('BridgeLeave', number, b_chan),
+            bridge_event('BridgeDestroy', number),
+            hangup(a_chan),
+            hangup(b_chan),
+        ])
+
+    return events
+
+
+def measure(hops, repeat, rounds=5):
+    events = local_chain(hops)
+    # Stop right after the phone was dialed.
+    dialed = next(
+        index for index, event in enumerate(events)
+        if event['Event'] == 'DialBegin' and
+        event['DestUniqueid'] == events[-1]['Uniqueid']) + 1
+    call_time = lookup_time = None
+
+    # Take the best of a few rounds to keep the noise down.
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            EventHandler(BaseReporter()).on_events(events)
+        elapsed = (time.perf_counter() - start) / repeat / hops * 1e6
+        call_time = elapsed if call_time is None else min(call_time, elapsed)
+
+        handler = EventHandler(BaseReporter())
+        handler.on_events(events[:dialed])
+        phone = handler._channels[events[-1]['Uniqueid']]
+        channels = list(handler._channels.values())
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for channel in channels:
+                channel._dialing_channel = None
+            phone.get_dialing_channel()
+        elapsed = (time.perf_counter() - start) / repeat / hops * 1e9
+        lookup_time = (
+            elapsed if lookup_time is None else min(lookup_time, elapsed))
+
+    return call_time, lookup_time, handler.anomalies
+
+
+def main(*hops):
+    # The synthetic Local channels never get an extension, which the
+    # handler logs.
+    logging.disable(logging.CRITICAL)
+
+    for count in hops or (10, 50, 200):
+        call_time, lookup_time, anomalies = measure(
+            count, max(1, 500 // count))
+        print('{:4d} hops: {:6.1f} us/hop per call, {:6.1f} ns/hop per '
+              'uncached get_dialing_channel(), anomalies: {}'.format(
+                  count, call_time, lookup_time, dict(anomalies)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,77 @@
+"""
+Measure the memory used per tracked channel and bridge.
+
+Feeds Newchannel and BridgeCreate events for a number of synthetic calls to
+an EventHandler and reports the traced heap growth per channel and bridge.
+
+Usage::
+
+    python -m benchmarks.memory [channels]
+"""
+import sys
+import tracemalloc
+
+from cacofonisk import BaseReporter, EventHandler
+
+
+def new_channel(number):
+    uniqueid = '195176c06ab8-1529936170.{}'.format(number)
+    return {
+        'Event': 'Newchannel',
+        'Privilege': 'call,all',
+        'Channel': 'SIP/1500100{:02d}-{:08x}'.format(number % 100, number),
+        'ChannelState': '0',
+        'ChannelStateDesc': 'Down',
+        'CallerIDNum': '2{:02d}'.format(number % 100),
+        'CallerIDName': 'Andrew Garza',
+        'ConnectedLineNum': '<unknown>',
+        'ConnectedLineName': '<unknown>',
+        'Language': 'en',
+        'AccountCode': '15001',
+        'Context': 'osvpi_account',
+        'Exten': '202',
+        'Priority': '1',
+        'Uniqueid': uniqueid,
+        'Linkedid': uniqueid,
+    }
+
+
+def bridge_create(number):
+    return {
+        'Event': 'BridgeCreate',
+        'BridgeUniqueid': '{:08x}-0000-0000-0000-000000000000'.format(number),
+        'BridgeType': 'basic',
+        'BridgeTechnology': 'simple_bridge',
+        'BridgeCreator': '<unknown>',
+        'BridgeName': '<unknown>',
+        'BridgeNumChannels': '0',
+        'BridgeVideoSourceMode': 'none',
+    }
+
+
+def measure(handler, events):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    handler.on_events(events)
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before) / len(events)
+
+
+def main(count=20000):
+    handler = EventHandler(BaseReporter())
+
+    # Create the events up front, so only the tracked state is measured.
+    channels = [new_channel(number) for number in range(count)]
+    bridges = [bridge_create(number) for number in range(count // 2)]
+
+    print('{} channels, {} bridges'.format(len(channels), len(bridges)))
+    print('bytes per channel: {:8.0f}'.format(measure(handler, channels)))
+    print('bytes per bridge:  {:8.0f}'.format(measure(handler, bridges)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
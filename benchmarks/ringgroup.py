@@ -0,0 +1,173 @@
+"""
+Measure the cost of a ring group call as the number of targets grows.
+
+Builds a synthetic call like the ab_callgroup fixture: the caller dials a
+Local channel per target, each Local channel dials one phone, all phones
+ring, the first one answers and the others are cancelled. Reports the best
+time per target for the whole call over a few rounds, which stays flat when
+ring group setup and teardown are linear.
+
+Usage::
+
+    python -m benchmarks.ringgroup [targets ...]
+"""
+import logging
+import sys
+import time
+
+from cacofonisk import BaseReporter, EventHandler
+
+LINKEDID = '195176c06ab8-1529936170.0'
+
+
+def new_channel(name, uniqueid, state='0', exten='202'):
+    return {
+        'Event': 'Newchannel',
+        'Channel': name,
+        'ChannelState': state,
+        'CallerIDNum': '201',
+        'CallerIDName': 'Andrew Garza',
+        'ConnectedLineNum': '<unknown>',
+        'ConnectedLineName': '<unknown>',
+        'AccountCode': '15001',
+        'Exten': exten,
+        'Uniqueid': uniqueid,
+        'Linkedid': LINKEDID,
+    }
+
+
+def new_state(channel, state):
+    return {
+        'Event': 'Newstate',
+        'Channel': channel['Channel'],
+        'ChannelState': state,
+        'CallerIDNum': channel['CallerIDNum'],
+        'CallerIDName': channel['CallerIDName'],
+        'ConnectedLineNum': '<unknown>',
+        'ConnectedLineName': '<unknown>',
+        'AccountCode': '15001',
+        'Exten': channel['Exten'],
+        'Uniqueid': channel['Uniqueid'],
+        'Linkedid': LINKEDID,
+    }
+
+
+def dial(event_name, source, destination, status=None):
+    event = {
+        'Event': event_name,
+        'Uniqueid': source['Uniqueid'],
+        'DestUniqueid': destination['Uniqueid'],
+    }
+    if status:
+        event['DialStatus'] = status
+    return event
+
+
+def hangup(channel, cause='16'):
+    return {
+        'Event': 'Hangup',
+        'Channel': channel['Channel'],
+        'Uniqueid': channel['Uniqueid'],
+        'Linkedid': LINKEDID,
+        'Cause': cause,
+    }
+
+
+def ring_group(targets):
+    """
+    Create the events of a ring group call to a number of targets.
+
+    Args:
+        targets (int): The number of phones in the ring group.
+
+    Returns:
+        list: The events of the call.
+    """
+    caller = new_channel('SIP/150010001-00000000', LINKEDID, state='4')
+    events = [caller]
+    legs = []
+
+    for number in range(targets):
+        local = 'Local/ID{}@osvpi_route_phoneaccount-{:08x}'.format(
+            number, number)
+        uniqueid = '195176c06ab8-1529936170.{}'.format(3 * number + 1)
+        local_one = new_channel(local + ';1', uniqueid)
+        uniqueid = '195176c06ab8-1529936170.{}'.format(3 * number + 2)
+        local_two = new_channel(local + ';2', uniqueid, state='4')
+        uniqueid = '195176c06ab8-1529936170.{}'.format(3 * number + 3)
+        phone = new_channel(
+            'SIP/1500100{:02d}-{:08x}'.format(number % 100, number),
+            uniqueid)
+
+        events.extend([
+            local_one,
+            local_two,
+            {
+                'Event': 'LocalBridge',
+                'LocalOneUniqueid': local_one['Uniqueid'],
+                'LocalTwoUniqueid': local_two['Uniqueid'],
+            },
+            dial('DialBegin', caller, local_one),
+            phone,
+            dial('DialBegin', local_two, phone),
+        ])
+        legs.append((local_one, local_two, phone))
+
+    for local_one, local_two, phone in legs:
+        events.append(new_state(phone, '5'))
+
+    # The first phone answers, the others are cancelled.
+    local_one, local_two, phone = legs[0]
+    events.extend([
+        new_state(phone, '6'),
+        dial('DialEnd', local_two, phone, 'ANSWER'),
+    ])
+
+    for local_one, local_two, phone in legs[1:]:
+        events.extend([
+            dial('DialEnd', caller, local_one, 'CANCEL'),
+            dial('DialEnd', local_two, phone, 'CANCEL'),
+            hangup(phone),
+            hangup(local_one),
+            hangup(local_two),
+        ])
+
+    local_one, local_two, phone = legs[0]
+    events.extend([
+        dial('DialEnd', caller, local_one, 'ANSWER'),
+        hangup(phone),
+        hangup(local_one),
+        hangup(local_two),
+        hangup(caller),
+    ])
+
+    return events
+
+
+def measure(targets, repeat, rounds=5):
+    events = ring_group(targets)
+    best = None
+
+    # Take the best of a few rounds to keep the noise down.
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            EventHandler(BaseReporter()).on_events(events)
+        elapsed = (time.perf_counter() - start) / repeat / targets * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main(*targets):
+    # The synthetic calls never enter a bridge, which the handler warns
+    # about on hangup.
+    logging.disable(logging.CRITICAL)
+
+    for count in targets or (10, 100, 500):
+        print('{:4d} targets: {:8.1f} us/target'.format(
+            count, measure(count, max(1, 2000 // count))))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
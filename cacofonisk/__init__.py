@@ -1,4 +1,4 @@
-from .handlers import EventHandler
+from .handlers import EventHandler, handles
 from .reporters import BaseReporter, LoggingReporter
 from .runners.ami_runner import AmiRunner
 from .runners.file_runner import FileRunner
@@ -0,0 +1,254 @@
+"""
+A compact binary format for AMI event replay logs.
+
+JSON replay logs repeat the same keys in every event, and most events repeat
+the channel fields (Channel, Linkedid, CallerIDNum, ...) which were already
+sent for the same Uniqueid. The binary log avoids both:
+
+* The key set of an event is interned in a shape table. An event only refers
+  to the index of its shape.
+* Channel fields which did not change since the previous event of the same
+  Uniqueid are left out and restored from the channel state when decoding.
+
+A log starts with ``MAGIC``, followed by length-prefixed records. Every
+record starts with a one byte type and a four byte little endian length:
+
+* ``S`` defines the next shape: a JSON list with the explicit keys, the keys
+  restored from the channel state and the keys holding JSON encoded values.
+* ``E`` is an event: a four byte shape index followed by the UTF-8 encoded
+  values of the explicit keys, separated by NUL characters.
+
+Use the BinlogReporter to record AMI events in this format, and pass a
+``.binlog`` file to the FileRunner to replay them.
+"""
+import json
+import struct
+
+from .reporters import BaseReporter
+
+MAGIC = b'CACOBIN\x01'
+
+BINLOG_EXTENSION = '.binlog'
+
+# The channel fields which are sent with every event about a channel.
+CHANNEL_FIELDS = frozenset((
+    'AccountCode', 'CallerIDName', 'CallerIDNum', 'Channel', 'ChannelState',
+    'ChannelStateDesc', 'ConnectedLineName', 'ConnectedLineNum', 'Context',
+    'Exten', 'Language', 'Linkedid', 'Priority',
+))
+
+RECORD_SHAPE = b'S'
+RECORD_EVENT = b'E'
+
+_header = struct.Struct('<cI')
+_shape_index = struct.Struct('<I')
+
+# The number of bytes read at once when decoding a binary log.
+CHUNK_SIZE = 64 * 1024
+
+
+class BinlogError(ValueError):
+    pass
+
+
+class BinlogWriter(object):
+    """
+    Encode AMI events to a binary log.
+    """
+
+    def __init__(self, f):
+        """
+        Create a writer and write the file header.
+
+        Args:
+            f (file): A file opened for writing bytes.
+        """
+        self._file = f
+        self._shapes = {}
+        self._channels = {}
+
+        self._file.write(MAGIC)
+
+    def write(self, event):
+        """
+        Append an event to the log.
+
+        Args:
+            event (dict): Dict-like object with all attributes in the event.
+        """
+        uniqueid = event.get('Uniqueid')
+        state = self._channels.get(uniqueid) if uniqueid else None
+
+        explicit = []
+        inherited = []
+        json_keys = []
+        values = []
+
+        for key, value in event.items():
+            if (
+                    state is not None and
+                    key in CHANNEL_FIELDS and
+                    key in state and
+                    state[key] == value
+            ):
+                inherited.append(key)
+                continue
+
+            explicit.append(key)
+
+            if type(value) is not str or '\0' in value:
+                json_keys.append(key)
+                value = json.dumps(value)
+
+            values.append(value)
+
+        shape = (tuple(explicit), tuple(inherited), tuple(json_keys))
+        index = self._shapes.get(shape)
+
+        if index is None:
+            index = self._shapes[shape] = len(self._shapes)
+            payload = json.dumps(shape).encode('utf-8')
+            self._file.write(_header.pack(RECORD_SHAPE, len(payload)))
+            self._file.write(payload)
+
+        payload = '\0'.join(values).encode('utf-8')
+        self._file.write(_header.pack(
+            RECORD_EVENT, _shape_index.size + len(payload)))
+        self._file.write(_shape_index.pack(index))
+        self._file.write(payload)
+
+        _update_channel_state(self._channels, event)
+
+
+class BinlogReader(object):
+    """
+    Decode AMI events from a binary log.
+
+    Iterating over a reader yields the events as dicts.
+    """
+
+    def __init__(self, f):
+        """
+        Create a reader and check the file header.
+
+        Args:
+            f (file): A file opened for reading bytes.
+
+        Raises:
+            BinlogError: If the file is not a binary log.
+        """
+        self._file = f
+
+        if f.read(len(MAGIC)) != MAGIC:
+            raise BinlogError('Not a cacofonisk binary log')
+
+    def __iter__(self):
+        shapes = []
+        channels = {}
+        buf = b''
+        pos = 0
+        header_size = _header.size
+
+        while True:
+            chunk = self._file.read(CHUNK_SIZE)
+            if not chunk:
+                if pos != len(buf):
+                    raise BinlogError('Unexpected end of binary log')
+                return
+
+            buf = buf[pos:] + chunk
+            pos = 0
+            end = len(buf)
+
+            while pos + header_size <= end:
+                record_type, length = _header.unpack_from(buf, pos)
+                start = pos + header_size
+
+                if start + length > end:
+                    break
+
+                pos = start + length
+
+                if record_type == RECORD_EVENT:
+                    (index,) = _shape_index.unpack_from(buf, start)
+                    keys, inherited, json_keys = shapes[index]
+                    values = buf[start + _shape_index.size:pos].decode(
+                        'utf-8').split('\0')
+
+                    event = dict(zip(keys, values))
+
+                    for key in json_keys:
+                        event[key] = json.loads(event[key])
+
+                    if inherited:
+                        state = channels[event['Uniqueid']]
+                        for key in inherited:
+                            event[key] = state[key]
+
+                    _update_channel_state(channels, event)
+
+                    yield event
+                elif record_type == RECORD_SHAPE:
+                    keys, inherited, json_keys = json.loads(
+                        buf[start:pos].decode('utf-8'))
+                    shapes.append((tuple(keys), tuple(inherited),
+                                   tuple(json_keys)))
+                else:
+                    raise BinlogError(
+                        'Unknown record type {!r}'.format(record_type))
+
+
+def _update_channel_state(channels, event):
+    """
+    Remember the channel fields of an event, for use in later events.
+
+    The writer and reader both call this after every event, so they always
+    agree on the channel state.
+
+    Args:
+        channels (dict): The channel states by Uniqueid.
+        event (dict): The event which was just encoded or decoded.
+    """
+    uniqueid = event.get('Uniqueid')
+    if not uniqueid:
+        return
+
+    if event.get('Event') == 'Hangup':
+        # No more events are expected for this channel.
+        channels.pop(uniqueid, None)
+        return
+
+    state = channels.get(uniqueid)
+    if state is None:
+        state = channels[uniqueid] = {}
+
+    for key in CHANNEL_FIELDS.intersection(event):
+        state[key] = event[key]
+
+
+class BinlogReporter(BaseReporter):
+    """
+    Record all AMI events to a binary log.
+    """
+
+    def __init__(self, filename):
+        """
+        Create a reporter which writes to the given file.
+
+        Args:
+            filename (str): The name of the file to write.
+        """
+        self._file = open(filename, 'wb')
+        self._writer = BinlogWriter(self._file)
+
+    def on_event(self, event):
+        """
+        Append the AMI event to the binary log.
+
+        Args:
+            event (Message): Dict-like object with all attributes in the event.
+        """
+        self._writer.write(event)
+
+    def close(self):
+        self._file.close()
@@ -1,3 +1,6 @@
+from .events import BridgeCreate
+
+
 class MissingBridgeUniqueid(KeyError):
     pass
 
@@ -10,21 +13,32 @@ class Bridge(object):
     make audio flow between the channels. This class is a Python representation
     of such bridges.
     """
+    __slots__ = (
+        'uniqueid', 'type', 'technology', 'creator', 'video_source_mode',
+        'peers', 'component',
+    )
 
     def __init__(self, event):
         """
         Create a new bridge object.
 
         Args:
-            event (Event): A BridgeCreate event.
+            event (BridgeCreate): A BridgeCreate event, or a dict with its
+                attributes.
         """
-        self.uniqueid = event['BridgeUniqueid']
-        self.type = event['BridgeType']
-        self.technology = event['BridgeTechnology']
-        self.creator = event['BridgeCreator']
-        self.video_source_mode = event['BridgeVideoSourceMode']
+        if not isinstance(event, BridgeCreate):
+            event = BridgeCreate.from_dict(event)
+
+        self.uniqueid = event.bridge_uniqueid
+        self.type = event.bridge_type
+        self.technology = event.bridge_technology
+        self.creator = event.bridge_creator
+        self.video_source_mode = event.bridge_video_source_mode
 
         self.peers = set()
+        # The BridgeComponent of this bridge, or None as long as it is not
+        # linked to other bridges by Local channels.
+        self.component = None
 
     def __len__(self):
         """
@@ -47,6 +61,220 @@ class Bridge(object):
             peers=','.join([chan.name for chan in self.peers]),
         )
 
+    def add_peer(self, channel):
+        """
+        Add a channel which enters this bridge.
+
+        Args:
+            channel (Channel): The channel entering the bridge.
+        """
+        self.peers.add(channel)
+        channel.bridge = self
+
+        if not channel.is_local:
+            if self.component is not None:
+                self.component.members[channel] = None
+            return
+
+        other = channel.fwd_local_bridge or channel.back_local_bridge
+        if other is not None and other.bridge is not None:
+            self.link(other.bridge)
+
+    def remove_peer(self, channel):
+        """
+        Remove a channel which leaves this bridge.
+
+        Args:
+            channel (Channel): The channel leaving the bridge.
+        """
+        self.peers.discard(channel)
+        channel.bridge = None
+
+        if not channel.is_local:
+            if self.component is not None:
+                self.component.members.pop(channel, None)
+            return
+
+        other = channel.fwd_local_bridge or channel.back_local_bridge
+        if other is not None and other.bridge is not None:
+            self.unlink(other.bridge)
+
+    def link(self, other):
+        """
+        Merge the components of two bridges linked by a Local channel.
+
+        Args:
+            other (Bridge): The bridge of the other Local semi.
+        """
+        if other is self:
+            return
+
+        component = self.component or BridgeComponent([self])
+        component.merge(other.component or BridgeComponent([other]))
+
+    def unlink(self, other):
+        """
+        Split the components of two bridges after a link was removed.
+
+        Args:
+            other (Bridge): The bridge of the other Local semi.
+        """
+        if self.component is not None:
+            self.component.unlink(self, other)
+
+    def get_members(self):
+        """
+        Get the non-Local channels in this bridge and the linked bridges.
+
+        Returns:
+            iterable: The non-Local channels.
+        """
+        if self.component is not None:
+            return self.component.members
+
+        return [peer for peer in self.peers if not peer.is_local]
+
+    def get_linked_bridges(self):
+        """
+        Get the bridges linked to this bridge through Local channels.
+
+        Returns:
+            list: The bridges of the other semis of the Local channels in
+                this bridge.
+        """
+        bridges = []
+
+        for peer in self.peers:
+            if peer.is_local:
+                other = peer.fwd_local_bridge or peer.back_local_bridge
+                if other is not None and other.bridge is not None:
+                    bridges.append(other.bridge)
+
+        return bridges
+
+
+class BridgeComponent(object):
+    """
+    A BridgeComponent holds the bridges which are linked by Local channels.
+
+    Audio flows between all channels in the bridges of a component, through
+    one or more pairs of Local channels. The component keeps the non-Local
+    channels of its bridges, so they can be found without walking the
+    bridges and local bridges.
+
+    Components are merged when a Local channel links two bridges, and split
+    again when such a link is removed because a channel leaves a bridge or
+    a local bridge is removed. A bridge which is not linked to any other
+    bridge has no component.
+    """
+    __slots__ = ('bridges', 'members')
+
+    def __init__(self, bridges):
+        """
+        Create a component of bridges which are linked.
+
+        Args:
+            bridges (iterable): The bridges of the component.
+        """
+        self.bridges = set(bridges)
+        # The non-Local channels in the bridges, as an ordered set.
+        self.members = {}
+
+        for bridge in self.bridges:
+            bridge.component = self
+
+            for peer in bridge.peers:
+                if not peer.is_local:
+                    self.members[peer] = None
+
+    def __repr__(self):
+        return '<BridgeComponent(bridges={bridges},members={members})>'.format(
+            bridges=','.join([bridge.uniqueid for bridge in self.bridges]),
+            members=','.join([chan.name for chan in self.members]),
+        )
+
+    def merge(self, other):
+        """
+        Merge two components which were linked by a Local channel.
+
+        The smaller component is merged into the larger one.
+
+        Args:
+            other (BridgeComponent): The other component.
+
+        Returns:
+            BridgeComponent: The merged component.
+        """
+        if other is self:
+            return self
+
+        if len(other.bridges) > len(self.bridges):
+            return other.merge(self)
+
+        for bridge in other.bridges:
+            bridge.component = self
+
+        self.bridges.update(other.bridges)
+        self.members.update(other.members)
+
+        return self
+
+    def unlink(self, bridge, other):
+        """
+        Split the component after a link between two bridges was removed.
+
+        Both bridges are searched in turns. If the searches meet, the
+        bridges are still linked some other way. If not, the search which
+        runs out first has found the bridges to split off. This way the
+        cost is that of the smaller part, not of the whole component.
+
+        Args:
+            bridge (Bridge): The bridge on one side of the removed link.
+            other (Bridge): The bridge on the other side of the link.
+        """
+        if bridge is other or other.component is not self:
+            return
+
+        searches = [([bridge], {bridge}), ([other], {other})]
+
+        while True:
+            for stack, seen in searches:
+                if not stack:
+                    self._split_off(seen)
+                    return
+
+                for linked in stack.pop().get_linked_bridges():
+                    if linked in seen:
+                        continue
+                    if any(linked in found for _, found in searches):
+                        # Both sides are still linked.
+                        return
+                    seen.add(linked)
+                    stack.append(linked)
+
+    def _split_off(self, bridges):
+        """
+        Move bridges which are no longer linked to a new component.
+
+        Args:
+            bridges (set): The bridges to move.
+        """
+        self.bridges -= bridges
+        for bridge in bridges:
+            for peer in bridge.peers:
+                self.members.pop(peer, None)
+
+        if len(bridges) > 1:
+            BridgeComponent(bridges)
+        else:
+            for bridge in bridges:
+                bridge.component = None
+
+        # A bridge which is left on its own needs no component either.
+        if len(self.bridges) == 1:
+            for bridge in self.bridges:
+                bridge.component = None
+
 
 class BridgeDict(dict):
     """
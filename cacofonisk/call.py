@@ -0,0 +1,145 @@
+class Call(object):
+    """
+    A Call holds all channels which share a Linkedid.
+
+    The EventHandler creates a Call when the first channel of a call is
+    created, and removes it as soon as the last channel of the call hangs up.
+    Channels are part of the call of the Linkedid they were created with.
+
+    The bridges of a call are the bridges which contain at least one of its
+    channels.
+    """
+    __slots__ = ('linkedid', 'start', '_channels', '_bridges')
+
+    def __init__(self, linkedid, start):
+        """
+        Create a new call.
+
+        Args:
+            linkedid (str): The Linkedid of the channels of the call.
+            start (float): The Unix timestamp of the first channel.
+        """
+        self.linkedid = linkedid
+        self.start = start
+
+        # The channels of the call by Uniqueid, oldest first. Most calls
+        # only ever have one channel, which is kept as it is until a second
+        # channel joins.
+        self._channels = None
+        # The number of channels of the call in each bridge, created when
+        # a channel first enters a bridge.
+        self._bridges = None
+
+    def __len__(self):
+        """
+        Get the number of channels in this call.
+
+        Returns:
+            int: The number of channels in this call.
+        """
+        channels = self._channels
+        if channels is None:
+            return 0
+        if type(channels) is dict:
+            return len(channels)
+        return 1
+
+    def __repr__(self):
+        return '<Call(linkedid={self.linkedid},channels={channels})>'.format(
+            self=self,
+            channels=','.join(self.channels),
+        )
+
+    @property
+    def channels(self):
+        """
+        Get the channels of this call.
+
+        Returns:
+            dict: The channels by Uniqueid, oldest first. Do not change it.
+        """
+        channels = self._channels
+        if channels is None:
+            return {}
+        if type(channels) is dict:
+            return channels
+        return {channels.uniqueid: channels}
+
+    @property
+    def bridges(self):
+        """
+        Get the bridges which contain channels of this call.
+
+        Returns:
+            KeysView: The bridges.
+        """
+        return (self._bridges or {}).keys()
+
+    def add_channel(self, channel):
+        """
+        Add a new channel to the call.
+
+        Args:
+            channel (Channel): The channel.
+        """
+        channels = self._channels
+        if channels is None:
+            self._channels = channel
+        elif type(channels) is dict:
+            channels[channel.uniqueid] = channel
+        else:
+            self._channels = {
+                channels.uniqueid: channels, channel.uniqueid: channel}
+
+        if channel.bridge is not None:
+            self.enter_bridge(channel.bridge)
+
+    def remove_channel(self, channel):
+        """
+        Remove a channel which is hung up from the call.
+
+        Args:
+            channel (Channel): The channel.
+        """
+        channels = self._channels
+        if type(channels) is dict:
+            del channels[channel.uniqueid]
+            if not channels:
+                self._channels = None
+        elif channels is channel:
+            self._channels = None
+        else:
+            raise KeyError(channel.uniqueid)
+
+        if channel.bridge is not None:
+            self.leave_bridge(channel.bridge)
+
+    def enter_bridge(self, bridge):
+        """
+        Register that a channel of this call entered a bridge.
+
+        Args:
+            bridge (Bridge): The bridge.
+        """
+        if self._bridges is None:
+            self._bridges = {}
+        self._bridges[bridge] = self._bridges.get(bridge, 0) + 1
+
+    def leave_bridge(self, bridge):
+        """
+        Register that a channel of this call left a bridge.
+
+        Args:
+            bridge (Bridge): The bridge.
+        """
+        if self._bridges is None:
+            return
+
+        count = self._bridges.get(bridge, 0) - 1
+
+        if count > 0:
+            self._bridges[bridge] = count
+        else:
+            self._bridges.pop(bridge, None)
+            if not self._bridges:
+                self._bridges = None
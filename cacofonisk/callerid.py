@@ -1,5 +1,10 @@
 from collections import namedtuple
 
+from .utils.interning import Interner
+
+# Equal CallerIds share one instance, see Interner.
+intern_caller_id = Interner(4096)
+
 
 class CallerId(namedtuple('CallerIdBase', 'name num')):
     """
@@ -22,7 +27,7 @@ class CallerId(namedtuple('CallerIdBase', 'name num')):
         if num == '<unknown>':
             num = ''
 
-        return super().__new__(cls, name, str(num))
+        return intern_caller_id(super().__new__(cls, name, str(num)))
 
     def replace(self, **kwargs):
         """
@@ -32,7 +37,7 @@ class CallerId(namedtuple('CallerIdBase', 'name num')):
             **kwargs: One or more of code, name, number, is_public.
 
         Returns:
-            CallerId: A new instance with replaced values.
+            CallerId: An instance with replaced values.
         """
         if 'name' in kwargs and kwargs['name'] == '<unknown>':
             kwargs['name'] = ''
@@ -40,4 +45,4 @@ class CallerId(namedtuple('CallerIdBase', 'name num')):
         if 'num' in kwargs and kwargs['num'] == '<unknown>':
             kwargs['num'] = ''
 
-        return self._replace(**kwargs)
+        return intern_caller_id(self._replace(**kwargs))
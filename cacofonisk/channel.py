@@ -1,55 +1,208 @@
 from collections import namedtuple
+from operator import attrgetter
+from string import hexdigits
+from types import MappingProxyType
 
 from cacofonisk.callerid import CallerId
+from cacofonisk.events import Newchannel
+from cacofonisk.utils.interning import Interner
+
+# The characters of the sequence number in channel names.
+_HEX_DIGITS = frozenset(hexdigits)
+
+# How many dials and local bridges the traversals follow before giving up.
+MAX_TRAVERSAL_DEPTH = 256
+
+# Stands in for the dials of channels which never dialed, so they don't need
+# a dict of their own.
+_NO_CHANNELS = MappingProxyType({})
+
+# Markers the EventHandler sets in Channel.flags.
+# Ringing was already reported for the channel, so the next ringing is not.
+FLAG_IGNORE_B_DIAL = 1
+# Ringing was reported for the channel, so the end of the dial is too.
+FLAG_B_DIAL_SENT = 2
+# The call of the calling channel was reported as picked up.
+FLAG_IS_PICKED_UP = 4
+# The channel was transferred away, so its hangup is not reported.
+FLAG_IGNORE_A_HANGUP = 8
+
+
+# Strings which many channels have in common, like extensions, account
+# codes and Linkedids, share one object, see Interner.
+intern_string = Interner(4096)
 
 
 class MissingUniqueid(KeyError):
     pass
 
 
+def parse_channel_name(name):
+    """
+    Split a channel name into its parts.
+
+    Channel names look like SIP/150010001-0000001f or, for the two semis
+    of a Local channel, Local/201@context-0000000a;1 and ...;2.
+
+    Args:
+        name (str): The name of the channel.
+
+    Returns:
+        tuple: The technology, the resource, the sequence number (or None
+            if there is none) and the Local semi (1 or 2, or None).
+    """
+    tech, _, resource = name.partition('/')
+    local_semi = None
+
+    if tech == 'Local' and resource[-2:] in (';1', ';2'):
+        local_semi = int(resource[-1])
+        resource = resource[:-2]
+
+    prefix, _, sequence = resource.rpartition('-')
+
+    # Asterisk numbers its channels with 8 hexadecimal digits. Shorter
+    # suffixes, like the face in SIP/my-face, are part of the resource.
+    if len(sequence) == 8 and _HEX_DIGITS.issuperset(sequence):
+        sequence = int(sequence, 16)
+        resource = prefix
+    else:
+        sequence = None
+
+    return tech, resource, sequence, local_semi
+
+
+def _snapshot_field(name, doc, intern=None):
+    """
+    Create a property for a field of the SimpleChannel snapshot.
+
+    Setting the property resets the snapshot, see Channel.as_namedtuple().
+
+    Args:
+        name (str): The name of the field.
+        doc (str): The docstring of the property.
+        intern (Interner): The interner to pass new values through, if any.
+
+    Returns:
+        property: A property which stores the value in the _<name> slot.
+    """
+    attr = '_' + name
+
+    if intern is None:
+        def set_field(self, value):
+            setattr(self, attr, value)
+            self._snapshot = None
+    else:
+        def set_field(self, value):
+            setattr(self, attr, intern(value))
+            self._snapshot = None
+
+    return property(attrgetter(attr), set_field, doc=doc)
+
+
 class Channel(object):
     """
     A Channel holds Asterisk channel state.
 
     It can be dialed, bridge, and updated with new data. All of the above is
     typical low level Asterisk channel behaviour.
-    """
 
-    def __init__(self, event):
+    Channels use __slots__ to keep their memory footprint small. Subclasses
+    which do not define __slots__ themselves get a __dict__ as usual.
+
+    The name, uniqueid and linkedid of a channel never change.
+    """
+    __slots__ = (
+        'name', 'uniqueid', 'linkedid', '_state', '_exten', '_account_code',
+        '_cid_calling_pres', '_caller_id', '_connected_line', '_snapshot',
+        '_fwd_local_bridge', '_back_local_bridge', '_back_dial', '_fwd_dials',
+        'tech', 'resource', 'sequence', 'local_semi', 'is_local',
+        'bridge', 'is_originated', 'is_calling', 'flags', 'blind_transferer',
+        '_custom', '_dialing_channel', '_dialed_channels', '_anomalies',
+    )
+
+    state = _snapshot_field('state', 'int: The ChannelState.')
+    exten = _snapshot_field(
+        'exten', 'str: The extension being called.', intern_string)
+    account_code = _snapshot_field(
+        'account_code', 'str: The AccountCode.', intern_string)
+    cid_calling_pres = _snapshot_field(
+        'cid_calling_pres', 'str: The CID-CallingPres, if known.')
+    caller_id = _snapshot_field('caller_id', 'CallerId: The CallerID.')
+    connected_line = _snapshot_field(
+        'connected_line', 'CallerId: The ConnectedLine.')
+
+    def __init__(self, event, anomalies=None):
         """
         Create a new channel instance.
 
         Args:
-            event (dict): The attributes of a Newchannel event.
-        """
-        self.name = event['Channel']
-        self.uniqueid = event['Uniqueid']
-        self.linkedid = event['Linkedid']
-        self.state = int(event['ChannelState'])
-        self.exten = event['Exten']
-        self.account_code = event['AccountCode']
-        self.cid_calling_pres = None
-        self.caller_id = CallerId(
-            name=event['CallerIDName'],
-            num=event['CallerIDNum'],
+            event (Newchannel): A Newchannel event, or a dict with its
+                attributes.
+            anomalies (Counter): Where to count unexpected links found
+                while following dials and local bridges, such as loops and
+                chains longer than MAX_TRAVERSAL_DEPTH. These are counted
+                instead of raised, so one odd call does not stop event
+                handling. The EventHandler passes its own anomalies.
+        """
+        if not isinstance(event, Newchannel):
+            event = Newchannel.from_dict(event)
+
+        self.name = event.channel
+
+        # The parts of the name, see parse_channel_name(). The technology
+        # and resource are shared with other channels.
+        tech, resource, self.sequence, self.local_semi = (
+            parse_channel_name(self.name))
+        self.tech = intern_string(tech)
+        self.resource = intern_string(resource)
+
+        # A connection to Asterisk consists of two parts, an internal
+        # connection and an external connection. The internal connection
+        # is a Local channel, the external one for example a SIP channel.
+        self.is_local = tech == 'Local'
+
+        self.uniqueid = event.uniqueid
+        self.linkedid = intern_string(event.linkedid)
+        self._state = event.channel_state
+        self._exten = intern_string(event.exten)
+        self._account_code = intern_string(event.account_code)
+        self._cid_calling_pres = None
+        self._caller_id = CallerId(
+            name=event.caller_id_name,
+            num=event.caller_id_num,
         )
-        self.connected_line = CallerId(
-            name=event['ConnectedLineName'],
-            num=event['ConnectedLineNum'],
+        self._connected_line = CallerId(
+            name=event.connected_line_name,
+            num=event.connected_line_num,
         )
+        self._snapshot = None
 
         # Create vars which are used to store generated data based on other
         # events from Asterisk.
-        self.fwd_local_bridge = None
-        self.back_local_bridge = None
-        self.back_dial = None
-        self.fwd_dials = []
+        self._dialing_channel = None
+        self._fwd_local_bridge = None
+        self._back_local_bridge = None
+        self._back_dial = None
+        # The channels being dialed by this channel, oldest first. This is
+        # a dict with None values, used as an insertion-ordered set. Most
+        # channels never dial, so it is only created for the first dial.
+        self._fwd_dials = None
+        # The non-Local channels dialed on behalf of this channel, see
+        # get_dialed_channels(). Created like _fwd_dials.
+        self._dialed_channels = None
         self.bridge = None
         self.is_originated = False
         self.is_calling = self.uniqueid == self.linkedid
 
-        # The Custom dict can be used to store custom data.
-        self.custom = {}
+        # The FLAG_* markers of the EventHandler, and the channel which
+        # blind transferred this channel while the transfer is in progress.
+        self.flags = 0
+        self.blind_transferer = None
+
+        # The custom dict is created when it is first used.
+        self._custom = None
+
+        self._anomalies = anomalies
 
     def __repr__(self):
         return (
@@ -67,18 +220,131 @@ class Channel(object):
             prev=(self.back_local_bridge and self.back_local_bridge.name))
 
     @property
-    def is_local(self):
+    def custom(self):
+        """
+        dict: Custom data, free for use by reporters and subclasses.
         """
-        Whether the current channel is a local channel.
+        if self._custom is None:
+            self._custom = {}
+        return self._custom
 
-        A connection to Asterisk consist of two parts, an internal connection
-        and an external connection. The internal connection is prefixed
-        with 'Local/', whereas a external connection is prefixed with 'SIP/'.
+    @custom.setter
+    def custom(self, value):
+        self._custom = value
+
+    @property
+    def back_dial(self):
+        """
+        The channel dialing this channel, if any.
+
+        Setting it resets the cached dialing channel of this channel and the
+        channels downstream, see get_dialing_channel().
+        """
+        return self._back_dial
+
+    @back_dial.setter
+    def back_dial(self, channel):
+        self._back_dial = channel
+        self._forget_dialing_channel()
+
+    @property
+    def fwd_dials(self):
+        """
+        The channels being dialed by this channel, oldest first.
+
+        Use add_dial() and remove_dial() to change them.
 
         Returns:
-            bool: True if the channel is local, false otherwise.
+            Mapping: The channels as keys, with None values.
+        """
+        return self._fwd_dials or _NO_CHANNELS
+
+    @property
+    def fwd_local_bridge(self):
+        """
+        The other semi of this Local channel, if this is semi one.
+
+        Setting it updates the dialed channels of the channels dialing this
+        channel, see get_dialed_channels(), and the bridge component of this
+        channel.
+        """
+        return self._fwd_local_bridge
+
+    @fwd_local_bridge.setter
+    def fwd_local_bridge(self, channel):
+        old_targets = self._get_dial_targets()
+        old_channel = self._fwd_local_bridge
+        self._fwd_local_bridge = channel
+        self._update_dialing_channels(self._get_dial_targets(), old_targets)
+        self._update_bridge_component(old_channel)
+
+    @property
+    def back_local_bridge(self):
+        """
+        The other semi of this Local channel, if this is semi two.
+
+        Setting it resets the cached dialing channel of this channel and the
+        channels downstream, see get_dialing_channel(), and updates the
+        bridge component of this channel.
+        """
+        return self._back_local_bridge
+
+    @back_local_bridge.setter
+    def back_local_bridge(self, channel):
+        old_channel = self._back_local_bridge
+        self._back_local_bridge = channel
+        self._forget_dialing_channel()
+        self._update_bridge_component(old_channel)
+
+    def _update_bridge_component(self, old_channel):
+        """
+        Merge or split the bridge component after a local bridge changed.
+
+        Args:
+            old_channel (Channel): The previously linked Local semi, if any.
+        """
+        if self.bridge is None:
+            return
+
+        if old_channel is not None and old_channel.bridge is not None:
+            self.bridge.unlink(old_channel.bridge)
+
+        other = self._fwd_local_bridge or self._back_local_bridge
+        if other is not None and other.bridge is not None:
+            self.bridge.link(other.bridge)
+
+    def _count_anomaly(self, name):
         """
-        return self.name.startswith('Local/')
+        Count an unexpected link, if the channel has a Counter for them.
+
+        Args:
+            name (str): The kind of anomaly, like 'dial_loop'.
+        """
+        if self._anomalies is not None:
+            self._anomalies[name] += 1
+
+    def _forget_dialing_channel(self):
+        """
+        Reset the cached dialing channel of this channel and all channels
+        dialed on its behalf.
+
+        The channels downstream are found through fwd_dials and
+        fwd_local_bridge, which mirror back_dial and back_local_bridge.
+        """
+        seen = set()
+        stack = [self]
+
+        while stack:
+            channel = stack.pop()
+            if channel in seen:
+                continue
+            seen.add(channel)
+
+            channel._dialing_channel = None
+            if channel._fwd_dials:
+                stack.extend(channel._fwd_dials)
+            if channel._fwd_local_bridge:
+                stack.append(channel._fwd_local_bridge)
 
     @property
     def has_extension(self):
@@ -105,131 +371,199 @@ class Channel(object):
         When a channel is not bridged yet, you can use this on the
         B-channel to figure out which A-channel initiated the call.
 
+        The result is cached until the dials or local bridges leading to
+        this channel change.
+
         Returns:
             Channel: The master channel dialing this channel.
         """
-        if self.back_dial:
-            # Check if we are being dialed.
-            a_chan = self.back_dial
-        else:
-            # This is the root channel.
-            a_chan = None
+        if self._dialing_channel is not None:
+            return self._dialing_channel
+
+        # Walk up the dials until we find a channel which is not dialed,
+        # or one whose dialing channel is already known.
+        path = [self]
+        seen = {self}
+        channel = self
+
+        while True:
+            # Check if we are being dialed. If not, this is the root channel.
+            a_chan = channel._back_dial
+            if a_chan is None:
+                origin = channel
+                break
+
+            # If our a_chan has a local bridge, use the back part of that
+            # bridge to check for further dials.
+            if a_chan._back_local_bridge:
+                a_chan = a_chan._back_local_bridge
+
+            if a_chan._dialing_channel is not None:
+                origin = a_chan._dialing_channel
+                break
+
+            if a_chan in seen:
+                self._count_anomaly('dial_loop')
+                origin = channel
+                break
+
+            if len(path) >= MAX_TRAVERSAL_DEPTH:
+                self._count_anomaly('dial_depth')
+                origin = a_chan
+                break
+
+            path.append(a_chan)
+            seen.add(a_chan)
+            channel = a_chan
+
+        for channel in path:
+            channel._dialing_channel = origin
+
+        return origin
+
+    def add_dial(self, destination):
+        """
+        Register that this channel started dialing another channel.
 
-        # If our a_chan has a local bridge, use the back part of that bridge
-        # to check for further dials.
-        if a_chan and a_chan.back_local_bridge:
-            a_chan = a_chan.back_local_bridge
+        Args:
+            destination (Channel): The channel being dialed.
+        """
+        if self._fwd_dials is None:
+            self._fwd_dials = {}
+        self._fwd_dials[destination] = None
+        destination.back_dial = self
 
-        # If we have an incoming channel, recurse through the channels to find
-        # the true origin channel. If we don't have one, it means we're the
-        # origin channel.
-        return a_chan.get_dialing_channel() if a_chan else self
+        destination._update_dialing_channels(
+            destination._get_dial_targets(), ())
 
-    def get_dialed_channels(self):
+    def remove_dial(self, destination):
         """
-        Figure out which channels are calling on our behalf.
+        Register that this channel stopped dialing another channel.
 
-        When a channel is not bridged yet, you can use this on the
-        A-channel to find out which channels are dialed on behalf of
-        this channel.
+        Args:
+            destination (Channel): The channel which was dialed.
+        """
+        if destination in self.fwd_dials:
+            destination._update_dialing_channels(
+                (), destination._get_dial_targets())
+            del self._fwd_dials[destination]
+            if not self._fwd_dials:
+                self._fwd_dials = None
 
-        It works like this:
+        destination.back_dial = None
 
-        * A-channel (this) has a list of _fwd_dials items (open
-          dials).
-        * We loop over those (a list of uniqueids) and find the
-          corresponding channels.
-        * Those channels may be SIP channels, or they can be local
-          channels, in which case we have to look further (by calling
-          this function on those channels).
+    def _get_dial_targets(self):
+        """
+        Get the channels reached when this channel is dialed.
 
         Returns:
-            set: A set of all channels being dialed by this channel.
+            iterable: The channels dialed on behalf of the Local channel
+                linked to this one, or just this channel.
+        """
+        if self._fwd_local_bridge:
+            return self._fwd_local_bridge._dialed_channels or ()
+
+        return (self,)
+
+    def _update_dialing_channels(self, added, removed):
         """
-        b_channels = set()
+        Update the dialed channels of the channels dialing this channel.
 
-        b_chans = self.fwd_dials
+        This follows the same links as get_dialing_channel(), so every
+        change costs one step per dial or local bridge on the way up.
 
-        for b_chan in b_chans:
-            # Likely, b_chan.fwd_local_bridge is None, in which case we're
-            # looking at a real tech channel (non-Local).
-            # Or, the b_chan has one.fwd_local_bridge, after which we have
-            # to call this function again.
-            if b_chan.fwd_local_bridge:
-                b_chan = b_chan.fwd_local_bridge
+        Args:
+            added (iterable): The new dial targets of this channel.
+            removed (iterable): The old dial targets of this channel.
+        """
+        if not added and not removed:
+            return
 
-                assert not b_chan.fwd_local_bridge, (
-                    'Since when does asterisk do double links? b_chan={!r}'
-                    .format(b_chan)
-                )
+        channel = self
+        seen = set()
 
-                b_channels.update(b_chan.get_dialed_channels())
-            else:
-                assert not b_chan.fwd_dials
-                b_channels.add(b_chan)
+        while True:
+            a_chan = channel._back_dial
+            if a_chan is None or channel not in a_chan.fwd_dials:
+                return
 
-        return b_channels
+            if a_chan in seen:
+                self._count_anomaly('dial_loop')
+                return
 
-    def get_bridge_peers_recursive(self):
-        """
-        Traverse (local) bridges recursively and get all non-Local channels.
+            if len(seen) >= MAX_TRAVERSAL_DEPTH:
+                self._count_anomaly('dial_depth')
+                return
+
+            seen.add(a_chan)
+
+            dialed = a_chan._dialed_channels
+            if dialed is None:
+                dialed = a_chan._dialed_channels = {}
+            elif dialed is added or dialed is removed:
+                # The channel dials itself through its local bridge.
+                self._count_anomaly('dial_loop')
+                return
+
+            for target in removed:
+                dialed.pop(target, None)
+            for target in added:
+                dialed[target] = None
 
-        Uses _get_peers_recursive to traverse the local and non-local
-        bridges recursively, but also checks the local bridges of self for
-        more channels.
+            if not dialed:
+                a_chan._dialed_channels = None
 
-        This cannot be done in one step, as doing so would cause a recursion
-        loop while traversing the same local bridge back and forth.
+            # Local semi two passes its dials on to the channels dialing
+            # semi one.
+            channel = a_chan._back_local_bridge
+            if channel is None or channel._fwd_local_bridge is not a_chan:
+                return
+
+    @property
+    def dialed_channels(self):
+        """
+        Get the channels which are being dialed on our behalf.
+
+        The channels are maintained as dials begin and end and as Local
+        channels are linked, so this is cheap for large ring groups.
 
         Returns:
-            set: A set of non-local Channels.
+            KeysView: The non-Local channels being dialed by this channel,
+                in the order they were dialed.
         """
-        peers = self._bridge_peers_recurse()
+        return (self._dialed_channels or _NO_CHANNELS).keys()
 
-        if self.fwd_local_bridge:
-            fwd_peers = self.fwd_local_bridge._bridge_peers_recurse()
-            for peer in fwd_peers:
-                peers.add(peer)
+    def get_dialed_channels(self):
+        """
+        Figure out which channels are calling on our behalf.
 
-        if self.back_local_bridge:
-            back_peers = self.back_local_bridge._bridge_peers_recurse()
-            for peer in back_peers:
-                peers.add(peer)
+        When a channel is not bridged yet, you can use this on the
+        A-channel to find out which channels are dialed on behalf of
+        this channel. Dials to Local channels are followed through their
+        local bridge to the channels dialed by the other semi.
 
-        return peers
+        Returns:
+            set: A set of all channels being dialed by this channel.
+        """
+        return set(self._dialed_channels or ())
 
-    def _bridge_peers_recurse(self):
+    def get_bridge_peers_recursive(self):
         """
-        The recursive step of get_bridge_peers_recursive.
+        Get all non-Local channels connected to this channel through bridges.
 
-        This function finds the non-Local channels of the current bridge,
-        as well as the non-Local channels of the channels linked through
-        local bridges.
+        The bridges of this channel and of its other Local semi are part of
+        a BridgeComponent if they are linked to other bridges. It holds the
+        non-Local channels of all bridges linked by Local channels, so no
+        bridges need to be walked.
 
         Returns:
             set: A set of non-local Channels.
         """
-        if not self.bridge:
-            return set()
-
         peers = set()
 
-        if not self.is_local:
-            peers.add(self)
-
-        for peer in [peer for peer in self.bridge.peers if peer != self]:
-            if not peer.is_local:
-                peers.add(peer)
-            elif peer.is_local and peer.fwd_local_bridge:
-                rec_peers = peer.fwd_local_bridge._bridge_peers_recurse()
-
-                for recursive_peer in rec_peers:
-                    peers.add(recursive_peer)
-            elif peer.is_local and peer.back_local_bridge:
-                rec_peers = peer.back_local_bridge._bridge_peers_recurse()
-
-                for recursive_peer in rec_peers:
-                    peers.add(recursive_peer)
+        for channel in (self, self.fwd_local_bridge, self.back_local_bridge):
+            if channel is not None and channel.bridge is not None:
+                peers.update(channel.bridge.get_members())
 
         return peers
 
@@ -237,13 +571,19 @@ class Channel(object):
         """
         Convert Channel to a SimpleChannel, so it's safe to pass to a reporter.
 
+        The SimpleChannel is kept until one of its fields changes, so all
+        notifications in between share the same immutable object.
+
         Returns:
             SimpleChannel: A SimpleChannel with the data of this channel.
         """
-        fields = SimpleChannel._fields
+        if self._snapshot is None:
+            fields = SimpleChannel._fields
+
+            self._snapshot = SimpleChannel(
+                **{field: getattr(self, field) for field in fields})
 
-        return SimpleChannel(
-            **{field: getattr(self, field) for field in fields})
+        return self._snapshot
 
 
 class ChannelDict(dict):
@@ -0,0 +1,389 @@
+"""
+Typed AMI events.
+
+AMI events come in as dicts of strings. The EventHandler converts each event
+it handles into an instance of one of the classes below, once, when the
+event comes in. The fields the handlers use become slotted attributes, with
+numeric fields like ChannelState and Cause already converted to ints, so the
+handlers don't have to look them up by key and parse them over and over.
+
+For compatibility, events still behave like read-only dicts with the
+original AMI keys and string values: ``event['Uniqueid']``, ``'Cause' in
+event`` and ``dict(event)`` all work. Fields without an attribute are looked
+up in the raw event, which is kept in the raw attribute. Typed events are
+only used inside the EventHandler: reporters get the raw events.
+"""
+from collections.abc import Mapping
+
+# The event classes by AMI event name.
+EVENT_CLASSES = {}
+
+# All event classes, see is_event().
+_event_types = set()
+
+
+def is_event(obj):
+    """
+    Check whether an object is a typed event.
+
+    This is the same as isinstance(obj, Event), but a lot faster. Event is
+    an abstract Mapping, for which isinstance() is relatively slow.
+
+    Args:
+        obj: Any object, like a raw or typed event.
+
+    Returns:
+        bool: True if obj is an instance of a subclass of Event.
+    """
+    return type(obj) in _event_types
+
+
+def _compile_fill_fields(fields):
+    """
+    Compile a function which sets the attributes of an event from a raw one.
+
+    Like namedtuple does, the function is generated for each event class.
+    Assigning the attributes directly is a lot faster than a loop over
+    FIELDS with setattr(), which matters as every event goes through it.
+
+    Args:
+        fields (tuple): The FIELDS of the event class.
+
+    Returns:
+        function: A function taking the event and the get method of the raw
+        event. Values which cannot be converted are kept as they are.
+    """
+    lines = ['def fill_fields(self, get):']
+    namespace = {}
+
+    for number, (key, attr, convert) in enumerate(fields):
+        if convert is str:
+            lines.append('    self.{} = get({!r})'.format(attr, key))
+            continue
+
+        namespace['convert_{}'.format(number)] = convert
+        lines.extend([
+            '    value = get({!r})'.format(key),
+            '    if value is not None:',
+            '        try:',
+            '            value = convert_{}(value)'.format(number),
+            '        except (TypeError, ValueError):',
+            '            pass',
+            '    self.{} = value'.format(attr),
+        ])
+
+    lines.append("    self.timestamp = get('Timestamp')")
+
+    exec('\n'.join(lines), namespace)
+
+    return namespace['fill_fields']
+
+
+class Event(Mapping):
+    """
+    The base class of typed AMI events.
+
+    Subclasses list their fields in FIELDS, as tuples of the AMI key, the
+    attribute name and the type of the value. Every attribute is None if the
+    event did not contain the field.
+
+    The Timestamp of an event is kept as it was sent by Asterisk, in the
+    timestamp attribute. The raw attribute holds the raw event the typed
+    event was created from, or None.
+    """
+    __slots__ = ('timestamp', 'raw', '_extra')
+
+    name = None
+    FIELDS = ()
+
+    # Whether to keep all other fields, even when projecting events.
+    KEEP_ALL_FIELDS = False
+
+    # The attributes which hold the Uniqueids of channels and bridges.
+    channel_id_attrs = ()
+    bridge_id_attrs = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls.name = cls.__name__
+        cls._fields_by_key = {
+            key: (attr, convert) for key, attr, convert in cls.FIELDS}
+        cls.field_names = tuple(key for key, _, _ in cls.FIELDS)
+        cls._known_keys = frozenset(cls.field_names + ('Event', 'Timestamp'))
+        cls._fill_fields = _compile_fill_fields(cls.FIELDS)
+        cls.channel_id_attrs = tuple(
+            attr for key, attr, _ in cls.FIELDS
+            if key.endswith('Uniqueid') and not key.endswith('BridgeUniqueid'))
+        cls.bridge_id_attrs = tuple(
+            attr for key, attr, _ in cls.FIELDS
+            if key.endswith('BridgeUniqueid'))
+
+        EVENT_CLASSES[cls.name] = cls
+        _event_types.add(cls)
+
+    def __init__(self, timestamp=None, extra=None, **fields):
+        """
+        Create an event from attribute values.
+
+        Args:
+            timestamp (str): The Timestamp of the event.
+            extra (dict): Any other fields of the event.
+            **fields: The values of the attributes in FIELDS.
+        """
+        for _, attr, _ in self.FIELDS:
+            setattr(self, attr, fields.pop(attr, None))
+
+        if fields:
+            raise TypeError('Unknown fields for {}: {}'.format(
+                self.name, ', '.join(sorted(fields))))
+
+        self.timestamp = timestamp
+        self.raw = None
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, event, fields=None):
+        """
+        Create a typed event from a raw AMI event.
+
+        When all fields are kept, the typed event refers to the raw event
+        for the other fields, so the raw event should not be changed
+        afterwards.
+
+        Args:
+            event (dict): A dict with all fields of the event.
+            fields (set): The other fields to keep, or None to keep all.
+
+        Returns:
+            Event: The typed event.
+        """
+        self = cls.__new__(cls)
+        cls._fill_fields(self, event.get)
+        self.raw = event
+
+        if fields is None or cls.KEEP_ALL_FIELDS:
+            self._extra = event
+        else:
+            known = cls._known_keys
+            extra = {key: event[key] for key in fields
+                     if key not in known and key in event}
+            self._extra = extra or None
+
+        return self
+
+    def __getitem__(self, key):
+        if key == 'Event':
+            return self.name
+
+        if key == 'Timestamp':
+            if self.timestamp is None:
+                raise KeyError(key)
+            return self.timestamp
+
+        field = self._fields_by_key.get(key)
+        if field is not None:
+            value = getattr(self, field[0])
+            if value is None:
+                raise KeyError(key)
+            return value if type(value) is str else str(value)
+
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        yield 'Event'
+
+        if self.timestamp is not None:
+            yield 'Timestamp'
+
+        for key, attr, _ in self.FIELDS:
+            if getattr(self, attr) is not None:
+                yield key
+
+        if self._extra is not None:
+            known = self._known_keys
+            for key in self._extra:
+                if key not in known:
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '<{}({!r})>'.format(self.name, dict(self))
+
+
+class FullyBooted(Event):
+    __slots__ = ()
+
+
+class Newchannel(Event):
+    FIELDS = (
+        ('Channel', 'channel', str),
+        ('Uniqueid', 'uniqueid', str),
+        ('Linkedid', 'linkedid', str),
+        ('ChannelState', 'channel_state', int),
+        ('Exten', 'exten', str),
+        ('AccountCode', 'account_code', str),
+        ('CallerIDName', 'caller_id_name', str),
+        ('CallerIDNum', 'caller_id_num', str),
+        ('ConnectedLineName', 'connected_line_name', str),
+        ('ConnectedLineNum', 'connected_line_num', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class Newstate(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('ChannelState', 'channel_state', int),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class LocalBridge(Event):
+    FIELDS = (
+        ('LocalOneUniqueid', 'local_one_uniqueid', str),
+        ('LocalTwoUniqueid', 'local_two_uniqueid', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class Hangup(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('Cause', 'cause', int),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class DialBegin(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('DestUniqueid', 'dest_uniqueid', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class DialEnd(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('DestUniqueid', 'dest_uniqueid', str),
+        ('DialStatus', 'dial_status', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class NewCallerid(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('CallerIDName', 'caller_id_name', str),
+        ('CallerIDNum', 'caller_id_num', str),
+        ('CID-CallingPres', 'cid_calling_pres', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class NewAccountCode(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('AccountCode', 'account_code', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class NewConnectedLine(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('ConnectedLineName', 'connected_line_name', str),
+        ('ConnectedLineNum', 'connected_line_num', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class AttendedTransfer(Event):
+    FIELDS = (
+        ('OrigTransfererUniqueid', 'orig_transferer_uniqueid', str),
+        ('OrigTransfererLinkedid', 'orig_transferer_linkedid', str),
+        ('OrigTransfererExten', 'orig_transferer_exten', str),
+        ('SecondTransfererUniqueid', 'second_transferer_uniqueid', str),
+        ('SecondTransfererExten', 'second_transferer_exten', str),
+        ('TransfereeUniqueid', 'transferee_uniqueid', str),
+        ('TransferTargetUniqueid', 'transfer_target_uniqueid', str),
+        ('TransferTargetCallerIDNum', 'transfer_target_caller_id_num', str),
+        ('DestType', 'dest_type', str),
+        ('DestApp', 'dest_app', str),
+        ('DestBridgeUniqueid', 'dest_bridge_uniqueid', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class BlindTransfer(Event):
+    FIELDS = (
+        ('TransfererUniqueid', 'transferer_uniqueid', str),
+        ('TransfereeUniqueid', 'transferee_uniqueid', str),
+        ('Extension', 'extension', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class BridgeCreate(Event):
+    FIELDS = (
+        ('BridgeUniqueid', 'bridge_uniqueid', str),
+        ('BridgeType', 'bridge_type', str),
+        ('BridgeTechnology', 'bridge_technology', str),
+        ('BridgeCreator', 'bridge_creator', str),
+        ('BridgeVideoSourceMode', 'bridge_video_source_mode', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class BridgeEnter(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('BridgeUniqueid', 'bridge_uniqueid', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class BridgeLeave(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('BridgeUniqueid', 'bridge_uniqueid', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class BridgeDestroy(Event):
+    FIELDS = (
+        ('BridgeUniqueid', 'bridge_uniqueid', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+
+class UserEvent(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+        ('UserEvent', 'user_event', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
+
+    # UserEvents are passed to the reporter as a whole.
+    KEEP_ALL_FIELDS = True
+
+
+class QueueCallerAbandon(Event):
+    FIELDS = (
+        ('Uniqueid', 'uniqueid', str),
+    )
+    __slots__ = tuple(attr for _, attr, _ in FIELDS)
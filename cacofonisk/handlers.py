@@ -1,14 +1,50 @@
 import logging
 import datetime
+import time
+from collections import Counter
+from types import MappingProxyType
 
 from .bridge import Bridge, BridgeDict, MissingBridgeUniqueid
-from .channel import Channel, ChannelDict, MissingUniqueid
+from .call import Call
+from .channel import (FLAG_B_DIAL_SENT, FLAG_IGNORE_A_HANGUP,
+                      FLAG_IGNORE_B_DIAL, FLAG_IS_PICKED_UP, Channel,
+                      ChannelDict, MissingUniqueid)
+from .events import EVENT_CLASSES, is_event
+from .utils.timerwheel import TimerWheel
 from .constants import (AST_CAUSE_ANSWERED_ELSEWHERE, AST_CAUSE_CALL_REJECTED,
                         AST_CAUSE_INTERWORKING, AST_CAUSE_NO_ANSWER,
                         AST_CAUSE_NO_USER_RESPONSE, AST_CAUSE_NORMAL_CLEARING,
                         AST_CAUSE_UNKNOWN, AST_CAUSE_USER_BUSY, AST_STATE_DOWN,
                         AST_STATE_RING, AST_STATE_RINGING, AST_STATE_UP)
 
+
+def handles(*event_names):
+    """
+    Register a method of an EventHandler as the handler of AMI events.
+
+    The dispatch table of an EventHandler class is built once, when the
+    class is created. Subclasses inherit the handlers of their parents and
+    can add or replace handlers by decorating their own methods. Overriding
+    a registered method without the decorator keeps it registered.
+
+    Usage::
+
+        class MyEventHandler(EventHandler):
+
+            @handles('VarSet')
+            def _on_var_set(self, event):
+                ...
+
+    Args:
+        *event_names (str): The names of the events the method handles.
+    """
+    def decorator(func):
+        func.handled_events = event_names
+        return func
+
+    return decorator
+
+
 class UnknownAttendedTransferTypeException(Exception):
     def __init__(self, event, dest_type, dest_app):
          self.event = event
@@ -39,10 +75,25 @@ class EventHandler(object):
     - on_hangup
 
     See the docs about the particular methods for more information about
-    what they receive and how they work.
+    what they receive and how they work. To handle other AMI events,
+    decorate a method with handles().
     """
     FILTER_EVENTS = True
 
+    # Fields which are kept in every event when projecting events.
+    PROJECTED_FIELDS = frozenset(('Event', 'Timestamp'))
+
+    # Remove channels and bridges which had no events for this many seconds,
+    # in case their Hangup or BridgeDestroy got lost. This should be longer
+    # than the longest call, as a call in progress has no events.
+    REAP_AFTER = None
+
+    # The maximum number of channels and calls to keep track of. When a new
+    # channel would exceed either, the calls which have been idle the
+    # longest are dropped. Events for their channels are then ignored.
+    MAX_CHANNELS = None
+    MAX_CALLS = None
+
     def __init__(self, reporter, hostname='localhost', logger=None):
         """
         Create a EventHandler instance.
@@ -53,62 +104,299 @@ class EventHandler(object):
         self._reporter = reporter
         self._channels = ChannelDict()
         self._bridges = BridgeDict()
+        self._calls = {}
         self._logger = logger or logging.getLogger(__name__)
         self._hostname = hostname
+        self._projection = self.build_projection(
+            getattr(reporter, 'EVENT_FIELDS', None))
+        self._dispatch = self.get_dispatch()
+        self._timestamps = getattr(reporter, 'USES_TIMESTAMP', True)
+        # A subclass which overrides timestamp_from_event() still gets it
+        # called for every event.
+        self._lazy_timestamps = (
+            hasattr(reporter, 'set_event_timestamp') and
+            type(self).timestamp_from_event is
+            EventHandler.timestamp_from_event)
+        self._batch_reporter = getattr(reporter, 'BATCH_EVENTS', False)
+
+        # The number of channels and bridges which were reaped.
+        self.reaped = Counter()
+        if self.REAP_AFTER:
+            self._channel_wheel = TimerWheel(self.REAP_AFTER)
+            self._bridge_wheel = TimerWheel(self.REAP_AFTER)
+        else:
+            self._channel_wheel = self._bridge_wheel = None
+        self._next_reap = 0
+
+        # The number of calls and channels which were evicted, and of new
+        # channels which were ignored because there was no room for them.
+        self.evicted = Counter()
+        self._bounded = bool(self.MAX_CHANNELS or self.MAX_CALLS)
+
+        # The number of unexpected links between channels, like dial loops
+        # or Local channels which are linked twice, by kind.
+        self.anomalies = Counter()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._register_handlers()
+
+    @classmethod
+    def _register_handlers(cls):
+        """
+        Collect the methods registered with handles() of this class.
+        """
+        handler_names = {}
+
+        for klass in reversed(cls.__mro__):
+            for attr, value in vars(klass).items():
+                for event_name in getattr(value, 'handled_events', ()):
+                    handler_names[event_name] = attr
+
+        cls._handler_names = handler_names
+
+    @classmethod
+    def get_dispatch(cls):
+        """
+        Get the dispatch table of this class.
+
+        The table is built from event_handlers() the first time it is
+        needed, and then reused for all events and instances.
+
+        Returns:
+            MappingProxyType: A read-only mapping with event names as keys
+            and functions as values.
+        """
+        dispatch = cls.__dict__.get('_dispatch')
+
+        if dispatch is None:
+            dispatch = MappingProxyType(dict(cls.event_handlers()))
+            cls._dispatch = dispatch
+
+        return dispatch
 
     @classmethod
     def event_handlers(cls):
         """
         Get the events we would like to receive, and functions to handle them.
 
+        Handlers are registered with the handles() decorator. Overriding
+        this method still works too, but it is only called once per class,
+        see get_dispatch().
+
         Returns:
             dict: A dict with event names as keys and functions as values.
         """
         return {
-            'FullyBooted': cls._on_fully_booted,
-            # Events related to call setup.
-            'Newchannel': cls._on_new_channel,
-            'Newstate': cls._on_new_state,
-            'LocalBridge': cls._on_local_bridge,
-            'Hangup': cls._on_hangup,
-            'DialBegin': cls._on_dial_begin,
-            'DialEnd': cls._on_dial_end,
-            # Events which change channel vars.
-            'NewCallerid': cls._on_new_callerid,
-            'NewAccountCode': cls._on_new_accountcode,
-            'NewConnectedLine': cls._on_new_connected_line,
-            # Transfer events.
-            'AttendedTransfer': cls._on_attended_transfer,
-            'BlindTransfer': cls._on_blind_transfer,
-            # Bridges and their contents.
-            'BridgeCreate': cls._on_bridge_create,
-            'BridgeEnter': cls._on_bridge_enter,
-            'BridgeLeave': cls._on_bridge_leave,
-            'BridgeDestroy': cls._on_bridge_destroy,
-            # User Events
-            'UserEvent': cls.on_user_event,
-            # Queue Events
-            'QueueCallerAbandon': cls._on_queue_caller_abandon,
+            event_name: getattr(cls, attr)
+            for event_name, attr in cls._handler_names.items()
+        }
+
+    @classmethod
+    def event_fields(cls):
+        """
+        Get the fields of each event the handlers need.
+
+        These are the fields of the typed events in cacofonisk.events. When
+        overriding event_handlers() or one of the handlers, make sure to
+        add the fields your handlers read. Events which are not listed here
+        are never projected.
+
+        Returns:
+            dict: A dict with event names as keys and tuples of field names
+            as values. None means all fields of the event are used.
+        """
+        handlers = cls.event_handlers()
+
+        return {
+            event_name: (
+                None if event_class.KEEP_ALL_FIELDS
+                else event_class.field_names)
+            for event_name, event_class in EVENT_CLASSES.items()
+            if event_name in handlers
         }
 
+    @classmethod
+    def build_projection(cls, reporter_fields):
+        """
+        Determine which fields to keep of each event.
+
+        Args:
+            reporter_fields (dict): The EVENT_FIELDS of the reporter: a dict
+                with event names as keys and iterables of field names (or
+                None for all fields) as values. If reporter_fields itself is
+                None, the reporter needs all fields of all events.
+
+        Returns:
+            dict: Event names as keys and frozensets of field names as
+            values, or None if events should not be projected at all.
+        """
+        if reporter_fields is None:
+            return None
+
+        handler_fields = cls.event_fields()
+        projection = {}
+
+        for event_name in cls.event_handlers():
+            fields = handler_fields.get(event_name)
+            extra_fields = reporter_fields.get(event_name, ())
+
+            if fields is None or extra_fields is None:
+                continue
+
+            projection[event_name] = cls.PROJECTED_FIELDS.union(
+                fields, extra_fields)
+
+        return projection
+
+    def project(self, event):
+        """
+        Drop the fields of an event which no handler or reporter needs.
+
+        Args:
+            event (dict): A dictionary containing an AMI event.
+
+        Returns:
+            dict: The event with only the needed fields, or the event itself
+            if it should not be projected.
+        """
+        if self._projection is None:
+            return event
+
+        fields = self._projection.get(event['Event'])
+        if fields is None:
+            return event
+
+        return {key: event[key] for key in fields if key in event}
+
+    def parse_event(self, event):
+        """
+        Convert a raw AMI event to a typed event.
+
+        The event is projected first, see project(). The typed event is
+        created from the projected event, which is kept in its raw
+        attribute. Events without an event class in cacofonisk.events are
+        projected, but left as a dict.
+
+        Args:
+            event (dict): A dictionary containing an AMI event.
+
+        Returns:
+            Event: The typed event.
+        """
+        event = self.project(event)
+
+        event_class = EVENT_CLASSES.get(event.get('Event'))
+        if event_class is None:
+            return event
+
+        return event_class.from_dict(event)
+
     def on_event(self, event):
         """
         Interpret an event, update local state and send notifications.
 
-        This function wraps _on_event to catch exceptions related to missing
-        channels and bridges, which can happen if the Cacofonisk connects to a
-        running Asterisk.
+        This function wraps the event handlers to catch exceptions related to
+        missing channels and bridges, which can happen if the Cacofonisk
+        connects to a running Asterisk.
+
+        Raw events are converted to typed events for the handlers, see
+        parse_event(). The reporter gets the raw event, or the projected
+        event if the reporter sets EVENT_FIELDS.
 
         Args:
-            event (dict): A dictionary containing an AMI event.
+            event (dict): A dict-like object containing an AMI event, or an
+                Event.
         """
-        # Update the timestamp of the event in the reporter
-        self._reporter.set_timestamp(self.timestamp_from_event(event))
+        event = self._handle_event(event)
+
+        if self._batch_reporter:
+            self._reporter.on_events([event])
+        else:
+            self._reporter.on_event(event)
+
+    def on_events(self, events):
+        """
+        Interpret a batch of events, like a chunk of a replay log or all
+        events of a single read from Asterisk.
+
+        Events without a handler are skipped, unless FILTER_EVENTS is False.
+        Reporters with BATCH_EVENTS set get all handled events of the batch
+        at once in on_events(), after the batch has been processed. Other
+        reporters get each event in on_event(), right after it is handled.
+
+        Subclasses which override on_event() still get each event in
+        on_event().
+
+        Args:
+            events (iterable): The events, as dict-like objects or Events.
+        """
+        dispatch = self._dispatch
+        filter_events = self.FILTER_EVENTS
+
+        if type(self).on_event is not EventHandler.on_event:
+            for event in events:
+                if not filter_events or event['Event'] in dispatch:
+                    self.on_event(event)
+            return
+
+        reporter = self._reporter
+        batch = [] if self._batch_reporter else None
+        handle_event = self._handle_event
+
+        for event in events:
+            if filter_events and event['Event'] not in dispatch:
+                continue
+
+            event = handle_event(event)
+
+            if batch is not None:
+                batch.append(event)
+            else:
+                reporter.on_event(event)
+
+        if batch:
+            reporter.on_events(batch)
+
+    def _handle_event(self, event):
+        """
+        Convert an event, update the reporter timestamp and call its handler.
+
+        Args:
+            event (dict): A dict-like object containing an AMI event, or an
+                Event.
+
+        Returns:
+            dict: The event to pass to the reporter: the raw or projected
+            event, or the event itself if it was already typed.
+        """
+        typed = is_event(event)
+        if not typed:
+            event = self.parse_event(event)
+            typed = is_event(event)
+
+        # Update the timestamp of the event in the reporter. The datetime is
+        # only created if the reporter reads it.
+        if not self._timestamps:
+            pass
+        elif self._lazy_timestamps:
+            self._reporter.set_event_timestamp(
+                event.timestamp if typed else event.get('Timestamp'))
+        else:
+            self._reporter.set_timestamp(self.timestamp_from_event(event))
+
+        if typed:
+            if self._channel_wheel is not None:
+                self._track_activity(event)
+
+            if self._bounded:
+                self._touch_calls(event)
 
         try:
-            handlers = self.event_handlers()
-            if event['Event'] in handlers and handlers[event['Event']]:
-                handlers[event['Event']](self, event)
+            handler = self._dispatch.get(
+                event.name if typed else event['Event'])
+            if handler:
+                handler(self, event)
 
         except MissingUniqueid as e:
             # If this is after a recent FullyBooted and/or start of
@@ -123,39 +411,243 @@ class EventHandler(object):
                 'Bridge with Uniqueid {} not in mem when processing event: '
                 '{!r}'.format(e.args[0], event))
 
-        self._reporter.on_event(event)
+        if typed and event.raw is not None:
+            return event.raw
+
+        return event
+
+    def _track_activity(self, event):
+        """
+        Register the channels and bridges of an event as active.
+
+        Args:
+            event (Event): The event.
+        """
+        if event.timestamp is not None:
+            now = float(event.timestamp)
+        else:
+            now = time.time()
+
+        for attr in event.channel_id_attrs:
+            uniqueid = getattr(event, attr)
+            if uniqueid is not None:
+                self._channel_wheel.touch(uniqueid, now)
+
+        for attr in event.bridge_id_attrs:
+            uniqueid = getattr(event, attr)
+            if uniqueid is not None:
+                self._bridge_wheel.touch(uniqueid, now)
+
+        # The wheels only turn once per slot.
+        if now >= self._next_reap:
+            self._next_reap = now + self._channel_wheel.resolution
+            self._reap(now)
+
+    def _reap(self, now):
+        """
+        Reap the channels and bridges which were not active for REAP_AFTER
+        seconds.
+
+        Args:
+            now (float): The current time.
+        """
+        for uniqueid in self._channel_wheel.expire(now):
+            channel = self._channels.get(uniqueid)
+            if channel is not None:
+                self._reap_channel(channel)
+
+        for uniqueid in self._bridge_wheel.expire(now):
+            bridge = self._bridges.get(uniqueid)
+            if bridge is None:
+                continue
+
+            if any(self._channels.get(peer.uniqueid) is peer
+                   for peer in bridge.peers):
+                # Keep bridges of channels which are still around.
+                self._bridge_wheel.touch(uniqueid, now)
+            else:
+                self._reap_bridge(bridge)
+
+    def _reap_channel(self, channel):
+        """
+        Remove a channel which has not been active for too long.
+
+        The reporter is not notified, since we don't know what happened.
+
+        Args:
+            channel (Channel): The channel.
+        """
+        self._logger.warning(
+            'Reaping channel {} without events for {} seconds.'.format(
+                channel.name, self.REAP_AFTER))
+
+        self._drop_channel(channel)
+
+        self.reaped['channels'] += 1
+
+    def _drop_channel(self, channel):
+        """
+        Remove a channel along with its dials and bridge, without notifying
+        the reporter.
+
+        Args:
+            channel (Channel): The channel.
+        """
+        if channel.back_dial is not None:
+            channel.back_dial.remove_dial(channel)
+
+        for destination in list(channel.fwd_dials):
+            channel.remove_dial(destination)
+
+        bridge = channel.bridge
+        self._remove_channel(channel)
+        if bridge is not None and channel in bridge.peers:
+            bridge.remove_peer(channel)
+
+    def _reap_bridge(self, bridge):
+        """
+        Remove a bridge which has not been active for too long.
+
+        Args:
+            bridge (Bridge): The bridge.
+        """
+        self._logger.warning(
+            'Reaping bridge {} without events for {} seconds.'.format(
+                bridge.uniqueid, self.REAP_AFTER))
+
+        for peer in list(bridge.peers):
+            bridge.remove_peer(peer)
+
+        del self._bridges[bridge.uniqueid]
+
+        self.reaped['bridges'] += 1
+
+    def _touch_calls(self, event):
+        """
+        Mark the calls of the channels of an event as most recently active.
+
+        The calls are kept in order of activity, so the call which has been
+        idle the longest is always the first one.
+
+        Args:
+            event (Event): The event.
+        """
+        calls = self._calls
+
+        for attr in event.channel_id_attrs:
+            channel = self._channels.get(getattr(event, attr))
+            if channel is not None:
+                call = calls.pop(channel.linkedid, None)
+                if call is not None:
+                    calls[channel.linkedid] = call
+
+    def _make_room(self, linkedid):
+        """
+        Evict the calls which have been idle the longest, until there is
+        room for a new channel of the given call.
+
+        Args:
+            linkedid (str): The Linkedid of the new channel.
+
+        Returns:
+            bool: Whether there is room for the new channel.
+        """
+        new_call = linkedid not in self._calls
+        if not new_call:
+            # The call is active again, so evict the other calls first.
+            self._calls[linkedid] = self._calls.pop(linkedid)
+
+        while ((self.MAX_CHANNELS and
+                len(self._channels) >= self.MAX_CHANNELS) or
+               (self.MAX_CALLS and new_call and
+                len(self._calls) >= self.MAX_CALLS)):
+            oldest = next(iter(self._calls), linkedid)
+            if oldest == linkedid:
+                # Never evict the call the new channel is part of.
+                return False
+
+            self._evict_call(self._calls[oldest])
+
+        return True
+
+    def _evict_call(self, call):
+        """
+        Stop keeping track of a call and all of its channels.
+
+        Args:
+            call (Call): The call.
+        """
+        self._logger.warning(
+            'Evicting call {} with {} channels to stay within limits.'.format(
+                call.linkedid, len(call)))
+
+        self.evicted['channels'] += len(call)
+        for channel in list(call.channels.values()):
+            self._drop_channel(channel)
+
+        self._calls.pop(call.linkedid, None)
+        self.evicted['calls'] += 1
+
+    def get_call(self, linkedid):
+        """
+        Get the call with the given Linkedid.
+
+        Args:
+            linkedid (str): The Linkedid of the call.
+
+        Returns:
+            Call: The call, or None if it has no channels (left).
+        """
+        return self._calls.get(linkedid)
+
+    @property
+    def active_call_count(self):
+        """
+        Get the number of calls which still have channels.
+
+        Returns:
+            int: The number of active calls.
+        """
+        return len(self._calls)
 
     def timestamp_from_event(self, event):
         """
         Get a timestamp from the event.
 
+        This is only called for reporters without set_event_timestamp(),
+        or if a subclass overrides it. Otherwise the reporter gets the
+        Timestamp of the event as it is, and only converts it when read.
+
         Args:
-            event (dict): The event to extract the timestamp from.
+            event (Event): The event to extract the timestamp from.
 
         Returns:
             datetime.datetime: The timestamp of the event.
         """
 
-        if 'Timestamp' in event:
-            return datetime.datetime.fromtimestamp(float(event['Timestamp']),tz=datetime.timezone.utc)
+        timestamp = event.get('Timestamp')
+        if timestamp is not None:
+            return datetime.datetime.fromtimestamp(float(timestamp),tz=datetime.timezone.utc)
         return datetime.datetime.now(datetime.timezone.utc)
 
+    @handles('QueueCallerAbandon')
     def _on_queue_caller_abandon(self, event):
         """
         Handle Queue Caller Abandon messages from Asterisk.
 
         Args:
-            event (dict): Dict-like object with all attributes of the event.
+            event (QueueCallerAbandon): A QueueCallerAbandon event.
         """
-        channel = self._channels[event['Uniqueid']]
+        channel = self._channels[event.uniqueid]
         self._reporter.on_queue_caller_abandon(caller=channel.as_namedtuple())
 
+    @handles('FullyBooted')
     def _on_fully_booted(self, event):
         """
         FullyBooted event is sent on successful connection to Asterisk.
 
         Args:
-            event (dict): A FullyBooted event.
+            event (FullyBooted): A FullyBooted event.
         """
         self._logger.info('Connection established to Asterisk on {}'.format(
             self._hostname))
@@ -170,6 +662,14 @@ class EventHandler(object):
                                  'channels.'.format(len(self._channels)))
             self._channels = ChannelDict()
 
+        self._calls = {}
+
+        if self._channel_wheel is not None:
+            self._channel_wheel.clear()
+            self._bridge_wheel.clear()
+            self._next_reap = 0
+
+    @handles('Newchannel')
     def _on_new_channel(self, event):
         """
         NewChannel event is sent when Asterisk creates a new channel.
@@ -178,11 +678,29 @@ class EventHandler(object):
         populated using the data in this event.
 
         Args:
-            event (dict): A NewChannel event.
+            event (Newchannel): A Newchannel event.
         """
-        channel = Channel(event)
+        if self._bounded and not self._make_room(event.linkedid):
+            self._logger.warning(
+                'Ignoring channel {}, no room left.'.format(event.channel))
+            self.evicted['ignored_channels'] += 1
+            return
+
+        channel = Channel(event, self.anomalies)
         self._channels[channel.uniqueid] = channel
 
+        call = self._calls.get(channel.linkedid)
+        if call is None:
+            if event.timestamp is not None:
+                start = float(event.timestamp)
+            else:
+                start = time.time()
+            call = self._calls[channel.linkedid] = Call(
+                channel.linkedid, start)
+
+        call.add_channel(channel)
+
+    @handles('Newstate')
     def _on_new_state(self, event):
         """
         NewState event is sent when the state of a channel changes.
@@ -191,16 +709,17 @@ class EventHandler(object):
         the channel state changes several times.
 
         Args:
-            event (dict): A NewState event.
+            event (Newstate): A Newstate event.
         """
-        channel = self._channels[event['Uniqueid']]
+        channel = self._channels[event.uniqueid]
 
         old_state = channel.state
-        channel.state = int(event['ChannelState'])
+        channel.state = event.channel_state
         assert old_state != channel.state
 
         self.on_state_change(channel, old_state)
 
+    @handles('LocalBridge')
     def _on_local_bridge(self, event):
         """
         A LocalBridge is sent when two local channels are bridge.
@@ -210,30 +729,75 @@ class EventHandler(object):
         created to link both semi-channels together.
 
         Args:
-            event (dict): A LocalBridge event.
+            event (LocalBridge): A LocalBridge event.
         """
-        local_one = self._channels[event['LocalOneUniqueid']]
-        local_two = self._channels[event['LocalTwoUniqueid']]
+        local_one = self._channels[event.local_one_uniqueid]
+        local_two = self._channels[event.local_two_uniqueid]
 
-        assert local_one.fwd_local_bridge is None
-        assert local_one.back_local_bridge is None
-        assert local_two.fwd_local_bridge is None
-        assert local_two.back_local_bridge is None
+        if (local_one.fwd_local_bridge or local_one.back_local_bridge or
+                local_two.fwd_local_bridge or local_two.back_local_bridge):
+            # Asterisk never links a Local channel twice. Count it and
+            # replace the old link, rather than failing on this event.
+            self.anomalies['double_local_bridge'] += 1
+            self._logger.warning(
+                'Local channels were already linked: {!r} {!r}'.format(
+                    local_one, local_two))
+
+            # Unlink the old partners too, so they don't keep pointing at
+            # a semi which is now linked to another one.
+            self._unlink_local_bridge(local_one)
+            self._unlink_local_bridge(local_two)
 
         local_one.fwd_local_bridge = local_two
         local_two.back_local_bridge = local_one
 
+    def _unlink_local_bridge(self, channel):
+        """
+        Remove the local bridges of a Local semi on both sides.
+
+        Args:
+            channel (Channel): The Local semi.
+        """
+        other = channel.fwd_local_bridge
+        if other is not None:
+            channel.fwd_local_bridge = None
+            if other.back_local_bridge is channel:
+                other.back_local_bridge = None
+
+        other = channel.back_local_bridge
+        if other is not None:
+            channel.back_local_bridge = None
+            if other.fwd_local_bridge is channel:
+                other.fwd_local_bridge = None
+
+    @handles('Hangup')
     def _on_hangup(self, event):
         """
         A Hangup event is sent when a channel is hung up.
 
         Args:
-            event (dict): A Hangup event.
+            event (Hangup): A Hangup event.
         """
-        channel = self._channels[event['Uniqueid']]
+        channel = self._channels[event.uniqueid]
 
         self.on_hangup(channel, event)
 
+        self._remove_channel(channel)
+
+        if self._channel_wheel is not None:
+            self._channel_wheel.discard(channel.uniqueid)
+
+        # If we don't have any channels, check if we're completely clean.
+        if not len(self._channels):
+            self._logger.info('(no channels left)')
+
+    def _remove_channel(self, channel):
+        """
+        Remove a channel from our own list and from its call.
+
+        Args:
+            channel (Channel): The channel.
+        """
         # Disconnect all channels linked to this channel.
         if channel.fwd_local_bridge:
             channel.fwd_local_bridge.back_local_bridge = None
@@ -244,10 +808,14 @@ class EventHandler(object):
         # Remove the channel from our own list.
         del self._channels[channel.uniqueid]
 
-        # If we don't have any channels, check if we're completely clean.
-        if not len(self._channels):
-            self._logger.info('(no channels left)')
+        # Remove the call along with its last channel.
+        call = self._calls.get(channel.linkedid)
+        if call is not None:
+            call.remove_channel(channel)
+            if not call:
+                del self._calls[channel.linkedid]
 
+    @handles('DialBegin')
     def _on_dial_begin(self, event):
         """
         A DialBegin event is sent when a dial is created between two channels.
@@ -261,36 +829,39 @@ class EventHandler(object):
         calling channel and it's targets.
 
         Args:
-            event (dict): A DialBegin event.
+            event (DialBegin): A DialBegin event.
         """
-        if 'DestUniqueid' in event:
-            if 'Uniqueid' in event:
+        if event.dest_uniqueid is not None:
+            if event.uniqueid is not None:
                 # This is a dial between two channels. So let's link them
                 # together.
-                channel = self._channels[event['Uniqueid']]
-                destination = self._channels[event['DestUniqueid']]
+                channel = self._channels[event.uniqueid]
+                destination = self._channels[event.dest_uniqueid]
                 channel.is_calling = True
 
                 # Verify target is not being dialed already.
-                assert not destination.back_dial
+                if destination.back_dial:
+                    self.anomalies['double_dial'] += 1
+                    self._logger.warning(
+                        'Channel {!r} was already dialed by {!r}'.format(
+                            destination, destination.back_dial))
+                    destination.back_dial.remove_dial(destination)
 
-                # _fwd_dials is a list of channels being dialed by A.
-                channel.fwd_dials.append(destination)
-
-                # _back_dial is the channel dialing B.
-                destination.back_dial = channel
+                # Link A's fwd_dials and B's back_dial.
+                channel.add_dial(destination)
 
                 self.on_dial_begin(channel, destination)
             else:
                 # The dial has a destination but not source. That means this
                 # Dial was created by an Originate.
-                destination = self._channels[event['DestUniqueid']]
+                destination = self._channels[event.dest_uniqueid]
                 destination.is_originated = True
         else:
             raise AssertionError(
                 'A DialBegin event was generated without DestUniqueid: '
                 '{}'.format(event))
 
+    @handles('DialEnd')
     def _on_dial_end(self, event):
         """
         DialEnd event is sent when a dial is disconnected between two channels.
@@ -301,146 +872,169 @@ class EventHandler(object):
         connect the Channels.
 
         Args:
-            event (dict): A DialEnd event.
+            event (DialEnd): A DialEnd event.
         """
         # Check if we have a source and destination channel to pull
         # apart. Originate creates Dials without source.
-        if 'Uniqueid' in event and 'DestUniqueid' in event:
-            channel = self._channels[event['Uniqueid']]
-            destination = self._channels[event['DestUniqueid']]
-
-            if "b_dial_sent" in destination.custom:
-                self.on_b_dial_end(destination, event['DialStatus'])
+        if event.uniqueid is not None and event.dest_uniqueid is not None:
+            channel = self._channels[event.uniqueid]
+            destination = self._channels[event.dest_uniqueid]
 
-            if destination in channel.fwd_dials:
-                channel.fwd_dials.remove(destination)
+            if destination.flags & FLAG_B_DIAL_SENT:
+                self.on_b_dial_end(destination, event.dial_status)
 
-            destination.back_dial = None
+            channel.remove_dial(destination)
         else:
             # Dials without Uniqueid and DestUniqueid can occur, but we
             # can't/don't handle them.
             pass
 
+    @handles('AttendedTransfer')
     def _on_attended_transfer(self, event):
         """
         An AttendedTransfer event is sent after attended and blonde transfers.
 
         Args:
-            event (dict): An AttendedTransfer event.
+            event (AttendedTransfer): An AttendedTransfer event.
         """
-        orig_transferer = self._channels[event['OrigTransfererUniqueid']]
+        orig_transferer = self._channels[event.orig_transferer_uniqueid]
         second_transferer = self._channels[
-            event['SecondTransfererUniqueid']]
+            event.second_transferer_uniqueid]
 
-        if event['DestType'] == 'Bridge':
+        if event.dest_type == 'Bridge':
             self.on_attended_transfer(
                 orig_transferer, second_transferer, event)
-        elif event['DestType'] == 'App' and event['DestApp'] == 'Dial':
+        elif event.dest_type == 'App' and event.dest_app == 'Dial':
             self.on_blonde_transfer(
                 orig_transferer, second_transferer, event)
         else:
-            raise UnknownAttendedTransferTypeException(event, event.get('DestType'), event.get('DestApp'))
+            raise UnknownAttendedTransferTypeException(event, event.dest_type, event.dest_app)
 
+    @handles('BlindTransfer')
     def _on_blind_transfer(self, event):
         """
         A BlindTransfer event is sent after blind transfers.
 
         Args:
-            event (dict): A BlindTransfer event.
+            event (BlindTransfer): A BlindTransfer event.
         """
-        transferer = self._channels[event['TransfererUniqueid']]
-        transferee = self._channels[event['TransfereeUniqueid']]
+        transferer = self._channels[event.transferer_uniqueid]
+        transferee = self._channels[event.transferee_uniqueid]
 
         self.on_blind_transfer(transferer, transferee, event)
 
+    @handles('BridgeCreate')
     def _on_bridge_create(self, event):
         """
         A BridgeCreate event is sent when Asterisk creates a new bridge.
 
         Args:
-            event (dict): A BridgeCreate event.
+            event (BridgeCreate): A BridgeCreate event.
         """
-        assert event['BridgeUniqueid'] not in self._bridges
+        assert event.bridge_uniqueid not in self._bridges
         bridge = Bridge(event)
         self._bridges[bridge.uniqueid] = bridge
 
+    @handles('BridgeEnter')
     def _on_bridge_enter(self, event):
         """
         A BridgeEnter event is sent when a channel joins a bridge.
 
         Args:
-            event (dict): A BridgeEnter event.
+            event (BridgeEnter): A BridgeEnter event.
         """
-        channel = self._channels[event['Uniqueid']]
-        bridge = self._bridges[event['BridgeUniqueid']]
+        channel = self._channels[event.uniqueid]
+        bridge = self._bridges[event.bridge_uniqueid]
 
-        bridge.peers.add(channel)
-        channel.bridge = bridge
+        bridge.add_peer(channel)
+
+        call = self._calls.get(channel.linkedid)
+        if call is not None:
+            call.enter_bridge(bridge)
 
         self.on_bridge_enter(channel, bridge)
 
+    @handles('BridgeLeave')
     def _on_bridge_leave(self, event):
         """
         A BridgeLeave event is sent when a channel is removed from a bridge.
 
         Args:
-            event (dict): A BridgeLeave event.
+            event (BridgeLeave): A BridgeLeave event.
         """
-        channel = self._channels[event['Uniqueid']]
-        bridge = self._bridges[event['BridgeUniqueid']]
+        channel = self._channels[event.uniqueid]
+        bridge = self._bridges[event.bridge_uniqueid]
 
-        bridge.peers.remove(channel)
-        channel.bridge = None
+        if channel not in bridge.peers:
+            # The BridgeEnter got lost. Count it, rather than failing on
+            # this event.
+            self.anomalies['bridge_leave_unknown'] += 1
+            self._logger.warning(
+                'Channel {!r} left bridge {!r} without entering it'.format(
+                    channel, bridge))
 
+        bridge.remove_peer(channel)
+
+        call = self._calls.get(channel.linkedid)
+        if call is not None:
+            call.leave_bridge(bridge)
+
+    @handles('BridgeDestroy')
     def _on_bridge_destroy(self, event):
         """
         A BridgeDestroy event is sent when a bridge is removed by Asterisk.
 
         Args:
-            event (dict): A BridgeDestroy event.
+            event (BridgeDestroy): A BridgeDestroy event.
         """
-        assert len(self._bridges[event['BridgeUniqueid']]) == 0
-        del self._bridges[event['BridgeUniqueid']]
+        assert len(self._bridges[event.bridge_uniqueid]) == 0
+        del self._bridges[event.bridge_uniqueid]
+
+        if self._bridge_wheel is not None:
+            self._bridge_wheel.discard(event.bridge_uniqueid)
 
+    @handles('NewCallerid')
     def _on_new_callerid(self, event):
         """
         A NewCallerid event is sent when the CallerID of a channel changes.
 
         Args:
-            event (dict): A NewCallerid event.
+            event (NewCallerid): A NewCallerid event.
         """
-        channel = self._channels[event['Uniqueid']]
+        channel = self._channels[event.uniqueid]
 
         channel.caller_id = channel.caller_id.replace(
-            name=event['CallerIDName'],
-            num=event['CallerIDNum'],
+            name=event.caller_id_name,
+            num=event.caller_id_num,
         )
-        channel.cid_calling_pres = event['CID-CallingPres']
+        channel.cid_calling_pres = event.cid_calling_pres
 
+    @handles('NewConnectedLine')
     def _on_new_connected_line(self, event):
         """
         A NewConnectedLine event is sent when the ConnectedLine changes.
 
         Args:
-            event (dict): A NewConnectedLine event.
+            event (NewConnectedLine): A NewConnectedLine event.
         """
-        channel = self._channels[event['Uniqueid']]
+        channel = self._channels[event.uniqueid]
 
         channel.connected_line = channel.connected_line.replace(
-            name=event['ConnectedLineName'],
-            num=event['ConnectedLineNum'],
+            name=event.connected_line_name,
+            num=event.connected_line_num,
         )
 
+    @handles('NewAccountCode')
     def _on_new_accountcode(self, event):
         """
         A NewAccountCode is sent when the AccountCode of a channel changes.
 
         Args:
-            event (dict): A NewAccountCode event.
+            event (NewAccountCode): A NewAccountCode event.
         """
-        channel = self._channels[event['Uniqueid']]
+        channel = self._channels[event.uniqueid]
 
-        channel.account_code = event['AccountCode']
+        channel.account_code = event.account_code
 
     # ===================================================================
     # Actual event handlers you can override
@@ -548,30 +1142,31 @@ class EventHandler(object):
         Args:
             channel (Channel): The channel being dialed.
         """
-        if 'ignore_b_dial' in channel.custom:
+        if channel.flags & FLAG_IGNORE_B_DIAL:
             # Notifications were already sent for this channel.
             # Unset the flag and move on.
-            del (channel.custom['ignore_b_dial'])
+            channel.flags &= ~FLAG_IGNORE_B_DIAL
             return
 
         a_chan = channel.get_dialing_channel()
 
-        if 'raw_blind_transfer' in a_chan.custom:
+        if a_chan.blind_transferer is not None:
             # This is an interesting exception: we got a Blind Transfer
             # message earlier and recorded it in this attribute. We'll
             # translate this b_dial to first a on_b_dial and then the
             # on_transfer event.
-            transferer = a_chan.custom.pop('raw_blind_transfer')
+            transferer = a_chan.blind_transferer
+            a_chan.blind_transferer = None
 
-            target_chans = a_chan.get_dialed_channels()
+            target_chans = list(a_chan.dialed_channels)
 
             for target in target_chans:
-                target.custom['b_dial_sent'] = True
+                target.flags |= FLAG_B_DIAL_SENT
                 # To prevent notifications from being sent multiple times,
                 # we set a flag on all other channels except for the one
                 # starting to ring right now.
                 if target != channel:
-                    target.custom['ignore_b_dial'] = True
+                    target.flags |= FLAG_IGNORE_B_DIAL
 
             self._reporter.on_blind_transfer(
                 caller=a_chan.as_namedtuple(),
@@ -597,7 +1192,7 @@ class EventHandler(object):
 
             if len(a_chans) > 0:
                 a_chan = a_chans[0]
-                called_exten = originating_chan.fwd_dials[0].exten
+                called_exten = next(iter(originating_chan.fwd_dials)).exten
                 a_chan.exten = called_exten
                 a_chan.is_calling = True
 
@@ -606,7 +1201,7 @@ class EventHandler(object):
                         'Caller (Originate) did not have an extension: '
                         '{}'.format(channel))
 
-                channel.custom['b_dial_sent'] = True
+                channel.flags |= FLAG_B_DIAL_SENT
 
                 self._reporter.on_b_dial(
                     caller=a_chan.as_namedtuple(),
@@ -615,12 +1210,12 @@ class EventHandler(object):
         elif not a_chan.is_local:
             # We'll want to send one ringing event for all targets, so send
             # one notification and mark the rest as already notified.
-            open_dials = a_chan.get_dialed_channels()
+            open_dials = a_chan.dialed_channels
             ringing_dials = [
                 dial
                 for dial in open_dials
                 if dial.state == AST_STATE_RINGING
-                and "ignore_b_dial" not in dial.custom
+                and not dial.flags & FLAG_IGNORE_B_DIAL
             ]
             targets = [dial.as_namedtuple() for dial in ringing_dials]
 
@@ -647,8 +1242,7 @@ class EventHandler(object):
             for b_chan in ringing_dials:
                 # To prevent notifications from being sent multiple
                 # times, we set a flag on all communicated channels.
-                b_chan.custom['ignore_b_dial'] = True
-                b_chan.custom['b_dial_sent'] = True
+                b_chan.flags |= FLAG_IGNORE_B_DIAL | FLAG_B_DIAL_SENT
 
     def on_bridge_enter(self, channel, bridge):
         """
@@ -680,7 +1274,7 @@ class EventHandler(object):
 
             # Our oldest caller is going to be the new caller.
             sorted_callers = sorted(
-                callers, key=lambda chan: chan.name.rsplit('-', 1)[1])
+                callers, key=lambda chan: chan.sequence or 0)
             caller = sorted_callers.pop(0)
 
             # The rest are will be marked as targets.
@@ -704,8 +1298,8 @@ class EventHandler(object):
             target = next(iter(targets))
 
         # Check and set a flag to prevent the event from being fired again.
-        if 'is_picked_up' not in caller.custom:
-            caller.custom['is_picked_up'] = True
+        if not caller.flags & FLAG_IS_PICKED_UP:
+            caller.flags |= FLAG_IS_PICKED_UP
 
             self._reporter.on_up(
                 caller=caller.as_namedtuple(),
@@ -728,19 +1322,22 @@ class EventHandler(object):
             second_transferer (Channel): The target channel is the channel
             which the redirector used to set up the call to the person to
             whom the call is being transferred.
-            event (dict): The data of the AttendedTransfer event.
+            event (AttendedTransfer): The AttendedTransfer event.
         """
-        if 'TransfereeUniqueid' in event and 'TransferTargetUniqueid' in event:
+        if (
+                event.transferee_uniqueid is not None and
+                event.transfer_target_uniqueid is not None
+        ):
             # Nice, Asterisk just told us who the transferee and transfer
             # target are. Let's just do what Asterisk says.
-            transferee = self._channels[event['TransfereeUniqueid']]
-            target = self._channels[event['TransferTargetUniqueid']]
+            transferee = self._channels[event.transferee_uniqueid]
+            target = self._channels[event.transfer_target_uniqueid]
         else:
             # Ouch, Asterisk didn't tell us who is the transferee and who is
             #  the target, which means we need to figure it out ourselves.
 
             # We can find both channels in the Destination Bridge.
-            target_bridge = self._bridges[event['DestBridgeUniqueid']]
+            target_bridge = self._bridges[event.dest_bridge_uniqueid]
 
             if len(target_bridge) < 2:
                 self._logger.warning(
@@ -752,12 +1349,12 @@ class EventHandler(object):
 
             # The next challenge now is to figure out which channel is the
             # transferee and which one is the target..
-            if peer_one.linkedid == event['OrigTransfererLinkedid']:
+            if peer_one.linkedid == event.orig_transferer_linkedid:
                 # Peer one has the same linkedid as the call before the
                 # transfer, so it must be the transferee.
                 transferee = peer_one
                 target = peer_two
-            elif peer_two.linkedid == event['OrigTransfererLinkedid']:
+            elif peer_two.linkedid == event.orig_transferer_linkedid:
                 transferee = peer_two
                 target = peer_one
             else:
@@ -783,12 +1380,12 @@ class EventHandler(object):
         transferee.is_calling = True
         # transferee becomes the new caller, so it should have a valid
         # extension. We can use set it to one of the transfer extensions.
-        if event['SecondTransfererExten']:
-            transferee.exten = event['SecondTransfererExten']
-        elif event['OrigTransfererExten']:
-            transferee.exten = event['OrigTransfererExten']
+        if event.second_transferer_exten:
+            transferee.exten = event.second_transferer_exten
+        elif event.orig_transferer_exten:
+            transferee.exten = event.orig_transferer_exten
         else:
-            transferee.exten = event['TransferTargetCallerIDNum']
+            transferee.exten = event.transfer_target_caller_id_num
 
         if not transferee.has_extension:
             self._logger.error(
@@ -806,8 +1403,8 @@ class EventHandler(object):
         )
 
         # Prevent a hangup event from being fired for the transfer channels.
-        orig_transferer.custom['ignore_a_hangup'] = True
-        second_transferer.custom['ignore_a_hangup'] = True
+        orig_transferer.flags |= FLAG_IGNORE_A_HANGUP
+        second_transferer.flags |= FLAG_IGNORE_A_HANGUP
 
     def on_blind_transfer(self, transferer, transferee, event):
         """
@@ -828,25 +1425,22 @@ class EventHandler(object):
         Args:
             transferer (Channel): The channel referring to another extension.
             transferee (Channel): The channel being referred.
-            event (dict): The data of the BlindTransfer event.
+            event (BlindTransfer): The BlindTransfer event.
         """
-        transferee.custom['raw_blind_transfer'] = transferer
+        transferee.blind_transferer = transferer
 
         # Remove the is_picked_up flag so we can figure a new in-progress
         # event when the transfer target picks up.
-        try:
-            del transferee.custom['is_picked_up']
-        except KeyError:
-            pass
+        transferee.flags &= ~FLAG_IS_PICKED_UP
 
         # Prevent a hangup event from being fired for the transfer channels.
-        transferer.custom['ignore_a_hangup'] = True
+        transferer.flags |= FLAG_IGNORE_A_HANGUP
 
         # Make it look like the transferee is calling the transfer extension.
         transferee.is_calling = True
 
-        transferee.exten = event['Extension']
-        transferer.exten = event['Extension']
+        transferee.exten = event.extension
+        transferer.exten = event.extension
 
     def on_blonde_transfer(self, orig_transferer, second_transferer, event):
         """
@@ -865,16 +1459,13 @@ class EventHandler(object):
             second_transferer (Channel): The target channel is the channel
             which the redirector used to set up the call to the person to
             whom the call is being transferred.
-            event (dict): The AttendedTransfer event.
+            event (AttendedTransfer): The AttendedTransfer event.
         """
-        transferee = self._channels[event['TransfereeUniqueid']]
+        transferee = self._channels[event.transferee_uniqueid]
 
         # Remove the is_picked_up flag so we can figure a new in-progress
         # event when the transfer target picks up.
-        try:
-            del transferee.custom['is_picked_up']
-        except KeyError:
-            pass
+        transferee.flags &= ~FLAG_IS_PICKED_UP
 
         # Make it look like the transferee is calling the transfer extension.
         transferee.is_calling = True
@@ -885,8 +1476,8 @@ class EventHandler(object):
                 'Transferee (blonde xfer) did not have an extension: '
                 '{}'.format(transferee))
 
-        targets = second_transferer.get_dialed_channels().union(
-            transferee.get_dialed_channels())
+        targets = (
+            second_transferer.dialed_channels | transferee.dialed_channels)
 
         self._reporter.on_blonde_transfer(
             caller=transferee.as_namedtuple(),
@@ -895,9 +1486,10 @@ class EventHandler(object):
         )
 
         # Prevent a hangup event from being fired for the transfer channels.
-        orig_transferer.custom['ignore_a_hangup'] = True
-        second_transferer.custom['ignore_a_hangup'] = True
+        orig_transferer.flags |= FLAG_IGNORE_A_HANGUP
+        second_transferer.flags |= FLAG_IGNORE_A_HANGUP
 
+    @handles('UserEvent')
     def on_user_event(self, event):
         """
         Handle custom UserEvent messages from Asterisk.
@@ -907,9 +1499,10 @@ class EventHandler(object):
         parameters used for processing the events and more.
 
         Args:
-            event (dict): Dict-like object with all attributes of the event.
+            event (UserEvent): The UserEvent, with all fields of the event.
         """
-        self._reporter.on_user_event(self._channels[event['Uniqueid']].as_namedtuple(), event)
+        raw = event if event.raw is None else event.raw
+        self._reporter.on_user_event(self._channels[event.uniqueid].as_namedtuple(), raw)
 
     def on_hangup(self, channel, event):
         """
@@ -917,19 +1510,20 @@ class EventHandler(object):
 
         Args:
             channel (Channel): The channel being disconnected.
-            event (dict): The Hangup event data.
+            event (Hangup): The Hangup event.
         """
         if channel.is_local:
             return
 
-        if 'raw_blind_transfer' in channel.custom:
+        if channel.blind_transferer is not None:
             # Panic! This channel had a blind transfer coming up but it's
             # being hung up! That probably means the blind transfer target
             # could not be reached.
             # Ideally, we would simulate a full blind transfer having been
             # completed but hung up with an error. However, no channel
             # to the third party has been created.
-            redirector = channel.custom.pop('raw_blind_transfer')
+            redirector = channel.blind_transferer
+            channel.blind_transferer = None
 
             a_chan = redirector if redirector.is_calling else channel
 
@@ -939,7 +1533,7 @@ class EventHandler(object):
                 reason='completed',
             )
 
-        elif 'ignore_a_hangup' in channel.custom:
+        elif channel.flags & FLAG_IGNORE_A_HANGUP:
             # This is a calling channel which performed an attended
             # transfer. Because the call has already been "hung up"
             # with the transfer, we shouldn't send a hangup notification.
@@ -959,9 +1553,9 @@ class EventHandler(object):
 
         Args:
             channel (Channel): The channel which is hung up.
-            event (Event): The data of the event.
+            event (Hangup): The Hangup event.
         """
-        hangup_cause = int(event['Cause'])
+        hangup_cause = event.cause
 
         # See https://wiki.asterisk.org/wiki/display/AST/Hangup+Cause+Mappings
         if hangup_cause == AST_CAUSE_NORMAL_CLEARING:
@@ -990,3 +1584,6 @@ class EventHandler(object):
                 return 'cancelled'
         else:
             return 'failed'
+
+
+EventHandler._register_handlers()
@@ -1,18 +1,93 @@
+import datetime
 import logging
+import time
+
+
+def datetime_from_timestamp(timestamp):
+    """
+    Convert a Unix timestamp to a datetime.
+
+    Args:
+        timestamp (str): Seconds since the epoch, like the Timestamp of an
+            AMI event, or a float.
+
+    Returns:
+        datetime.datetime: A timezone-aware datetime in UTC.
+    """
+    return datetime.datetime.fromtimestamp(
+        float(timestamp), tz=datetime.timezone.utc)
 
 
 class BaseReporter(object):
-    timestamp = None
+    # Whether the reporter reads self.timestamp. If not, the EventHandler
+    # does not bother passing the timestamps of events to the reporter.
+    USES_TIMESTAMP = True
+
+    # Whether the reporter wants the events of a batch in one on_events()
+    # call, after the whole batch has been processed, instead of an
+    # on_event() call after each event. See EventHandler.on_events().
+    BATCH_EVENTS = False
+
+    # The fields of the raw AMI events this reporter needs, as a dict with
+    # event names as keys and tuples of field names (or None for all fields)
+    # as values. None means the reporter needs all fields of all events. If
+    # the reporter declares its needs, the EventHandler drops the fields
+    # nobody uses from the events, see EventHandler.project().
+    EVENT_FIELDS = None
+
+    _timestamp = None
+    _raw_timestamp = None
+
+    @property
+    def timestamp(self):
+        """
+        The time of the current event.
+
+        The datetime is only created when the timestamp is read, see
+        set_event_timestamp().
+
+        Returns:
+            datetime.datetime: The timestamp, or None if it was not set.
+        """
+        if self._timestamp is None and self._raw_timestamp is not None:
+            self._timestamp = datetime_from_timestamp(self._raw_timestamp)
+
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, timestamp):
+        self._timestamp = timestamp
+        self._raw_timestamp = None
 
     def set_timestamp(self, timestamp):
         """
         Set the timestamp for this reporter.
 
         Args:
-            timestamp (int): The timestamp to set.
+            timestamp (datetime.datetime): The timestamp to set.
         """
         self.timestamp = timestamp
 
+    def set_event_timestamp(self, timestamp):
+        """
+        Set the timestamp of the current event, without converting it yet.
+
+        Reporters which override set_timestamp() still get a datetime for
+        every event.
+
+        Args:
+            timestamp (str): The Timestamp of the event, or None to use the
+                current time.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        if type(self).set_timestamp is not BaseReporter.set_timestamp:
+            self.set_timestamp(datetime_from_timestamp(timestamp))
+        else:
+            self._timestamp = None
+            self._raw_timestamp = timestamp
+
     def close(self):
         """
         Called on end, so any buffered output can be flushed.
@@ -27,10 +102,23 @@ class BaseReporter(object):
         regular event processing.
 
         Args:
-            event (Message): Dict-like object with all attributes in the event.
+            event (Event): Dict-like object with all attributes in the event.
         """
         pass
 
+    def on_events(self, events):
+        """
+        Called after a batch of events has been processed.
+
+        Only used instead of on_event() if BATCH_EVENTS is set. Events which
+        are not part of a batch are passed as a batch of one.
+
+        Args:
+            events (list): The events of the batch.
+        """
+        for event in events:
+            self.on_event(event)
+
     def on_b_dial(self, caller, targets):
         """
         Gets invoked when the B side of a call is initiated.
@@ -127,7 +215,7 @@ class BaseReporter(object):
         parameters used for processing the events and more.
 
         Args:
-            event (Message): Dict-like object with all attributes in the event.
+            event (Event): Dict-like object with all attributes in the event.
         """
         pass
 
@@ -179,7 +267,7 @@ class LoggingReporter(BaseReporter):
         regular event processing.
 
         Args:
-            event (Message): Dict-like object with all attributes in the event.
+            event (Event): Dict-like object with all attributes in the event.
         """
         pass
 
@@ -289,7 +377,7 @@ class LoggingReporter(BaseReporter):
         parameters used for processing the events and more.
 
         Args:
-            event (Message): Dict-like object with all attributes in the event.
+            event (Event): Dict-like object with all attributes in the event.
         """
         self._logger.info('{} user_event: {}'.format(event['Linkedid'], event))
 
@@ -322,12 +410,67 @@ class MultiReporter(LoggingReporter):
 
         self.reporters = reporters
 
+    @property
+    def EVENT_FIELDS(self):
+        """
+        Combine the EVENT_FIELDS of all reporters.
+
+        Returns:
+            dict: The fields needed by any of the reporters, or None if one
+            of them needs all fields.
+        """
+        event_fields = {}
+
+        for reporter in self.reporters:
+            reporter_fields = getattr(reporter, 'EVENT_FIELDS', None)
+            if reporter_fields is None:
+                return None
+
+            for event_name, fields in reporter_fields.items():
+                if fields is None or (
+                        event_name in event_fields and
+                        event_fields[event_name] is None
+                ):
+                    event_fields[event_name] = None
+                else:
+                    event_fields[event_name] = tuple(
+                        event_fields.get(event_name, ())) + tuple(fields)
+
+        return event_fields
+
+    @property
+    def USES_TIMESTAMP(self):
+        """
+        Check whether any of the reporters reads the timestamp.
+
+        Returns:
+            bool: True if one of the reporters uses the timestamp.
+        """
+        return any(getattr(reporter, 'USES_TIMESTAMP', True)
+                   for reporter in self.reporters)
+
     def set_timestamp(self, timestamp):
         super(MultiReporter, self).set_timestamp(timestamp)
 
         for reporter in self.reporters:
             reporter.set_timestamp(timestamp)
 
+    def set_event_timestamp(self, timestamp):
+        if timestamp is None:
+            # Make sure all reporters get the same time.
+            timestamp = time.time()
+
+        self._timestamp = None
+        self._raw_timestamp = timestamp
+
+        for reporter in self.reporters:
+            # Like the EventHandler, fall back to set_timestamp() for
+            # reporters which are not based on BaseReporter.
+            if hasattr(reporter, 'set_event_timestamp'):
+                reporter.set_event_timestamp(timestamp)
+            else:
+                reporter.set_timestamp(self.timestamp)
+
     def close(self):
         super(MultiReporter, self).close()
 
@@ -338,7 +481,11 @@ class MultiReporter(LoggingReporter):
         super(MultiReporter, self).on_event(event)
 
         for reporter in self.reporters:
-            reporter.on_event(event)
+            # Only a real True, as a mock has every attribute.
+            if getattr(reporter, 'BATCH_EVENTS', False) is True:
+                reporter.on_events([event])
+            else:
+                reporter.on_event(event)
 
     def on_user_event(self, caller, event):
         super(MultiReporter, self).on_user_event(caller, event)
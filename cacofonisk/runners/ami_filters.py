@@ -0,0 +1,114 @@
+"""
+Let Asterisk drop the events the EventHandler does not handle.
+
+By default, Asterisk sends every event to every AMI client, including the
+VarSet and Newexten events which make up most of the traffic. With AMI
+filters, Asterisk only sends events matching one of the filters. Filters can
+be added per session with the Filter action (the AmiRunner does this after
+every login), or configured for an AMI user in manager.conf::
+
+    [cacofonisk]
+    eventfilter=Event: Newchannel
+    eventfilter=Event: Newstate
+    ...
+
+The lines for the default EventHandler can be printed with::
+
+    print('\\n'.join(manager_conf_filters(EventHandler.event_handlers())))
+
+The event mask (the Events parameter of the Login action) is coarser: it
+selects classes of events, like 'call' or 'dialplan'. It is cheaper for
+Asterisk than a filter, but can only be used if the class of each event is
+known.
+
+Filters are regular expressions which are matched against the whole event,
+so 'Event: Hangup' also lets HangupRequest events through. The runners still
+check the names of the events they receive.
+"""
+
+# The class of the events EventHandler handles, as used in the event mask.
+EVENT_MASK_CLASSES = {
+    'FullyBooted': 'system',
+    'Newchannel': 'call',
+    'Newstate': 'call',
+    'LocalBridge': 'call',
+    'Hangup': 'call',
+    'DialBegin': 'call',
+    'DialEnd': 'call',
+    'NewCallerid': 'call',
+    'NewAccountCode': 'call',
+    'NewConnectedLine': 'call',
+    'AttendedTransfer': 'call',
+    'BlindTransfer': 'call',
+    'BridgeCreate': 'call',
+    'BridgeEnter': 'call',
+    'BridgeLeave': 'call',
+    'BridgeDestroy': 'call',
+    'UserEvent': 'user',
+    'QueueCallerAbandon': 'agent',
+}
+
+
+def event_filter(event_name):
+    """
+    Get the filter which lets the events with the given name through.
+
+    Args:
+        event_name (str): The name of the event.
+
+    Returns:
+        str: The filter.
+    """
+    return 'Event: {}'.format(event_name)
+
+
+def filter_actions(event_names):
+    """
+    Get the Filter actions which only let the given events through.
+
+    Args:
+        event_names (iterable): The names of the events to receive.
+
+    Returns:
+        list: A list of Filter actions (dicts).
+    """
+    return [{
+        'Action': 'Filter',
+        'Operation': 'Add',
+        'Filter': event_filter(event_name),
+    } for event_name in sorted(event_names)]
+
+
+def manager_conf_filters(event_names):
+    """
+    Get the manager.conf lines which only let the given events through.
+
+    Args:
+        event_names (iterable): The names of the events to receive.
+
+    Returns:
+        list: A list of eventfilter lines for an AMI user in manager.conf.
+    """
+    return ['eventfilter={}'.format(event_filter(event_name))
+            for event_name in sorted(event_names)]
+
+
+def event_mask(event_names):
+    """
+    Get the event mask which includes the given events.
+
+    Args:
+        event_names (iterable): The names of the events to receive.
+
+    Returns:
+        str: The value of the Events parameter of the Login action, or 'on'
+        if the class of one of the events is not known.
+    """
+    classes = set()
+
+    for event_name in event_names:
+        if event_name not in EVENT_MASK_CLASSES:
+            return 'on'
+        classes.add(EVENT_MASK_CLASSES[event_name])
+
+    return ','.join(sorted(classes)) or 'off'
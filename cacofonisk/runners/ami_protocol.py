@@ -0,0 +1,369 @@
+"""
+A minimal asyncio AMI client, as an alternative to Panoramisk.
+
+AMI messages are blocks of ``Key: Value`` lines, terminated by an empty
+line. The AmiProtocol splits the incoming data into messages and parses them
+straight into plain dicts. All complete events of a read are handed to the
+client callback at once, before the next read.
+
+The AmiClient takes care of logging in, sending actions and reconnecting
+when the connection is lost. It sends a Ping every now and then, so a
+connection which silently died is noticed as well. See NativeAmiRunner for
+a Runner using it.
+"""
+import asyncio
+import itertools
+import logging
+
+EOL = b'\r\n'
+EOM = EOL + EOL
+BANNER = b'Asterisk Call Manager/'
+
+
+def parse_message(text):
+    """
+    Parse a single AMI message.
+
+    Lines without a key, like the output of a Command action, are joined in
+    the 'content' key. Repeated keys are collected in a list.
+
+    Args:
+        text (str): The lines of the message, without the empty line.
+
+    Returns:
+        dict: The message.
+    """
+    message = {}
+    content = []
+
+    for line in text.split('\r\n'):
+        key, sep, value = line.partition(': ')
+
+        if not sep:
+            if line.endswith(':'):
+                key, value = line[:-1], ''
+            elif line:
+                content.append(line)
+                continue
+            else:
+                continue
+
+        if key in message:
+            previous = message[key]
+            if type(previous) is list:
+                previous.append(value)
+            else:
+                message[key] = [previous, value]
+        else:
+            message[key] = value
+
+    if content:
+        message['content'] = '\n'.join(content)
+
+    return message
+
+
+def encode_message(message):
+    """
+    Encode a message, like an action to send to Asterisk.
+
+    Args:
+        message (dict): The message, like an action with an 'Action' key.
+
+    Returns:
+        bytes: The encoded message.
+    """
+    lines = []
+
+    for key, value in message.items():
+        if type(value) in (list, tuple):
+            lines.extend('{}: {}'.format(key, item) for item in value)
+        else:
+            lines.append('{}: {}'.format(key, value))
+
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8')
+
+
+class AmiProtocol(asyncio.Protocol):
+    """
+    Split the AMI stream into messages and pass them to the AmiClient.
+    """
+
+    def __init__(self, client):
+        """
+        Create a protocol instance for a single connection.
+
+        Args:
+            client (AmiClient): The client which receives the messages.
+        """
+        self.client = client
+        self.transport = None
+        self.version = None
+        self._buffer = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.client.connection_made(self)
+
+    def connection_lost(self, exc):
+        self.client.connection_lost(self, exc)
+
+    def data_received(self, data):
+        if self._buffer:
+            data = self._buffer + data
+
+        if self.version is None:
+            # The banner is the only line not followed by an empty line.
+            if EOL not in data:
+                self._buffer = data
+                return
+
+            if data.startswith(BANNER):
+                banner, _, data = data.partition(EOL)
+                self.version = banner[len(BANNER):].decode('utf-8', 'replace')
+            else:
+                self.version = ''
+
+        messages = data.split(EOM)
+        self._buffer = messages.pop()
+
+        events = []
+
+        for message in messages:
+            message = parse_message(
+                message.decode('utf-8', 'replace').strip('\r\n'))
+
+            if 'Event' in message:
+                events.append(message)
+            elif 'Response' in message:
+                self.client.response_received(message)
+
+        if events:
+            self.client.events_received(events)
+
+    def send(self, action):
+        """
+        Send an encoded action.
+
+        Args:
+            action (dict): The action to send.
+        """
+        self.transport.write(encode_message(action))
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+    def abort(self):
+        """
+        Close the connection without waiting for the data to be sent.
+        """
+        if self.transport:
+            self.transport.abort()
+
+
+class AmiClient(object):
+    """
+    Connect to Asterisk, log in and pass events to a callback.
+    """
+
+    def __init__(self, host, port, username, secret, on_events, ssl=False,
+                 events='on', on_login=None, reconnect_timeout=2,
+                 ping_delay=10, ping_timeout=5, loop=None, logger=None):
+        """
+        Create a client. Call connect() to connect to Asterisk.
+
+        Args:
+            host (str): The hostname of Asterisk.
+            port (int): The AMI port.
+            username (str): The AMI username.
+            secret (str): The AMI password.
+            on_events (callable): Gets called with the client and a list of
+                events for every batch of events which comes in.
+            ssl (bool): Whether to use an SSL connection.
+            events (str): The Events parameter of the Login action.
+            on_login (callable): Gets called with the client after every
+                successful login.
+            reconnect_timeout (float): Seconds to wait before reconnecting.
+            ping_delay (float): Seconds between Pings, or None to not send
+                Pings.
+            ping_timeout (float): Seconds to wait for the response to the
+                Login or a Ping, before the connection is considered dead.
+            loop (AbstractEventLoop): The event loop to run on.
+            logger (Logger): The logger to use.
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.secret = secret
+        self.on_events = on_events
+        self.ssl = ssl
+        self.events = events
+        self.on_login = on_login
+        self.reconnect_timeout = reconnect_timeout
+        self.ping_delay = ping_delay
+        self.ping_timeout = ping_timeout
+        self.loop = loop or asyncio.get_event_loop()
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.protocol = None
+        self.authenticated = False
+        self._closed = False
+        self._responses = {}
+        self._action_ids = itertools.count(1)
+        # The timer for the next Ping, or for the response to the Login or
+        # the last Ping.
+        self._ping_handle = None
+
+    def connect(self):
+        """
+        Connect to Asterisk, retrying until the connection succeeds.
+        """
+        self._closed = False
+        return self.loop.create_task(self._connect())
+
+    async def _connect(self):
+        try:
+            await self.loop.create_connection(
+                lambda: AmiProtocol(self), self.host, self.port,
+                ssl=self.ssl or None)
+        except OSError as e:
+            self.logger.warning('Could not connect to {}:{}: {}'.format(
+                self.host, self.port, e))
+            self._reconnect()
+
+    def _reconnect(self):
+        if not self._closed:
+            self.loop.call_later(self.reconnect_timeout, self._retry)
+
+    def _retry(self):
+        # The client may have been closed while waiting.
+        if not self._closed:
+            self.loop.create_task(self._connect())
+
+    def connection_made(self, protocol):
+        self.protocol = protocol
+        self.authenticated = False
+
+        login = self.send_action({
+            'Action': 'Login',
+            'Username': self.username,
+            'Secret': self.secret,
+            'Events': self.events,
+        })
+        login.add_done_callback(self._on_login_response)
+        self._start_timeout(protocol)
+
+    def _on_login_response(self, future):
+        if future.cancelled():
+            return
+
+        self._cancel_ping()
+
+        response = future.result()
+
+        if response.get('Response') == 'Success':
+            self.authenticated = True
+            self.logger.info('Logged in to {}'.format(self.host))
+            if self.on_login:
+                self.on_login(self)
+            self._schedule_ping()
+        else:
+            self.logger.error('Login to {} failed: {}'.format(
+                self.host, response.get('Message')))
+            self.close()
+
+    def _schedule_ping(self):
+        if self.ping_delay:
+            self._ping_handle = self.loop.call_later(
+                self.ping_delay, self._ping)
+
+    def _ping(self):
+        protocol = self.protocol
+        if protocol is None or not self.authenticated:
+            return
+
+        ping = self.send_action({'Action': 'Ping'})
+        ping.add_done_callback(self._on_ping_response)
+        self._start_timeout(protocol)
+
+    def _on_ping_response(self, future):
+        if future.cancelled():
+            return
+
+        self._cancel_ping()
+        self._schedule_ping()
+
+    def _start_timeout(self, protocol):
+        if self.ping_timeout:
+            self._ping_handle = self.loop.call_later(
+                self.ping_timeout, self._on_timeout, protocol)
+
+    def _on_timeout(self, protocol):
+        if protocol is not self.protocol:
+            return
+
+        self.logger.error('No response from {}, reconnecting'.format(
+            self.host))
+        # This calls connection_lost(), which reconnects.
+        protocol.abort()
+
+    def _cancel_ping(self):
+        if self._ping_handle is not None:
+            self._ping_handle.cancel()
+            self._ping_handle = None
+
+    def connection_lost(self, protocol, exc):
+        if protocol is not self.protocol:
+            return
+
+        self.protocol = None
+        self.authenticated = False
+        self._cancel_ping()
+
+        for future in self._responses.values():
+            future.cancel()
+        self._responses.clear()
+
+        if not self._closed:
+            self.logger.error('Connection to {} lost, reconnecting'.format(
+                self.host))
+            self._reconnect()
+
+    def send_action(self, action):
+        """
+        Send an action to Asterisk.
+
+        Args:
+            action (dict): The action to send. An ActionID is added if it
+                does not have one.
+
+        Returns:
+            Future: A future which gets the response as a dict.
+        """
+        action = dict(action)
+        action_id = action.setdefault(
+            'ActionID', 'cacofonisk-{}'.format(next(self._action_ids)))
+
+        future = self.loop.create_future()
+        self._responses[action_id] = future
+        self.protocol.send(action)
+
+        return future
+
+    def response_received(self, response):
+        future = self._responses.pop(response.get('ActionID'), None)
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    def events_received(self, events):
+        self.on_events(self, events)
+
+    def close(self):
+        """
+        Close the connection and stop reconnecting.
+        """
+        self._closed = True
+        self._cancel_ping()
+        if self.protocol:
+            self.protocol.close()
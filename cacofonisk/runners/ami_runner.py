@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import logging
 import sys
 from urllib.parse import urlparse
@@ -7,6 +8,8 @@ from panoramisk import Manager
 import signal
 
 from ..handlers import EventHandler
+from .ami_filters import event_mask, filter_actions
+from .ami_protocol import AmiClient
 
 
 class AmiRunner(object):
@@ -15,7 +18,7 @@ class AmiRunner(object):
     EventHandler instance.
     """
     def __init__(self, asterisk_uris, reporter, handler=EventHandler,
-                 logger=None):
+                 logger=None, server_filters=True, use_event_mask=False):
         """
         Create and initialize a new AmiRunner.
 
@@ -24,10 +27,16 @@ class AmiRunner(object):
             reporter (Reporter): A reporter which should receive notifications.
             handler (class): The EventHandler class for this runner.
             logger (Logger): The log handler for the runner.
+            server_filters (bool): Whether to ask Asterisk to only send the
+                events the handler handles, see ami_filters.
+            use_event_mask (bool): Whether to only subscribe to the classes
+                of the events the handler handles when logging in.
         """
         self.asterisks = asterisk_uris
         self.reporter = reporter
         self.event_handler = handler
+        self.server_filters = server_filters
+        self.use_event_mask = use_event_mask
         self.loop = asyncio.get_event_loop()
         self.logger = logger or logging.getLogger(__name__)
 
@@ -49,19 +58,21 @@ class AmiRunner(object):
         """
         ami_host = urlparse(asterisk)
 
-        # Create Panoramisk asterisk AMI manager.
-        manager = Manager(
-            loop=self.loop, host=ami_host.hostname, port=ami_host.port,
-            username=ami_host.username, secret=ami_host.password,
-            ssl=ami_host.scheme in ('ssl', 'tls'), encoding='utf8',
-            log=self.logger)
-
         # Create our own channel manager.
         event_handler = self.event_handler(
             reporter=self.reporter,
             hostname=ami_host.hostname,
             logger=self.logger,
         )
+        events, filters = self.get_event_filters(event_handler)
+
+        # Create Panoramisk asterisk AMI manager.
+        manager = Manager(
+            loop=self.loop, host=ami_host.hostname, port=ami_host.port,
+            username=ami_host.username, secret=ami_host.password,
+            ssl=ami_host.scheme in ('ssl', 'tls'), encoding='utf8',
+            log=self.logger, events=events,
+            on_login=functools.partial(self.send_filters, filters=filters))
 
         # Tell Panoramisk to which events we want to listen.
         if event_handler.FILTER_EVENTS:
@@ -76,6 +87,57 @@ class AmiRunner(object):
         # Tell asyncio what to work on.
         asyncio.ensure_future(manager.connect())
 
+    def get_event_filters(self, event_handler):
+        """
+        Get the event mask and filters for the events the handler handles.
+
+        Args:
+            event_handler (EventHandler): The handler receiving the events.
+
+        Returns:
+            tuple: The Events parameter of the Login action and a list of
+            Filter actions to send after logging in.
+        """
+        if not event_handler.FILTER_EVENTS:
+            return 'on', []
+
+        event_names = event_handler.event_handlers().keys()
+
+        return (
+            event_mask(event_names) if self.use_event_mask else 'on',
+            filter_actions(event_names) if self.server_filters else [],
+        )
+
+    def send_filters(self, manager, filters):
+        """
+        Add the event filters to a new AMI session.
+
+        Args:
+            manager (Manager): The AMI manager which just logged in.
+            filters (list): The Filter actions to send.
+        """
+        for action in filters:
+            future = manager.send_action(action)
+            future.add_done_callback(self._on_filter_response)
+
+    def _on_filter_response(self, future):
+        """
+        Log a warning if Asterisk did not accept an event filter.
+
+        Args:
+            future (Future): The future of the Filter action.
+        """
+        if future.cancelled():
+            return
+
+        response = future.result()
+
+        if response.get('Response') != 'Success':
+            # Without the filter Asterisk just sends all events, which we
+            # can still handle.
+            self.logger.warning('Could not add AMI event filter: {}'.format(
+                response.get('Message')))
+
     def on_event(self, manager, event):
         """
         When an event comes in, pass it to the relevant channel manager.
@@ -106,3 +168,51 @@ class AmiRunner(object):
             manager.close()
         self.reporter.close()
         sys.exit(0)
+
+
+class NativeAmiRunner(AmiRunner):
+    """
+    An AmiRunner which uses the built-in AmiClient instead of Panoramisk.
+
+    Events are parsed straight into dicts and passed to the EventHandler
+    a read at a time (see EventHandler.on_events), without Panoramisk's
+    callback matching.
+    """
+
+    def attach(self, asterisk):
+        """
+        Set up a connection to the specified Asterisk
+
+        Args:
+            asterisk (str): A connection string
+        """
+        ami_host = urlparse(asterisk)
+
+        event_handler = self.event_handler(
+            reporter=self.reporter,
+            hostname=ami_host.hostname,
+            logger=self.logger,
+        )
+        events, filters = self.get_event_filters(event_handler)
+
+        client = AmiClient(
+            host=ami_host.hostname, port=ami_host.port or 5038,
+            username=ami_host.username, secret=ami_host.password,
+            on_events=self.on_events, ssl=ami_host.scheme in ('ssl', 'tls'),
+            events=events,
+            on_login=functools.partial(self.send_filters, filters=filters),
+            loop=self.loop, logger=self.logger)
+
+        self.ami_managers[client] = event_handler
+
+        client.connect()
+
+    def on_events(self, client, events):
+        """
+        Pass all events of a single read to the relevant channel manager.
+
+        Args:
+            client (AmiClient): The client which received the events.
+            events (list): AMI events (dicts with event data).
+        """
+        self.ami_managers[client].on_events(events)
@@ -6,12 +6,187 @@ If the main application desires to replay previously stored events (an
 event replay log), the FileRunner is the runner to use.
 
 Events are loaded from a ``.json`` file which holds a list of
-dictionaries.
+dictionaries, or from a newline-delimited JSON file (``.ndjson`` or
+``.jsonl``) which holds one dictionary per line. Both formats are streamed,
+so memory usage does not depend on the size of the file.
+
+Binary logs written by the BinlogReporter (``.binlog``) are decoded as
+well.
+
+Files compressed with gzip (``.gz``), bzip2 (``.bz2``) or xz (``.xz`` or
+``.lzma``) are decompressed on the fly, e.g. ``replay.ndjson.gz``.
 """
-from json import load
+import bz2
+import gzip
+import lzma
+import os
+from io import TextIOWrapper
+from json import JSONDecodeError, JSONDecoder, loads
+from json.decoder import WHITESPACE
 
+from ..binlog import BINLOG_EXTENSION, BinlogReader
 from ..handlers import EventHandler
 
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open,
+}
+
+# The number of characters read at once when parsing a JSON list.
+CHUNK_SIZE = 64 * 1024
+
+_decoder = JSONDecoder()
+
+
+def open_event_log(filename):
+    """
+    Open an event log for reading bytes, decompressing it if needed.
+
+    Args:
+        filename (str): The name of the file to open.
+
+    Returns:
+        tuple: The opened file and the filename without the compression
+        extension.
+    """
+    base, extension = os.path.splitext(filename)
+    opener = COMPRESSED_OPENERS.get(extension.lower())
+
+    if opener:
+        return opener(filename, 'rb'), base
+
+    return open(filename, 'rb'), filename
+
+
+def iter_ndjson(lines):
+    """
+    Parse newline-delimited JSON, yielding one event per line.
+
+    Args:
+        lines (iterable): An iterable of lines, like an open text file.
+
+    Yields:
+        dict: An AMI event.
+    """
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield loads(line)
+
+
+def iter_lines(head, f):
+    """
+    Iterate over the lines of a text file of which a chunk was already read.
+
+    Args:
+        head (str): Text which was already read from f.
+        f (file): The rest of the text file.
+
+    Yields:
+        str: The lines, including the line endings.
+    """
+    *lines, rest = head.split('\n')
+
+    for line in lines:
+        yield line + '\n'
+
+    # Complete the line which was cut off at the end of the chunk.
+    yield rest + f.readline()
+    yield from f
+
+
+def iter_json_array(f, head=''):
+    """
+    Incrementally parse a JSON list, yielding one event at a time.
+
+    Only the event being decoded (and the rest of the current chunk) is kept
+    in memory, so a list of any length can be replayed.
+
+    Args:
+        f (file): A text file positioned somewhere before the opening ``[``.
+        head (str): Text which was already read from f, if any.
+
+    Yields:
+        dict: An AMI event.
+
+    Raises:
+        ValueError: If the file does not contain a valid JSON list.
+    """
+    for start, end, event in scan_json_array(f, head=head):
+        yield event
+
+
+def scan_json_array(f, head=''):
+    """
+    Incrementally parse a JSON list, yielding events and their positions.
+
+    Args:
+        f (file): A text file positioned somewhere before the opening ``[``.
+        head (str): Text which was already read from f, if any.
+
+    Yields:
+        tuple: The start and end offset of the event (in characters,
+        counted from the start of head) and the event itself.
+
+    Raises:
+        ValueError: If the file does not contain a valid JSON list.
+    """
+    buf = head
+    # The offset of buf[0] from the start of the list.
+    base = 0
+    pos = 0
+    eof = False
+    expect = '['
+
+    while True:
+        pos = WHITESPACE.match(buf, pos).end()
+        need_more = pos == len(buf)
+
+        if not need_more:
+            char = buf[pos]
+
+            if expect == '[':
+                if char != '[':
+                    raise ValueError(
+                        'Expected a JSON list, got {!r}'.format(char))
+                expect = 'first'
+                pos += 1
+            elif char == ']' and expect in ('first', ','):
+                return
+            elif expect == ',':
+                if char != ',':
+                    raise ValueError(
+                        'Expected "," or "]", got {!r}'.format(char))
+                expect = 'value'
+                pos += 1
+            else:
+                try:
+                    event, end = _decoder.raw_decode(buf, pos)
+                except JSONDecodeError:
+                    # The event is probably cut off at the end of the
+                    # chunk. Only fail if there is nothing left to read.
+                    if eof:
+                        raise
+                    need_more = True
+                else:
+                    expect = ','
+                    yield base + pos, base + end, event
+                    pos = end
+
+        if need_more:
+            if eof:
+                raise ValueError('Unexpected end of file in JSON list')
+
+            chunk = f.read(CHUNK_SIZE)
+            buf = buf[pos:] + chunk
+            base += pos
+            pos = 0
+            eof = not chunk
+
 
 class FileRunner(object):
     def __init__(self, files, reporter, channel_manager_class=EventHandler):
@@ -37,17 +212,45 @@ class FileRunner(object):
 
     def _load_events_from_disk(self, filename):
         """
-        Read the file with the given file name and return the JSON contents.
+        Read the file with the given file name and yield the events in it.
+
+        Files with an NDJSON extension are always read line by line. For
+        other files the format is sniffed from the first non-whitespace
+        character: a ``[`` is the start of a JSON list, anything else is
+        treated as NDJSON. Sniffing reads a single chunk instead of a line,
+        as a JSON list may be written on one line, and does not seek, so
+        pipes like ``/dev/stdin`` work as well. Binary logs are recognized
+        by their extension. Compressed files are decompressed while reading.
 
         Args:
             filename (str): The name of the file to read.
 
-        Returns:
-            A JSON object.
+        Yields:
+            dict: An AMI event.
         """
-        with open(filename, 'r') as f:
-            events = load(f)
-        return events
+        f, filename = open_event_log(filename)
+
+        if filename.endswith(BINLOG_EXTENSION):
+            with f:
+                yield from BinlogReader(f)
+            return
+
+        with TextIOWrapper(f) as f:
+            if filename.endswith(NDJSON_EXTENSIONS):
+                yield from iter_ndjson(f)
+                return
+
+            head = ''
+            while not head:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                head = chunk.lstrip()
+
+            if head.startswith('['):
+                yield from iter_json_array(f, head=head)
+            else:
+                yield from iter_ndjson(iter_lines(head, f))
 
     def run(self):
         """
@@ -57,13 +260,6 @@ class FileRunner(object):
             events = self._load_events_from_disk(filename)
             channel_manager = self.channel_manager_class(
                 reporter=self.reporter)
-            interesting_events = channel_manager.event_handlers().keys()
-
-            for event in events:
-                if (
-                        not channel_manager.FILTER_EVENTS or
-                        event['Event'] in interesting_events
-                   ):
-                    channel_manager.on_event(event)
+            channel_manager.on_events(events)
 
             self.channel_managers.append(channel_manager)
@@ -0,0 +1,714 @@
+"""
+Replay only the events of selected calls from a large replay log.
+
+An EventIndex records the byte offsets of every event in a replay log, and
+which events belong to which call. The IndexedFileRunner uses the index to
+memory-map the log and pass only the events of the selected calls to the
+EventHandler, so a single call can be reproduced without parsing the whole
+file.
+
+Indexes can be built for uncompressed JSON list and NDJSON logs. The
+IndexedFileRunner saves the index next to the log the first time and uses
+it from there on::
+
+    IndexedFileRunner('replay.ndjson', reporter, ['<linkedid>']).run()
+
+An index file consists of fixed-width tables which are memory-mapped, so
+loading an index takes the same time for any size of log. The index also
+records the size, modification time and a hash of the start of the log, so
+an index is rebuilt when the log was rotated or replaced.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from ..binlog import MAGIC
+from ..handlers import EventHandler
+from .file_runner import COMPRESSED_OPENERS, FileRunner, scan_json_array
+
+INDEX_EXTENSION = '.idx'
+
+INDEX_MAGIC = b'CACOIDX\x02'
+
+# The number of bytes at the start of a log which are hashed, to notice a
+# log which was replaced by another one of the same size.
+HEADER_HASH_SIZE = 64 * 1024
+
+# The magic, the size, modification time and header hash of the log, the
+# number of events and for each of the three tables the number of keys, the
+# number of values and the size of the keys. All tables follow the header:
+# first the 'Q' tables, then the 'I' tables and then the keys, so all of them
+# are aligned.
+_index_header = struct.Struct('<8sQq20s4xQ' + 'QQQ' * 3)
+
+_WHITESPACE = re.compile(rb'\s*')
+
+
+class IndexFileError(ValueError):
+    pass
+
+
+class EventIndex(object):
+    """
+    The byte offsets of the events in a replay log, by call.
+    """
+
+    def __init__(self, offsets, lengths, calls, bridges, call_bridges,
+                 signature):
+        """
+        Create an index. Use build() or load() instead.
+
+        Args:
+            offsets (array): The byte offset of every event.
+            lengths (array): The length in bytes of every event.
+            calls (_Table): The event numbers of each Linkedid: the events
+                which refer to it, and those of the channels they refer to.
+            bridges (_Table): The event numbers of each BridgeUniqueid.
+            call_bridges (_Table): The positions in bridges of the bridges
+                referred to by the events of each Linkedid.
+            signature (tuple): The size, modification time in nanoseconds
+                and header hash of the log.
+        """
+        self.offsets = offsets
+        self.lengths = lengths
+        self.calls = calls
+        self.bridges = bridges
+        self.call_bridges = call_bridges
+        self.signature = signature
+
+        # The mapped index file and the views on it, see load().
+        self._mm = None
+        self._views = []
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the index file, if the index was loaded from one.
+
+        The tables of a loaded index can't be used after it is closed.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    @classmethod
+    def build(cls, filename):
+        """
+        Scan a replay log and index all its events.
+
+        Args:
+            filename (str): The name of an uncompressed JSON or NDJSON log.
+
+        Returns:
+            EventIndex: The index of the log.
+
+        Raises:
+            ValueError: If the log can't be indexed.
+        """
+        if os.path.splitext(filename)[1].lower() in COMPRESSED_OPENERS:
+            raise ValueError('Compressed logs cannot be indexed')
+
+        builder = _IndexBuilder()
+
+        with open(filename, 'rb') as f:
+            stat = os.fstat(f.fileno())
+
+            if stat.st_size == 0:
+                return builder.get_index(_get_signature(stat, b''))
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(MAGIC)] == MAGIC:
+                    raise ValueError('Binary logs cannot be indexed')
+
+                signature = _get_signature(stat, mm[:HEADER_HASH_SIZE])
+
+                for offset, length, event in _scan(mm):
+                    builder.add(offset, length, event)
+
+        return builder.get_index(signature)
+
+    def matches(self, filename):
+        """
+        Check whether the index belongs to the log as it is now.
+
+        Args:
+            filename (str): The name of the log.
+
+        Returns:
+            bool: True if the log did not change since it was indexed.
+        """
+        with open(filename, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            return self.signature == _get_signature(
+                stat, f.read(HEADER_HASH_SIZE))
+
+    def select(self, linkedids):
+        """
+        Find the events of the given calls.
+
+        Besides the events which refer to the calls directly, this includes
+        the events of all channels and bridges those events refer to, so
+        bridges are created before channels enter them.
+
+        Args:
+            linkedids (iterable): The Linkedids of the calls to select.
+
+        Returns:
+            list: Sorted event numbers.
+        """
+        numbers = set()
+
+        for linkedid in linkedids:
+            numbers.update(self.calls.get(linkedid))
+
+            for position in self.call_bridges.get(linkedid):
+                numbers.update(self.bridges.get_values(position))
+
+        return sorted(numbers)
+
+    def save(self, filename):
+        """
+        Write the index to a file.
+
+        The file is written next to the given name first and then moved in
+        place, so a reader never sees a partially written index.
+
+        Args:
+            filename (str): The name of the index file.
+        """
+        tables = (self.calls, self.bridges, self.call_bridges)
+        size, mtime, digest = self.signature
+        counts = []
+        for table in tables:
+            counts.extend((len(table), len(table.values), len(table.keys)))
+
+        tmp_filename = filename + '.tmp'
+
+        with open(tmp_filename, 'wb') as f:
+            f.write(_index_header.pack(
+                INDEX_MAGIC, size, mtime, digest, len(self.offsets),
+                *counts))
+
+            f.write(_to_bytes('Q', self.offsets))
+            for table in tables:
+                f.write(_to_bytes('Q', table.key_offsets))
+                f.write(_to_bytes('Q', table.starts))
+
+            f.write(_to_bytes('I', self.lengths))
+            for table in tables:
+                f.write(_to_bytes('I', table.values))
+
+            for table in tables:
+                f.write(table.keys)
+
+        os.replace(tmp_filename, filename)
+
+    @classmethod
+    def load(cls, filename, log_filename=None):
+        """
+        Map an index written by save().
+
+        The index file stays mapped until the index is closed, so use the
+        index as a context manager or call close() when done with it.
+
+        Args:
+            filename (str): The name of the index file.
+            log_filename (str): The name of the log, to check the index
+                still belongs to it.
+
+        Returns:
+            EventIndex: The index.
+
+        Raises:
+            IndexFileError: If the file is not a valid index, or not the
+                index of the log as it is now.
+        """
+        with open(filename, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _index_header.size:
+                raise IndexFileError(
+                    '{} is not a cacofonisk index'.format(filename))
+
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            return cls._from_mmap(mm, size, filename, log_filename)
+        except BaseException:
+            mm.close()
+            raise
+
+    @classmethod
+    def _from_mmap(cls, mm, size, filename, log_filename):
+        """
+        Create an index from a mapped index file, see load().
+        """
+        header = _index_header.unpack_from(mm)
+        magic, log_size, log_mtime, digest, events = header[:5]
+        counts = [header[5 + 3 * table:8 + 3 * table] for table in range(3)]
+
+        if magic != INDEX_MAGIC:
+            raise IndexFileError(
+                '{} is not a cacofonisk index'.format(filename))
+
+        expected_size = (
+            _index_header.size +
+            8 * events + sum(16 * (keys + 1) for keys, _, _ in counts) +
+            4 * events + sum(4 * values for _, values, _ in counts) +
+            sum(key_bytes for _, _, key_bytes in counts))
+
+        if size != expected_size:
+            raise IndexFileError('{} is truncated'.format(filename))
+
+        index = cls.__new__(cls)
+        index.signature = (log_size, log_mtime, digest)
+        index._mm = None
+        index._views = []
+
+        if log_filename is not None and not index.matches(log_filename):
+            raise IndexFileError(
+                '{} does not belong to {} as it is now'.format(
+                    filename, log_filename))
+
+        sections = _Sections(memoryview(mm), _index_header.size)
+        index._mm = mm
+        index._views = sections.views
+
+        index.offsets = sections.take('Q', events)
+        key_offsets = []
+        starts = []
+        for keys, _, _ in counts:
+            key_offsets.append(sections.take('Q', keys + 1))
+            starts.append(sections.take('Q', keys + 1))
+
+        index.lengths = sections.take('I', events)
+        values = [sections.take('I', count) for _, count, _ in counts]
+
+        index.calls, index.bridges, index.call_bridges = [
+            _Table(key_offsets[table], starts[table], values[table],
+                   sections.take(None, counts[table][2]))
+            for table in range(3)]
+
+        return index
+
+
+class _IndexBuilder(object):
+    """
+    Collect the events which refer to each call, channel and bridge.
+    """
+
+    def __init__(self):
+        self.offsets = array('Q')
+        self.lengths = array('I')
+        self.linkedids = {}
+        self.uniqueids = {}
+        self.bridges = {}
+        self.call_uniqueids = {}
+        self.call_bridges = {}
+
+    def add(self, offset, length, event):
+        """
+        Add an event to the index.
+
+        Args:
+            offset (int): The byte offset of the event in the log.
+            length (int): The length of the event in bytes.
+            event (dict): The event itself.
+        """
+        number = len(self.offsets)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+        linkedids = set()
+        uniqueids = set()
+        bridges = set()
+
+        for key, value in event.items():
+            if not value or type(value) is not str:
+                continue
+            elif key.endswith('Linkedid'):
+                linkedids.add(value)
+            elif key.endswith('BridgeUniqueid'):
+                bridges.add(value)
+            elif key.endswith('Uniqueid'):
+                uniqueids.add(value)
+
+        for linkedid in linkedids:
+            self.linkedids.setdefault(linkedid, []).append(number)
+            self.call_uniqueids.setdefault(linkedid, set()).update(uniqueids)
+            self.call_bridges.setdefault(linkedid, set()).update(bridges)
+
+        for uniqueid in uniqueids:
+            self.uniqueids.setdefault(uniqueid, []).append(number)
+
+        for bridge in bridges:
+            self.bridges.setdefault(bridge, []).append(number)
+
+    def get_index(self, signature):
+        """
+        Create the index of the events added so far.
+
+        Args:
+            signature (tuple): The signature of the log.
+
+        Returns:
+            EventIndex: The index.
+        """
+        calls = {}
+        for linkedid, numbers in self.linkedids.items():
+            numbers = set(numbers)
+            for uniqueid in self.call_uniqueids[linkedid]:
+                numbers.update(self.uniqueids[uniqueid])
+            calls[linkedid] = sorted(numbers)
+
+        bridges = _Table.from_dict(self.bridges)
+        call_bridges = {
+            linkedid: sorted(bridges.find(bridge) for bridge in call_bridges)
+            for linkedid, call_bridges in self.call_bridges.items()}
+
+        return EventIndex(
+            self.offsets, self.lengths, _Table.from_dict(calls), bridges,
+            _Table.from_dict(call_bridges), signature)
+
+
+class _Table(object):
+    """
+    A sorted table of strings, with a list of numbers for each of them.
+
+    The strings are kept as one blob of UTF-8, so a table can be used
+    straight from a memory-mapped index file.
+    """
+
+    def __init__(self, key_offsets, starts, values, keys):
+        """
+        Create a table.
+
+        Args:
+            key_offsets (array): The offset of every key in keys, followed
+                by the size of keys.
+            starts (array): The position of the first value of every key in
+                values, followed by the number of values.
+            values (array): The numbers of all keys.
+            keys (bytes): The sorted keys.
+        """
+        self.key_offsets = key_offsets
+        self.starts = starts
+        self.values = values
+        self.keys = keys
+
+    @classmethod
+    def from_dict(cls, mapping):
+        """
+        Create a table from a dict.
+
+        Args:
+            mapping (dict): Lists of numbers by string.
+
+        Returns:
+            _Table: The table.
+        """
+        key_offsets = array('Q', [0])
+        starts = array('Q', [0])
+        values = array('I')
+        keys = bytearray()
+
+        for key in sorted(key.encode('utf-8') for key in mapping):
+            keys += key
+            key_offsets.append(len(keys))
+            values.extend(mapping[key.decode('utf-8')])
+            starts.append(len(values))
+
+        return cls(key_offsets, starts, values, bytes(keys))
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def __getitem__(self, position):
+        return bytes(self.keys[
+            self.key_offsets[position]:self.key_offsets[position + 1]])
+
+    def find(self, key):
+        """
+        Find the position of a key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            int: The position of the key, or None if it is not there.
+        """
+        key = key.encode('utf-8')
+        position = bisect_left(self, key)
+
+        if position < len(self) and self[position] == key:
+            return position
+        return None
+
+    def get(self, key):
+        """
+        Get the numbers of a key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            sequence: The numbers, or an empty tuple for an unknown key.
+        """
+        position = self.find(key)
+        if position is None:
+            return ()
+        return self.get_values(position)
+
+    def get_values(self, position):
+        """
+        Get the numbers of the key at a position.
+
+        Args:
+            position (int): The position of the key.
+
+        Returns:
+            sequence: The numbers.
+        """
+        return self.values[self.starts[position]:self.starts[position + 1]]
+
+
+class _Sections(object):
+    """
+    Take consecutive tables from a memory-mapped index file.
+    """
+
+    def __init__(self, view, pos):
+        self._view = view
+        self._pos = pos
+        # All views on the file, to release them when it is closed.
+        self.views = [view]
+
+    def take(self, typecode, count):
+        """
+        Take the next table.
+
+        Args:
+            typecode (str): The array typecode of the values, or None for
+                bytes.
+            count (int): The number of values.
+
+        Returns:
+            sequence: The values, without copying them if possible.
+        """
+        if typecode is None:
+            size = count
+        else:
+            size = count * array(typecode).itemsize
+
+        view = self._view[self._pos:self._pos + size]
+        self._pos += size
+        self.views.append(view)
+
+        if typecode is None:
+            return view
+
+        if sys.byteorder != 'little':
+            values = array(typecode, view.tobytes())
+            values.byteswap()
+            return values
+
+        values = view.cast(typecode)
+        self.views.append(values)
+        return values
+
+
+def _to_bytes(typecode, values):
+    """
+    Get the little endian bytes of an array or memoryview.
+    """
+    if sys.byteorder != 'little':
+        values = array(typecode, memoryview(values).tobytes())
+        values.byteswap()
+
+    return memoryview(values).tobytes()
+
+
+def _get_signature(stat, head):
+    """
+    Get what identifies a log, to notice when it changed.
+
+    Args:
+        stat (os.stat_result): The stat of the log.
+        head (bytes): The first HEADER_HASH_SIZE bytes of the log.
+
+    Returns:
+        tuple: The size, modification time and header hash.
+    """
+    return stat.st_size, stat.st_mtime_ns, hashlib.sha1(head).digest()
+
+
+def _scan(mm):
+    """
+    Find the events in a memory-mapped JSON or NDJSON log.
+
+    Args:
+        mm (mmap): The mapped log.
+
+    Yields:
+        tuple: The byte offset, the length in bytes and the event.
+    """
+    start = _WHITESPACE.match(mm).end()
+
+    if mm[start:start + 1] == b'[':
+        for begin, end, event in scan_json_array(_Latin1Reader(mm)):
+            yield begin, end - begin, _fix_ids(event, mm, begin, end)
+    else:
+        offset = 0
+        for line in iter(mm.readline, b''):
+            if line.strip():
+                yield offset, len(line.rstrip(b'\r\n')), json.loads(line)
+            offset += len(line)
+
+
+def _fix_ids(event, mm, begin, end):
+    """
+    Parse an event read by a _Latin1Reader again if its ids are not ASCII.
+
+    Non-ASCII characters in the ids may come from UTF-8 bytes, which were
+    decoded as latin-1, or from \\u escapes, which were decoded correctly.
+    Telling them apart takes the JSON text, so the event is parsed from its
+    bytes instead. Only the ids are used by the index, so other events are
+    left alone.
+
+    Args:
+        event (dict): The event with strings decoded as latin-1.
+        mm (mmap): The mapped log.
+        begin (int): The byte offset of the event.
+        end (int): The byte offset of the end of the event.
+
+    Returns:
+        dict: The event with the ids decoded correctly.
+    """
+    for key, value in event.items():
+        if (
+                type(value) is str and key.endswith('id') and
+                not value.isascii()
+        ):
+            return json.loads(mm[begin:end])
+
+    return event
+
+
+class _Latin1Reader(object):
+    """
+    Read an mmap as latin-1 text.
+
+    Latin-1 maps every byte to one character, so character offsets in the
+    text are byte offsets in the mmap. Multi-byte UTF-8 characters only occur
+    inside JSON strings, so this does not affect the structure of the JSON.
+    """
+
+    def __init__(self, mm):
+        self._mm = mm
+
+    def read(self, size):
+        return self._mm.read(size).decode('latin-1')
+
+
+class IndexedFileRunner(FileRunner):
+    """
+    A FileRunner which only replays the events of the selected calls.
+    """
+
+    def __init__(self, files, reporter, linkedids,
+                 channel_manager_class=EventHandler, logger=None):
+        """
+        Create a runner for the given calls.
+
+        The index of every file is loaded from the file name with
+        INDEX_EXTENSION appended. If there is no index there yet, or it
+        belongs to an older version of the file, the index is built and
+        saved there.
+
+        Args:
+            files (list): A list of strings containing filenames or,
+            a string containing a filename.
+            reporter (Reporter): The reporter to use for this Runner.
+            linkedids (iterable): The Linkedids of the calls to replay.
+            channel_manager_class: The EventHandler to instantiate for this
+                Runner.
+            logger (Logger): The logger to use.
+        """
+        super(IndexedFileRunner, self).__init__(
+            files, reporter, channel_manager_class=channel_manager_class)
+        self.linkedids = list(linkedids)
+        self.logger = logger or logging.getLogger(__name__)
+
+    def get_index(self, filename):
+        """
+        Load the index of a file, or build and save it.
+
+        Args:
+            filename (str): The name of the replay log.
+
+        Returns:
+            EventIndex: The index of the log.
+        """
+        index_filename = filename + INDEX_EXTENSION
+
+        try:
+            return EventIndex.load(index_filename, filename)
+        except FileNotFoundError:
+            pass
+        except IndexFileError as e:
+            self.logger.warning('Rebuilding index: {}'.format(e))
+
+        index = EventIndex.build(filename)
+
+        try:
+            index.save(index_filename)
+        except OSError as e:
+            self.logger.warning('Could not save index {}: {}'.format(
+                index_filename, e))
+
+        return index
+
+    def _load_events_from_disk(self, filename):
+        """
+        Yield the events of the selected calls from the given file.
+
+        Args:
+            filename (str): The name of the file to read.
+
+        Yields:
+            dict: An AMI event.
+        """
+        with self.get_index(filename) as index:
+            numbers = index.select(self.linkedids)
+
+            if not numbers:
+                return
+
+            offsets = index.offsets
+            lengths = index.lengths
+
+            with open(filename, 'rb') as f:
+                with mmap.mmap(
+                        f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for number in numbers:
+                        offset = offsets[number]
+                        yield json.loads(
+                            mm[offset:offset + lengths[number]])
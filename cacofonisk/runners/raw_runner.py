@@ -0,0 +1,68 @@
+"""
+Implement a Runner which replays raw AMI text captures.
+
+Captures made with tools like socat or tcpdump contain the AMI stream as it
+was sent by Asterisk: blocks of ``Key: Value`` lines separated by empty
+lines. The RawAmiFileRunner streams these files line by line, so captures of
+any size can be replayed without converting them to JSON first.
+
+Responses to actions (and events sent as part of a response, which carry an
+ActionID) are skipped, as is the ``Asterisk Call Manager`` banner. Both
+``\\r\\n`` and ``\\n`` line endings are accepted, and captures may be
+compressed like other replay logs.
+"""
+import itertools
+from io import TextIOWrapper
+
+from .ami_protocol import BANNER, parse_message
+from .file_runner import FileRunner, open_event_log
+
+
+def iter_ami_text(lines):
+    """
+    Parse a raw AMI capture, yielding one event per block.
+
+    Args:
+        lines (iterable): An iterable of lines, like an open text file.
+
+    Yields:
+        dict: An AMI event.
+    """
+    banner = BANNER.decode('ascii')
+    block = []
+
+    # The extra empty line terminates a last block without one.
+    for line in itertools.chain(lines, ['']):
+        line = line.rstrip('\r\n')
+
+        if line:
+            if block or not line.startswith(banner):
+                block.append(line)
+        elif block:
+            message = parse_message('\r\n'.join(block))
+            block = []
+
+            if 'Event' in message and 'ActionID' not in message:
+                yield message
+
+
+class RawAmiFileRunner(FileRunner):
+    """
+    A FileRunner which reads raw AMI text captures instead of JSON.
+    """
+
+    def _load_events_from_disk(self, filename):
+        """
+        Read the capture with the given file name and yield its events.
+
+        Args:
+            filename (str): The name of the file to read.
+
+        Yields:
+            dict: An AMI event.
+        """
+        f, filename = open_event_log(filename)
+
+        with TextIOWrapper(f, encoding='utf-8', errors='replace',
+                           newline='') as f:
+            yield from iter_ami_text(f)
@@ -0,0 +1,168 @@
+"""
+A stand-in for the Asterisk Manager Interface, for tests and benchmarks.
+
+The FakeAmiServer accepts AMI connections on localhost, handles Login and
+other actions, and sends a fixed list of events to every client which logs
+in with events enabled. Like Asterisk, it only sends the events matching
+the filters a client added with the Filter action, if there are any.
+"""
+import asyncio
+import re
+
+from ..runners.ami_protocol import EOM, encode_message, parse_message
+
+
+class FakeAmiServer(object):
+    """
+    A fake Asterisk which replays events to its clients.
+    """
+
+    def __init__(self, events, username='cacofonisk', secret='bard',
+                 loop=None):
+        """
+        Create a fake AMI server. Call start() to start listening.
+
+        Args:
+            events (list): The events to send to every client after login.
+            username (str): The username clients should log in with.
+            secret (str): The password clients should log in with.
+            loop (AbstractEventLoop): The event loop to run on.
+        """
+        self.events = events
+        self.username = username
+        self.secret = secret
+        self.loop = loop or asyncio.get_event_loop()
+
+        self.port = None
+        self.actions = []
+        self.logins = 0
+        self.events_sent = 0
+        # Whether actions are responded to. Turn this off to act like a
+        # connection which silently died.
+        self.responding = True
+        self._server = None
+        self._transports = []
+        # The event filters of each client which receives events.
+        self._filters = {}
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Start listening for connections.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on, 0 picks a free port.
+        """
+        self._server = await self.loop.create_server(
+            lambda: _FakeAmiProtocol(self), host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def disconnect(self):
+        """
+        Drop all client connections, but keep listening.
+        """
+        for transport in self._transports:
+            transport.close()
+        self._transports = []
+        self._filters = {}
+
+    def close(self):
+        """
+        Drop all client connections and stop listening.
+        """
+        self.disconnect()
+        if self._server:
+            self._server.close()
+
+    def send_events(self, events):
+        """
+        Send more events to all clients which receive events.
+
+        Args:
+            events (list): The events to send.
+        """
+        for transport in self._filters:
+            self._send_events(transport, events)
+
+    def _send_events(self, transport, events):
+        filters = self._filters[transport]
+        data = []
+
+        for event in events:
+            message = encode_message(event)
+
+            if filters and not any(
+                    pattern.search(message.decode('utf-8'))
+                    for pattern in filters
+            ):
+                continue
+
+            data.append(message)
+
+        self.events_sent += len(data)
+        transport.write(b''.join(data))
+
+    def handle_action(self, transport, action):
+        """
+        Respond to an action of a client.
+
+        Args:
+            transport (Transport): The connection to the client.
+            action (dict): The action sent by the client.
+        """
+        self.actions.append(action)
+
+        if not self.responding:
+            return
+
+        response = {'Response': 'Success'}
+        if 'ActionID' in action:
+            response['ActionID'] = action['ActionID']
+
+        if action.get('Action') == 'Login':
+            if (
+                    action.get('Username') != self.username or
+                    action.get('Secret') != self.secret
+            ):
+                response['Response'] = 'Error'
+                response['Message'] = 'Authentication failed'
+                transport.write(encode_message(response))
+                return
+
+            self.logins += 1
+            response['Message'] = 'Authentication accepted'
+            transport.write(encode_message(response))
+
+            if action.get('Events', 'on') != 'off':
+                self._filters[transport] = []
+                self._send_events(transport, self.events)
+        elif (
+                action.get('Action') == 'Filter' and
+                action.get('Operation') == 'Add' and
+                transport in self._filters
+        ):
+            self._filters[transport].append(re.compile(action['Filter']))
+            transport.write(encode_message(response))
+        else:
+            transport.write(encode_message(response))
+
+
+class _FakeAmiProtocol(asyncio.Protocol):
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self._buffer = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server._transports.append(transport)
+        transport.write(b'Asterisk Call Manager/5.0.1\r\n')
+
+    def data_received(self, data):
+        messages = (self._buffer + data).split(EOM)
+        self._buffer = messages.pop()
+
+        for message in messages:
+            self.server.handle_action(
+                self.transport, parse_message(message.decode('utf-8')))
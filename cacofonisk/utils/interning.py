@@ -0,0 +1,69 @@
+"""
+Share one object between equal immutable values.
+
+The same caller IDs, extensions and account codes show up on many channels.
+Passing each value through an Interner makes all channels use the same
+object, so every distinct value is only kept in memory once.
+"""
+from collections import OrderedDict
+
+
+class Interner(object):
+    """
+    An Interner returns the first seen object which is equal to a value.
+
+    It remembers at most maxsize values. When it is full, the value which
+    was used the longest ago is forgotten, which only means the next equal
+    value gets a new object.
+    """
+
+    def __init__(self, maxsize):
+        """
+        Create an interner.
+
+        Args:
+            maxsize (int): The maximum number of values to remember.
+        """
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+
+    def __len__(self):
+        """
+        Get the number of values remembered.
+
+        Returns:
+            int: The number of values.
+        """
+        return len(self._values)
+
+    def __call__(self, value):
+        """
+        Get the shared object for a value.
+
+        Args:
+            value (hashable): An immutable value, or None.
+
+        Returns:
+            The shared object which is equal to value.
+        """
+        if value is None:
+            return value
+
+        values = self._values
+
+        try:
+            shared = values[value]
+        except KeyError:
+            if len(values) >= self.maxsize:
+                values.popitem(last=False)
+            values[value] = value
+            return value
+
+        values.move_to_end(value)
+        return shared
+
+    def clear(self):
+        """
+        Forget all values.
+        """
+        self._values.clear()
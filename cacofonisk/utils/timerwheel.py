@@ -0,0 +1,146 @@
+"""
+A timer wheel to find keys which have not been seen for a while.
+
+Touching a key only stores the time it was last seen, so it is O(1) no
+matter how often a key is seen. Every key sits in the slot of the wheel for
+the moment it would expire. When the wheel turns past that slot, the key
+either expires, or is moved to the slot for its new expiry moment if it was
+seen in the meantime.
+"""
+import math
+
+
+class TimerWheel(object):
+    """
+    A TimerWheel expires keys which were not touched for max_age seconds.
+    """
+
+    def __init__(self, max_age, resolution=None):
+        """
+        Create a timer wheel.
+
+        Args:
+            max_age (float): The number of seconds after which a key which
+                was not touched expires.
+            resolution (float): The number of seconds per slot of the wheel.
+                Keys expire at most this much later than max_age. Defaults
+                to 1/60th of max_age.
+        """
+        self.max_age = max_age
+        self.resolution = resolution or max_age / 60.0
+
+        # The wheel turns once per max_age, with a slot to spare for keys
+        # which expire at the end of the current slot.
+        size = int(math.ceil(max_age / self.resolution)) + 2
+        self._slots = [[] for _ in range(size)]
+
+        # The last time each key was seen and the tick it expires on.
+        self._entries = {}
+        self._tick = None
+
+    def __len__(self):
+        """
+        Get the number of keys in the wheel.
+
+        Returns:
+            int: The number of keys.
+        """
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _get_expiry_tick(self, last_seen):
+        # Round up, so keys never expire before max_age has passed.
+        return int(math.ceil((last_seen + self.max_age) / self.resolution))
+
+    def touch(self, key, now):
+        """
+        Register that a key was seen.
+
+        Args:
+            key (hashable): The key.
+            now (float): The current time, in seconds.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            tick = self._get_expiry_tick(now)
+            self._entries[key] = [now, tick]
+            self._slots[tick % len(self._slots)].append(key)
+        elif now > entry[0]:
+            entry[0] = now
+
+    def discard(self, key):
+        """
+        Remove a key from the wheel, if it is in there.
+
+        Args:
+            key (hashable): The key.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all keys from the wheel.
+        """
+        self._entries.clear()
+        for slot in self._slots:
+            del slot[:]
+
+    def expire(self, now):
+        """
+        Turn the wheel to the current time and remove the expired keys.
+
+        Args:
+            now (float): The current time, in seconds.
+
+        Returns:
+            list: The keys which were not touched for max_age seconds.
+        """
+        tick = int(now // self.resolution)
+
+        if self._tick is None or tick <= self._tick:
+            if self._tick is None:
+                self._tick = tick
+            return []
+
+        slots = self._slots
+        size = len(slots)
+        expired = []
+
+        # After a jump in time, every slot is visited only once.
+        for current in range(max(self._tick + 1, tick - size + 1), tick + 1):
+            index = current % size
+            slot = slots[index]
+            if not slot:
+                continue
+
+            slots[index] = keep = []
+
+            for key in slot:
+                entry = self._entries.get(key)
+                if entry is None or entry[1] % size != index:
+                    # The key was discarded or moved to another slot.
+                    continue
+
+                if entry[1] > tick:
+                    # The key expires in a later turn of the wheel.
+                    keep.append(key)
+                    continue
+
+                expiry_tick = self._get_expiry_tick(entry[0])
+                if expiry_tick <= tick:
+                    del self._entries[key]
+                    expired.append(key)
+                else:
+                    # The key was touched since it was put in this slot.
+                    entry[1] = expiry_tick
+                    if expiry_tick % size == index:
+                        keep.append(key)
+                    else:
+                        slots[expiry_tick % size].append(key)
+
+        self._tick = tick
+
+        return expired
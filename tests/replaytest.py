@@ -1,3 +1,5 @@
+import glob
+import json
 import os
 
 try:
@@ -11,6 +13,45 @@ from cacofonisk.channel import SimpleChannel
 from cacofonisk.runners.file_runner import FileRunner
 from cacofonisk.utils.testcases import BaseTestCase
 
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# All JSON fixtures, for tests which check something for every recording.
+FIXTURES = sorted(glob.glob(os.path.join(FIXTURE_DIR, '**', '*.json')))
+
+
+def load_fixture(filename):
+    """
+    Load the events of a JSON fixture.
+
+    Args:
+        filename (str): The path of the fixture.
+
+    Returns:
+        list: The events.
+    """
+    with open(filename) as f:
+        return json.load(f)
+
+
+def replay_fixtures(filenames=FIXTURES):
+    """
+    Replay fixtures one event at a time, to check state after every event.
+
+    Every fixture is replayed by a new EventHandler with a TestReporter.
+
+    Args:
+        filenames (list): The paths of the fixtures.
+
+    Yields:
+        tuple: The filename and the EventHandler, after every event.
+    """
+    for filename in filenames:
+        handler = EventHandler(TestReporter())
+
+        for event in load_fixture(filename):
+            handler.on_events([event])
+            yield filename, handler
+
 
 class TestReporter(BaseReporter):
     """
@@ -84,13 +125,7 @@ class BogoRunner(object):
 
     def run(self):
         handler = EventHandler(reporter=self.reporter)
-        interesting_events = handler.event_handlers().keys()
-        for event in self.events:
-            if (
-                    not handler.FILTER_EVENTS or
-                    event['Event'] in interesting_events
-            ):
-                handler.on_event(event)
+        handler.on_events(self.events)
 
         self.channel_managers.append(handler)
 
@@ -0,0 +1,196 @@
+import asyncio
+import os
+from unittest import TestCase
+
+from cacofonisk.runners.ami_protocol import (AmiProtocol, encode_message,
+                                             parse_message)
+from cacofonisk.runners.ami_runner import NativeAmiRunner
+from cacofonisk.utils.fake_ami import FakeAmiServer
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture)
+
+FIXTURE = os.path.join(FIXTURE_DIR, 'xfer_blonde', 'xfer_blonde_abacbc.json')
+
+
+class CollectingClient(object):
+
+    def __init__(self):
+        self.events = []
+        self.responses = []
+
+    def connection_made(self, protocol):
+        pass
+
+    def events_received(self, events):
+        self.events.extend(events)
+
+    def response_received(self, response):
+        self.responses.append(response)
+
+
+class TestParseMessage(TestCase):
+
+    def test_parse(self):
+        message = parse_message(
+            'Event: Newchannel\r\nChannel: SIP/150010001-00000004\r\n'
+            'Exten: \r\nContext:\r\nCallerIDName: Andrew: Garza')
+
+        self.assertEqual({
+            'Event': 'Newchannel',
+            'Channel': 'SIP/150010001-00000004',
+            'Exten': '',
+            'Context': '',
+            'CallerIDName': 'Andrew: Garza',
+        }, message)
+
+    def test_repeated_keys_and_content(self):
+        message = parse_message(
+            'Response: Follows\r\nChanVariable: a=1\r\nChanVariable: b=2\r\n'
+            'first line of output\r\nsecond line')
+
+        self.assertEqual({
+            'Response': 'Follows',
+            'ChanVariable': ['a=1', 'b=2'],
+            'content': 'first line of output\nsecond line',
+        }, message)
+
+    def test_encode(self):
+        action = {'Action': 'Login', 'Username': 'cacofonisk'}
+        self.assertEqual(
+            b'Action: Login\r\nUsername: cacofonisk\r\n\r\n',
+            encode_message(action))
+        self.assertEqual(
+            action, parse_message(encode_message(action).decode()[:-4]))
+
+
+class TestAmiProtocol(TestCase):
+
+    def test_chunked_stream(self):
+        """
+        Test messages split over multiple reads are parsed correctly.
+        """
+        events = load_fixture(FIXTURE)
+        data = b'Asterisk Call Manager/5.0.1\r\n' + b''.join(
+            encode_message(message) for message in
+            [{'Response': 'Success', 'ActionID': '1'}] + events)
+
+        client = CollectingClient()
+        protocol = AmiProtocol(client)
+
+        for i in range(0, len(data), 7):
+            protocol.data_received(data[i:i + 7])
+
+        self.assertEqual('5.0.1', protocol.version)
+        self.assertEqual([{'Response': 'Success', 'ActionID': '1'}],
+                         client.responses)
+        self.assertEqual(events, client.events)
+
+    def test_batches(self):
+        """
+        Test all complete events of a read are passed on at once.
+        """
+        client = CollectingClient()
+        batches = []
+        client.events_received = batches.append
+        protocol = AmiProtocol(client)
+
+        protocol.data_received(
+            b'Event: FullyBooted\r\n\r\nEvent: FullyBooted\r\n\r\nEvent: F')
+        protocol.data_received(b'ullyBooted\r\n\r\n')
+
+        self.assertEqual([2, 1], [len(batch) for batch in batches])
+
+
+class TestNativeAmiRunner(ChannelEventsTestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        self.server = FakeAmiServer(load_fixture(FIXTURE), loop=self.loop)
+        self.loop.run_until_complete(self.server.start())
+
+    def tearDown(self):
+        self.server.close()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def create_runner(self, reporter, secret='bard'):
+        return NativeAmiRunner([
+            'tcp://cacofonisk:{}@127.0.0.1:{}'.format(
+                secret, self.server.port),
+        ], reporter)
+
+    def run_until(self, condition, timeout=5):
+        async def wait():
+            while not condition():
+                await asyncio.sleep(0.01)
+
+        self.loop.run_until_complete(asyncio.wait_for(wait(), timeout))
+
+    def test_replay(self):
+        """
+        Test events from the AMI socket are processed like the fixture.
+        """
+        expected = self.run_and_get_events(FIXTURE)
+
+        reporter = TestReporter()
+        runner = self.create_runner(reporter)
+        runner.attach_all()
+
+        self.run_until(lambda: len(reporter.events) == len(expected))
+        self.assertEqual(expected, reporter.events)
+
+        for client in runner.ami_managers:
+            client.close()
+
+    def test_reconnect(self):
+        reporter = TestReporter()
+        runner = self.create_runner(reporter)
+        runner.attach_all()
+
+        client = next(iter(runner.ami_managers))
+        client.reconnect_timeout = 0
+
+        self.run_until(lambda: client.authenticated)
+        self.server.disconnect()
+        self.run_until(lambda: self.server.logins == 2 and
+                       client.authenticated)
+
+        client.close()
+
+    def test_ping_timeout(self):
+        """
+        Test a connection which stops responding is reconnected.
+        """
+        reporter = TestReporter()
+        runner = self.create_runner(reporter)
+        runner.attach_all()
+
+        client = next(iter(runner.ami_managers))
+        client.reconnect_timeout = 0
+        client.ping_delay = client.ping_timeout = 0.05
+
+        self.run_until(lambda: client.authenticated)
+        self.run_until(lambda: any(
+            action.get('Action') == 'Ping' for action in self.server.actions))
+
+        self.server.responding = False
+        with self.assertLogs(runner.logger, 'ERROR'):
+            self.run_until(lambda: not client.authenticated)
+
+        self.server.responding = True
+        self.run_until(lambda: self.server.logins == 2 and
+                       client.authenticated)
+
+        client.close()
+
+    def test_login_failed(self):
+        runner = self.create_runner(TestReporter(), secret='wrong')
+        runner.attach_all()
+
+        client = next(iter(runner.ami_managers))
+        self.run_until(lambda: client.protocol is None)
+
+        self.assertFalse(client.authenticated)
+        self.assertEqual(0, self.server.logins)
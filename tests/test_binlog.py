@@ -0,0 +1,112 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from cacofonisk import EventHandler, FileRunner
+from cacofonisk import binlog
+from cacofonisk.binlog import (BinlogError, BinlogReader, BinlogReporter,
+                               BinlogWriter)
+from tests.replaytest import (FIXTURE_DIR, FIXTURES, ChannelEventsTestCase,
+                              load_fixture)
+
+
+def encode(events):
+    f = io.BytesIO()
+    writer = BinlogWriter(f)
+    for event in events:
+        writer.write(event)
+    return f.getvalue()
+
+
+class TestBinlog(ChannelEventsTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_round_trip(self):
+        """
+        Test all fixtures survive encoding and decoding unchanged.
+        """
+        for filename in FIXTURES:
+            events = load_fixture(filename)
+            decoded = list(BinlogReader(io.BytesIO(encode(events))))
+            self.assertEqual(events, decoded, filename)
+
+    def test_round_trip_chunk_boundaries(self):
+        events = load_fixture(FIXTURES[0])
+
+        with mock.patch.object(binlog, 'CHUNK_SIZE', 5):
+            decoded = list(BinlogReader(io.BytesIO(encode(events))))
+
+        self.assertEqual(events, decoded)
+
+    def test_special_values(self):
+        events = [
+            {'Event': 'UserEvent', 'Uniqueid': '1', 'Null': 'a\0b'},
+            {'Event': 'UserEvent', 'Uniqueid': '1', 'List': ['a', 'b']},
+            {'Event': 'UserEvent', 'Uniqueid': '1', 'Empty': ''},
+        ]
+        decoded = list(BinlogReader(io.BytesIO(encode(events))))
+        self.assertEqual(events, decoded)
+
+    def test_smaller_than_json(self):
+        json_size = 0
+        binlog_size = 0
+
+        for filename in FIXTURES:
+            with open(filename, 'rb') as f:
+                json_size += len(f.read())
+            binlog_size += len(encode(load_fixture(filename)))
+
+        self.assertLess(binlog_size, json_size / 2)
+
+    def test_bad_magic(self):
+        with self.assertRaises(BinlogError):
+            BinlogReader(io.BytesIO(b'[{"Event": "FullyBooted"}]'))
+
+    def test_truncated(self):
+        data = encode(load_fixture(FIXTURES[0]))
+        with self.assertRaises(BinlogError):
+            list(BinlogReader(io.BytesIO(data[:-3])))
+
+    def test_file_runner(self):
+        """
+        Test binary logs (compressed or not) replay like the JSON fixture.
+        """
+        fixture = os.path.join(
+            FIXTURE_DIR, 'xfer_blind', 'xfer_blind_abbcac.json')
+        data = encode(load_fixture(fixture))
+
+        path = os.path.join(self.tmpdir, 'replay.binlog')
+        with open(path, 'wb') as f:
+            f.write(data)
+        with gzip.open(path + '.gz', 'wb') as f:
+            f.write(data)
+
+        expected = self.run_and_get_events(fixture)
+        self.assertEqual(expected, self.run_and_get_events(path))
+        self.assertEqual(expected, self.run_and_get_events(path + '.gz'))
+
+    def test_reporter(self):
+        """
+        Test the BinlogReporter records the events passed to the reporter.
+        """
+        fixture = FIXTURES[0]
+        path = os.path.join(self.tmpdir, 'recording.binlog')
+
+        reporter = BinlogReporter(path)
+        FileRunner(fixture, reporter).run()
+        reporter.close()
+
+        interesting_events = EventHandler.event_handlers().keys()
+        expected = [event for event in load_fixture(fixture)
+                    if event['Event'] in interesting_events]
+
+        with open(path, 'rb') as f:
+            self.assertEqual(expected, list(BinlogReader(f)))
@@ -0,0 +1,97 @@
+import os
+
+from cacofonisk import EventHandler
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture)
+from tests.test_channel import NEWCHANNEL
+
+FIXTURE = os.path.join(FIXTURE_DIR, 'simple', 'ab_success_a_hangup.json')
+
+
+def new_channel(number, linkedid=None):
+    uniqueid = '195176c06ab8-1529936170.{}'.format(number)
+    return dict(
+        NEWCHANNEL,
+        Channel='SIP/150010003-{:08x}'.format(number),
+        Uniqueid=uniqueid,
+        Linkedid=linkedid or uniqueid)
+
+
+def new_callerid(channel):
+    return {
+        'Event': 'NewCallerid',
+        'Channel': channel['Channel'],
+        'CallerIDNum': '204',
+        'CallerIDName': 'Chris Aguilar',
+        'Uniqueid': channel['Uniqueid'],
+        'Linkedid': channel['Linkedid'],
+    }
+
+
+class BoundedEventHandler(EventHandler):
+    MAX_CHANNELS = 4
+    MAX_CALLS = 2
+
+
+class TestBounded(ChannelEventsTestCase):
+
+    def test_evict_idle_call(self):
+        a_chan, b_chan, c_chan = [new_channel(number) for number in range(3)]
+        handler = BoundedEventHandler(TestReporter())
+
+        with self.assertLogs('cacofonisk.handlers', 'WARNING'):
+            handler.on_events([
+                a_chan, b_chan, new_callerid(a_chan), c_chan])
+
+        self.assertEqual(
+            [a_chan['Linkedid'], c_chan['Linkedid']],
+            sorted(handler._calls))
+        self.assertEqual({'calls': 1, 'channels': 1}, handler.evicted)
+
+    def test_max_channels(self):
+        handler = BoundedEventHandler(TestReporter())
+
+        with self.assertLogs('cacofonisk.handlers', 'WARNING'):
+            handler.on_events([
+                new_channel(number, linkedid='call-{}'.format(number % 2))
+                for number in range(6)])
+
+        # The call which got a new channel is kept over the other one.
+        self.assertEqual(4, len(handler._channels))
+        self.assertEqual(2, handler.active_call_count)
+        self.assertEqual({'calls': 1, 'channels': 2}, handler.evicted)
+
+    def test_ignore_channel(self):
+        handler = BoundedEventHandler(TestReporter())
+
+        with self.assertLogs('cacofonisk.handlers', 'WARNING'):
+            handler.on_events([
+                new_channel(number, linkedid='call') for number in range(6)])
+
+        self.assertEqual(4, len(handler._channels))
+        self.assertEqual({'ignored_channels': 2}, handler.evicted)
+
+    def test_storm(self):
+        """
+        Test a flood of calls keeps the handler within its limits.
+        """
+        events = load_fixture(FIXTURE)
+
+        reporter = TestReporter()
+        handler = BoundedEventHandler(reporter)
+        storm = [new_channel(number) for number in range(100, 200)]
+
+        with self.assertLogs('cacofonisk.handlers', 'WARNING'):
+            # The call in the fixture is evicted halfway through.
+            handler.on_events(events[:30] + storm + events[30:])
+
+        self.assertLessEqual(len(handler._channels), 4)
+        self.assertLessEqual(handler.active_call_count, 2)
+        self.assertEqual(99, handler.evicted['calls'])
+
+    def test_unbounded(self):
+        handler = EventHandler(TestReporter())
+        handler.on_events([new_channel(number) for number in range(10)])
+
+        self.assertEqual(10, handler.active_call_count)
+        self.assertEqual({}, handler.evicted)
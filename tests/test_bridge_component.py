@@ -0,0 +1,120 @@
+from unittest import TestCase
+
+from cacofonisk.bridge import Bridge
+from cacofonisk.channel import Channel
+from tests.replaytest import replay_fixtures
+from tests.test_channel import BRIDGECREATE, NEWCHANNEL
+
+
+def walk_bridge_peers(channel):
+    """
+    Find the non-Local bridge peers by walking bridges and local bridges.
+    """
+    peers = _walk_bridge(channel)
+
+    if channel.fwd_local_bridge:
+        peers.update(_walk_bridge(channel.fwd_local_bridge))
+
+    if channel.back_local_bridge:
+        peers.update(_walk_bridge(channel.back_local_bridge))
+
+    return peers
+
+
+def _walk_bridge(channel):
+    if not channel.bridge:
+        return set()
+
+    peers = set()
+
+    if not channel.is_local:
+        peers.add(channel)
+
+    for peer in channel.bridge.peers:
+        if peer == channel:
+            continue
+        elif not peer.is_local:
+            peers.add(peer)
+        elif peer.fwd_local_bridge:
+            peers.update(_walk_bridge(peer.fwd_local_bridge))
+        elif peer.back_local_bridge:
+            peers.update(_walk_bridge(peer.back_local_bridge))
+
+    return peers
+
+
+def make_channel(name, number):
+    uniqueid = '195176c06ab8-1529936170.{}'.format(number)
+    return Channel(dict(
+        NEWCHANNEL, Channel=name, Uniqueid=uniqueid, Linkedid=uniqueid))
+
+
+def make_bridge(number):
+    return Bridge(dict(
+        BRIDGECREATE,
+        BridgeUniqueid='{:08x}-0000-0000-0000-000000000000'.format(number)))
+
+
+class TestBridgeComponent(TestCase):
+
+    def test_matches_walk(self):
+        """
+        Test the bridge components match a walk after every event.
+        """
+        for filename, handler in replay_fixtures():
+            for channel in handler._channels.values():
+                self.assertEqual(
+                    walk_bridge_peers(channel),
+                    channel.get_bridge_peers_recursive(),
+                    '{} in {}'.format(channel, filename))
+
+    def test_local_chain(self):
+        """
+        Test a chain of Local channels is merged and split again.
+        """
+        a_chan = make_channel('SIP/150010001-00000001', 1)
+        b_chan = make_channel('SIP/150010002-00000002', 2)
+        locals_ = []
+        bridges = [make_bridge(number) for number in range(4)]
+
+        bridges[0].add_peer(a_chan)
+        bridges[-1].add_peer(b_chan)
+        self.assertIsNone(bridges[0].component)
+        self.assertEqual([a_chan], list(bridges[0].get_members()))
+
+        for number in range(3):
+            name = 'Local/ID{}@osvpi_route_phoneaccount-{:08x}'.format(
+                number, number)
+            local_one = make_channel(name + ';1', 10 + 2 * number)
+            local_two = make_channel(name + ';2', 11 + 2 * number)
+            local_one.fwd_local_bridge = local_two
+            local_two.back_local_bridge = local_one
+
+            bridges[number].add_peer(local_one)
+            bridges[number + 1].add_peer(local_two)
+            locals_.append((local_one, local_two))
+
+        self.assertEqual({a_chan, b_chan}, a_chan.get_bridge_peers_recursive())
+        self.assertIs(bridges[0].component, bridges[-1].component)
+        self.assertEqual(4, len(bridges[0].component.bridges))
+
+        # Break the chain in the middle.
+        bridges[2].remove_peer(locals_[1][1])
+
+        self.assertEqual({a_chan}, a_chan.get_bridge_peers_recursive())
+        self.assertEqual({b_chan}, b_chan.get_bridge_peers_recursive())
+        self.assertIs(bridges[0].component, bridges[1].component)
+        self.assertIs(bridges[2].component, bridges[3].component)
+        self.assertIsNot(bridges[1].component, bridges[2].component)
+
+        # Hang up the first Local semi, like the EventHandler would.
+        local_one, local_two = locals_[0]
+        bridges[0].remove_peer(local_one)
+        local_two.back_local_bridge = None
+
+        self.assertEqual({a_chan}, a_chan.get_bridge_peers_recursive())
+        self.assertEqual(set(), local_two.get_bridge_peers_recursive())
+
+        # Bridges which are no longer linked drop their component.
+        self.assertIsNone(bridges[0].component)
+        self.assertIsNone(bridges[1].component)
@@ -0,0 +1,71 @@
+import os
+from types import SimpleNamespace
+
+from cacofonisk import EventHandler
+from cacofonisk.call import Call
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture, replay_fixtures)
+
+AB_SUCCESS = os.path.join(FIXTURE_DIR, 'simple', 'ab_success_a_hangup.json')
+
+
+class TestCall(ChannelEventsTestCase):
+
+    def assertConsistent(self, handler):
+        """
+        Check the calls match a full scan of the channels.
+        """
+        linkedids = {}
+        for channel in handler._channels.values():
+            linkedids.setdefault(channel.linkedid, set()).add(channel)
+
+        self.assertEqual(len(linkedids), handler.active_call_count)
+
+        for linkedid, channels in linkedids.items():
+            call = handler.get_call(linkedid)
+            self.assertEqual(channels, set(call.channels.values()))
+            self.assertEqual(
+                {channel.bridge for channel in channels
+                 if channel.bridge is not None},
+                set(call.bridges))
+
+    def test_consistent(self):
+        for _, handler in replay_fixtures():
+            self.assertConsistent(handler)
+
+    def test_channels(self):
+        call = Call('1', 0)
+        a_chan = SimpleNamespace(uniqueid='1', bridge=None)
+        b_chan = SimpleNamespace(uniqueid='2', bridge='bridge')
+
+        call.add_channel(a_chan)
+        self.assertEqual({'1': a_chan}, call.channels)
+        self.assertEqual(set(), set(call.bridges))
+
+        call.add_channel(b_chan)
+        self.assertEqual({'1': a_chan, '2': b_chan}, call.channels)
+        self.assertEqual({'bridge'}, set(call.bridges))
+
+        call.remove_channel(a_chan)
+        call.remove_channel(b_chan)
+        self.assertEqual(0, len(call))
+        self.assertEqual({}, call.channels)
+        self.assertEqual(set(), set(call.bridges))
+
+    def test_lifetime(self):
+        handler = EventHandler(TestReporter())
+        events = load_fixture(AB_SUCCESS)
+        linkedid = '195176c06ab8-1529936170.42'
+
+        self.assertIsNone(handler.get_call(linkedid))
+
+        events[2]['Timestamp'] = '1529936170.421000'
+        handler.on_events(events[:3])
+        call = handler.get_call(linkedid)
+        self.assertEqual(1, handler.active_call_count)
+        self.assertEqual(1, len(call))
+        self.assertEqual(1529936170.421, call.start)
+
+        handler.on_events(events[3:])
+        self.assertIsNone(handler.get_call(linkedid))
+        self.assertEqual(0, handler.active_call_count)
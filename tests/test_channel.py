@@ -0,0 +1,157 @@
+from unittest import TestCase
+
+from cacofonisk.bridge import Bridge
+from cacofonisk.channel import Channel, SimpleChannel, parse_channel_name
+from tests.replaytest import replay_fixtures
+
+NEWCHANNEL = {
+    'Event': 'Newchannel',
+    'Channel': 'SIP/150010001-00000004',
+    'ChannelState': '0',
+    'CallerIDNum': '201',
+    'CallerIDName': 'Andrew Garza',
+    'ConnectedLineNum': '<unknown>',
+    'ConnectedLineName': '<unknown>',
+    'AccountCode': '15001',
+    'Exten': '202',
+    'Uniqueid': '195176c06ab8-1529936170.42',
+    'Linkedid': '195176c06ab8-1529936170.42',
+}
+
+BRIDGECREATE = {
+    'Event': 'BridgeCreate',
+    'BridgeUniqueid': '1dfbd4ab-45ad-4b22-a1d1-fd61fbf71e3b',
+    'BridgeType': 'basic',
+    'BridgeTechnology': 'simple_bridge',
+    'BridgeCreator': '<unknown>',
+    'BridgeVideoSourceMode': 'none',
+}
+
+
+class TaggedChannel(Channel):
+
+    def __init__(self, event):
+        super(TaggedChannel, self).__init__(event)
+        self.tag = 'vip'
+
+
+class TestSlots(TestCase):
+
+    def test_channel(self):
+        channel = Channel(NEWCHANNEL)
+
+        self.assertFalse(hasattr(channel, '__dict__'))
+        self.assertEqual('SIP/150010001-00000004', channel.name)
+
+        with self.assertRaises(AttributeError):
+            channel.tag = 'vip'
+
+    def test_custom(self):
+        """
+        Test the custom dict is only created when it is used.
+        """
+        channel = Channel(NEWCHANNEL)
+
+        self.assertIsNone(channel._custom)
+        self.assertEqual(0, channel.flags)
+
+        channel.custom['foo'] = 'bar'
+        self.assertEqual({'foo': 'bar'}, channel.custom)
+
+    def test_custom_untouched(self):
+        """
+        Test the handler keeps its own markers out of the custom dict.
+        """
+        for filename, handler in replay_fixtures():
+            for channel in handler._channels.values():
+                self.assertIsNone(channel._custom, filename)
+
+    def test_bridge(self):
+        bridge = Bridge(BRIDGECREATE)
+
+        self.assertFalse(hasattr(bridge, '__dict__'))
+        self.assertEqual(0, len(bridge))
+
+    def test_subclass(self):
+        """
+        Test subclasses can still add their own attributes.
+        """
+        channel = TaggedChannel(NEWCHANNEL)
+
+        self.assertEqual('vip', channel.tag)
+        self.assertEqual('202', channel.as_namedtuple().exten)
+
+
+class TestChannelName(TestCase):
+
+    def test_parse(self):
+        self.assertEqual(
+            ('SIP', '150010001', 0x1f, None),
+            parse_channel_name('SIP/150010001-0000001f'))
+        self.assertEqual(
+            ('SIP', 'voipgrid-siproute-docker', 0xa, None),
+            parse_channel_name('SIP/voipgrid-siproute-docker-0000000a'))
+        self.assertEqual(
+            ('Local', 'ID730151@osvpi_route_phoneaccount', 0x2b, 2),
+            parse_channel_name(
+                'Local/ID730151@osvpi_route_phoneaccount-0000002b;2'))
+        self.assertEqual(
+            ('Message', 'ast_msg_queue', None, None),
+            parse_channel_name('Message/ast_msg_queue'))
+        self.assertEqual(
+            ('SIP', 'my-face', None, None),
+            parse_channel_name('SIP/my-face'))
+        self.assertEqual(
+            ('SIP', 'my-face', 0xdeadbeef, None),
+            parse_channel_name('SIP/my-face-deadbeef'))
+
+    def test_channel(self):
+        channel = Channel(dict(
+            NEWCHANNEL, Channel='Local/201@osvpi_account-00000003;1'))
+
+        self.assertEqual('Local', channel.tech)
+        self.assertEqual('201@osvpi_account', channel.resource)
+        self.assertEqual(3, channel.sequence)
+        self.assertEqual(1, channel.local_semi)
+        self.assertTrue(channel.is_local)
+        self.assertFalse(Channel(NEWCHANNEL).is_local)
+
+
+class TestSnapshot(TestCase):
+
+    def test_reused(self):
+        channel = Channel(NEWCHANNEL)
+        snapshot = channel.as_namedtuple()
+
+        self.assertIs(snapshot, channel.as_namedtuple())
+
+        channel.bridge = None
+        channel.custom['foo'] = 'bar'
+        self.assertIs(snapshot, channel.as_namedtuple())
+
+    def test_invalidated(self):
+        channel = Channel(NEWCHANNEL)
+        snapshot = channel.as_namedtuple()
+
+        channel.state = 6
+        channel.exten = '203'
+        channel.caller_id = channel.caller_id.replace(num='204')
+
+        self.assertEqual(0, snapshot.state)
+        self.assertEqual(
+            (6, '203', '204'),
+            (channel.as_namedtuple().state, channel.as_namedtuple().exten,
+             channel.as_namedtuple().caller_id.num))
+
+    def test_fixtures(self):
+        """
+        Test the snapshots match the channels after every event.
+        """
+        for filename, handler in replay_fixtures():
+            for channel in handler._channels.values():
+                self.assertEqual(
+                    SimpleChannel(**{
+                        field: getattr(channel, field)
+                        for field in SimpleChannel._fields}),
+                    channel.as_namedtuple(),
+                    '{} in {}'.format(channel, filename))
@@ -0,0 +1,217 @@
+import glob
+import os
+from collections import Counter
+from unittest import mock
+
+from cacofonisk import EventHandler
+from cacofonisk.channel import MAX_TRAVERSAL_DEPTH, Channel
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase, TestReporter,
+                              load_fixture, replay_fixtures)
+from tests.test_channel import NEWCHANNEL
+
+# The fixtures with dials through Local channels.
+DIAL_FIXTURES = sorted(
+    glob.glob(os.path.join(FIXTURE_DIR, 'xfer_*', '*.json')) +
+    glob.glob(os.path.join(FIXTURE_DIR, 'originate', '*.json')))
+
+
+def walk_dialing_channel(channel):
+    """
+    Find the dialing channel without the cache.
+    """
+    if not channel.back_dial:
+        return channel
+
+    a_chan = channel.back_dial
+    if a_chan.back_local_bridge:
+        a_chan = a_chan.back_local_bridge
+
+    return walk_dialing_channel(a_chan)
+
+
+def walk_dialed_channels(channel):
+    """
+    Find the dialed channels by walking the dials and local bridges.
+    """
+    b_channels = set()
+
+    for b_chan in channel.fwd_dials:
+        if b_chan.fwd_local_bridge:
+            b_channels.update(walk_dialed_channels(b_chan.fwd_local_bridge))
+        else:
+            b_channels.add(b_chan)
+
+    return b_channels
+
+
+def make_channels(count, anomalies=None):
+    channels = []
+
+    for number in range(count):
+        uniqueid = '195176c06ab8-1529936170.{}'.format(number)
+        channels.append(Channel(dict(
+            NEWCHANNEL,
+            Channel='SIP/150010001-{:08x}'.format(number),
+            Uniqueid=uniqueid,
+        ), anomalies))
+
+    return channels
+
+
+class TestDialingChannel(ChannelEventsTestCase):
+
+    def test_matches_walk(self):
+        """
+        Test the cached dialing channel is right after every event.
+        """
+        for filename, handler in replay_fixtures(DIAL_FIXTURES):
+            for channel in handler._channels.values():
+                self.assertIs(
+                    walk_dialing_channel(channel),
+                    channel.get_dialing_channel(),
+                    '{} in {}'.format(channel, filename))
+
+    def test_same_reports(self):
+        """
+        Test the cache does not change what is reported.
+        """
+        for filename in DIAL_FIXTURES:
+            events = self.run_and_get_events(filename)
+
+            with mock.patch.object(
+                    Channel, 'get_dialing_channel', walk_dialing_channel):
+                expected = self.run_and_get_events(filename)
+
+            self.assertEqual(expected, events, filename)
+
+    def test_dialed_channels(self):
+        """
+        Test the maintained dialed channels match a walk after every event.
+        """
+        for filename, handler in replay_fixtures():
+            for channel in handler._channels.values():
+                self.assertEqual(
+                    walk_dialed_channels(channel),
+                    channel.get_dialed_channels(),
+                    '{} in {}'.format(channel, filename))
+
+    def test_dialed_channels_order(self):
+        """
+        Test the dialed channels are kept in the order they were dialed.
+        """
+        events = load_fixture(os.path.join(
+            FIXTURE_DIR, 'simple', 'ab_callgroup.json'))
+        handler = EventHandler(TestReporter())
+
+        # Stop after the second phone is dialed.
+        handler.on_events(events[:36])
+
+        a_chan = handler._channels['195176c06ab8-1529936598.168']
+        self.assertEqual(
+            ['SIP/150010003-0000000f', 'SIP/150010002-0000000e'],
+            [channel.name for channel in a_chan.dialed_channels])
+
+
+class TestAnomalies(ChannelEventsTestCase):
+
+    def test_dial_loop(self):
+        anomalies = Counter()
+        a_chan, b_chan, c_chan = make_channels(3, anomalies)
+
+        a_chan.add_dial(b_chan)
+        b_chan.add_dial(c_chan)
+        c_chan.add_dial(a_chan)
+
+        loops = anomalies['dial_loop']
+        self.assertIn(c_chan.get_dialing_channel(), (a_chan, b_chan, c_chan))
+        self.assertEqual(loops + 1, anomalies['dial_loop'])
+
+    def test_long_chain(self):
+        """
+        Test chains longer than the recursion limit do not blow up.
+        """
+        anomalies = Counter()
+        channels = make_channels(MAX_TRAVERSAL_DEPTH + 10, anomalies)
+        for a_chan, b_chan in zip(channels, channels[1:]):
+            a_chan.add_dial(b_chan)
+
+        depth = anomalies['dial_depth']
+        channels[-1].get_dialing_channel()
+        self.assertEqual(depth + 1, anomalies['dial_depth'])
+
+        # A chain up to the maximum depth is followed all the way.
+        channels = make_channels(MAX_TRAVERSAL_DEPTH, anomalies)
+        for a_chan, b_chan in zip(channels, channels[1:]):
+            a_chan.add_dial(b_chan)
+
+        self.assertIs(channels[0], channels[-1].get_dialing_channel())
+        self.assertEqual(depth + 1, anomalies['dial_depth'])
+
+    def test_double_dial(self):
+        """
+        Test a channel which is dialed twice is counted, not asserted.
+        """
+        events = load_fixture(os.path.join(
+            FIXTURE_DIR, 'simple', 'ab_success_a_hangup.json'))
+        index = next(index for index, event in enumerate(events)
+                     if event['Event'] == 'DialBegin')
+        events.insert(index, events[index])
+
+        reporter = TestReporter()
+        handler = EventHandler(reporter)
+        with self.assertLogs('cacofonisk.handlers', 'WARNING'):
+            handler.on_events(events)
+
+        self.assertEqual(Counter(double_dial=1), handler.anomalies)
+        self.assertEqual(
+            self.run_and_get_events(os.path.join(
+                FIXTURE_DIR, 'simple', 'ab_success_a_hangup.json')),
+            reporter.events)
+
+    def test_bridge_leave_unknown(self):
+        """
+        Test a channel which leaves a bridge it never entered is counted.
+        """
+        events = [
+            event for event in load_fixture(os.path.join(
+                FIXTURE_DIR, 'xfer_blonde', 'xfer_blonde_abbcac.json'))
+            if event['Event'] != 'BridgeEnter']
+
+        handler = EventHandler(TestReporter())
+        with self.assertLogs('cacofonisk.handlers', 'WARNING'):
+            handler.on_events(events)
+
+        self.assertEqual(
+            sum(event['Event'] == 'BridgeLeave' for event in events),
+            handler.anomalies['bridge_leave_unknown'])
+
+    def test_double_local_bridge(self):
+        """
+        Test a Local semi which is linked again drops its old link.
+        """
+        handler = EventHandler(TestReporter())
+        uniqueids = []
+
+        for number in range(3):
+            uniqueid = '195176c06ab8-1529936170.{}'.format(number)
+            handler.on_event(dict(
+                NEWCHANNEL, Uniqueid=uniqueid,
+                Channel='Local/ID{0}@osvpi_route_phoneaccount-{0:08x};{1}'
+                        .format(number, 1 if number == 0 else 2)))
+            uniqueids.append(uniqueid)
+
+        local_one, old_two, new_two = [
+            handler._channels[uniqueid] for uniqueid in uniqueids]
+
+        handler.on_event({
+            'Event': 'LocalBridge', 'LocalOneUniqueid': uniqueids[0],
+            'LocalTwoUniqueid': uniqueids[1]})
+        with self.assertLogs('cacofonisk.handlers', 'WARNING'):
+            handler.on_event({
+                'Event': 'LocalBridge', 'LocalOneUniqueid': uniqueids[0],
+                'LocalTwoUniqueid': uniqueids[2]})
+
+        self.assertEqual(Counter(double_local_bridge=1), handler.anomalies)
+        self.assertIs(new_two, local_one.fwd_local_bridge)
+        self.assertIs(local_one, new_two.back_local_bridge)
+        self.assertIsNone(old_two.back_local_bridge)
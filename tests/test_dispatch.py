@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from cacofonisk import EventHandler, handles
+from tests.replaytest import TestReporter
+
+
+class VarSetHandler(EventHandler):
+
+    def __init__(self, *args, **kwargs):
+        super(VarSetHandler, self).__init__(*args, **kwargs)
+        self.handled = []
+
+    @handles('VarSet', 'Newexten')
+    def _on_dialplan(self, event):
+        self.handled.append(event['Event'])
+
+    def _on_fully_booted(self, event):
+        self.handled.append('booted')
+
+
+class NoUserEventsHandler(EventHandler):
+
+    @classmethod
+    def event_handlers(cls):
+        handlers = super(NoUserEventsHandler, cls).event_handlers()
+        del handlers['UserEvent']
+        return handlers
+
+
+class TestDispatch(TestCase):
+
+    def test_event_handlers(self):
+        dispatch = EventHandler.get_dispatch()
+
+        self.assertEqual(EventHandler.event_handlers(), dict(dispatch))
+        self.assertIs(EventHandler._on_hangup, dispatch['Hangup'])
+        self.assertIs(dispatch, EventHandler.get_dispatch())
+
+    def test_subclass(self):
+        """
+        Test subclasses extend the dispatch table of their parents.
+        """
+        self.assertIn('VarSet', VarSetHandler.event_handlers())
+        self.assertIn('Newchannel', VarSetHandler.event_handlers())
+        self.assertNotIn('VarSet', EventHandler.event_handlers())
+
+        handler = VarSetHandler(TestReporter())
+        handler.on_event({'Event': 'FullyBooted'})
+        handler.on_event({'Event': 'VarSet', 'Variable': 'foo'})
+        handler.on_event({'Event': 'Newexten'})
+
+        self.assertEqual(['booted', 'VarSet', 'Newexten'], handler.handled)
+
+    def test_event_handlers_override(self):
+        dispatch = NoUserEventsHandler.get_dispatch()
+
+        self.assertNotIn('UserEvent', dispatch)
+        self.assertIn('Hangup', dispatch)
+        self.assertIn('UserEvent', EventHandler.get_dispatch())
+
+    def test_read_only(self):
+        with self.assertRaises(TypeError):
+            EventHandler.get_dispatch()['VarSet'] = None
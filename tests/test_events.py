@@ -0,0 +1,151 @@
+import os
+from unittest import TestCase
+
+from panoramisk.message import Message
+
+from cacofonisk import EventHandler
+from cacofonisk.events import (EVENT_CLASSES, Hangup, Newchannel, Newstate,
+                               UserEvent, is_event)
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture)
+
+AB_SUCCESS = os.path.join(FIXTURE_DIR, 'simple', 'ab_success_a_hangup.json')
+
+NEWSTATE = {
+    'Event': 'Newstate',
+    'Timestamp': '1529936170.420000',
+    'Uniqueid': '195176c06ab8-1529936170.42',
+    'ChannelState': '5',
+    'Language': 'en',
+}
+
+
+class RawEventReporter(TestReporter):
+
+    def __init__(self):
+        super(RawEventReporter, self).__init__()
+        self.raw_events = []
+        self.user_events = []
+
+    def on_event(self, event):
+        self.raw_events.append(event)
+
+    def on_user_event(self, caller, event):
+        self.user_events.append(event)
+
+
+class TestEvents(TestCase):
+
+    def test_event_classes(self):
+        """
+        Test there is an event class for every handled event.
+        """
+        self.assertEqual(
+            set(EventHandler.event_handlers()), set(EVENT_CLASSES))
+
+    def test_from_dict(self):
+        event = Newstate.from_dict(NEWSTATE)
+
+        self.assertEqual('195176c06ab8-1529936170.42', event.uniqueid)
+        self.assertEqual(5, event.channel_state)
+        self.assertEqual('1529936170.420000', event.timestamp)
+        self.assertFalse(hasattr(event, '__dict__'))
+        self.assertTrue(is_event(event))
+        self.assertFalse(is_event(NEWSTATE))
+
+    def test_mapping(self):
+        """
+        Test typed events can still be used like the raw event.
+        """
+        event = Newstate.from_dict(NEWSTATE)
+
+        self.assertEqual(NEWSTATE, dict(event))
+        self.assertEqual(NEWSTATE, event)
+        self.assertEqual(sorted(NEWSTATE), sorted(event))
+        self.assertEqual('5', event['ChannelState'])
+        self.assertEqual('Newstate', event['Event'])
+        self.assertIn('Language', event)
+        self.assertNotIn('Cause', event)
+        self.assertIsNone(event.get('Cause'))
+
+        with self.assertRaises(KeyError):
+            event['Cause']
+
+    def test_projected_fields(self):
+        event = Newstate.from_dict(NEWSTATE, fields=frozenset(('Event',)))
+
+        self.assertNotIn('Language', event)
+        self.assertEqual(5, event.channel_state)
+
+    def test_user_event(self):
+        """
+        Test UserEvents keep all fields, even when projecting.
+        """
+        raw = {'Event': 'UserEvent', 'Uniqueid': '1', 'Foo': 'bar'}
+        event = UserEvent.from_dict(raw, fields=frozenset())
+
+        self.assertEqual(raw, event)
+        self.assertEqual('1', event.uniqueid)
+
+    def test_missing_and_invalid_fields(self):
+        event = Hangup.from_dict({'Event': 'Hangup', 'Cause': 'unknown'})
+
+        self.assertIsNone(event.uniqueid)
+        self.assertEqual('unknown', event.cause)
+        self.assertEqual({'Event': 'Hangup', 'Cause': 'unknown'}, event)
+
+    def test_constructor(self):
+        event = Hangup(uniqueid='1', cause=16)
+        self.assertEqual({'Event': 'Hangup', 'Uniqueid': '1', 'Cause': '16'},
+                         event)
+
+        with self.assertRaises(TypeError):
+            Newchannel(cause=16)
+
+
+class TestEventHandler(ChannelEventsTestCase):
+
+    def test_raw_events(self):
+        """
+        Test reporters get the raw events, not the typed events.
+        """
+        events = load_fixture(AB_SUCCESS)
+        reporter = RawEventReporter()
+        EventHandler(reporter).on_events(events)
+
+        self.assertTrue(reporter.raw_events)
+        for event in reporter.raw_events:
+            self.assertIs(dict, type(event))
+            self.assertIn(event, events)
+
+    def test_panoramisk_message(self):
+        """
+        Test events from Panoramisk, which are not dicts, are converted too.
+        """
+        message = Message({
+            'Event': 'Newchannel', 'Channel': 'SIP/150010001-00000004',
+            'Uniqueid': '1', 'Linkedid': '1', 'ChannelState': '4',
+            'Exten': '203', 'AccountCode': '', 'CallerIDName': '',
+            'CallerIDNum': '201', 'ConnectedLineName': '',
+            'ConnectedLineNum': ''})
+        reporter = RawEventReporter()
+        handler = EventHandler(reporter)
+        handler.on_event(message)
+
+        self.assertIs(message, reporter.raw_events[0])
+        self.assertEqual('1', reporter.raw_events[0].uniqueid)
+        self.assertEqual(4, handler._channels['1'].state)
+
+    def test_raw_user_event(self):
+        """
+        Test on_user_event gets the raw UserEvent.
+        """
+        events = load_fixture(AB_SUCCESS)[:3]
+        user_event = {
+            'Event': 'UserEvent', 'UserEvent': 'Foo',
+            'Uniqueid': events[2]['Uniqueid'], 'Bar': 'baz'}
+        reporter = RawEventReporter()
+        EventHandler(reporter).on_events(events + [user_event])
+
+        self.assertEqual([user_event], reporter.user_events)
+        self.assertIs(user_event, reporter.user_events[0])
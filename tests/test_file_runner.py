@@ -0,0 +1,118 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from cacofonisk.runners import file_runner
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture)
+
+FIXTURE = os.path.join(FIXTURE_DIR, 'xfer_attended', 'xfer_abacbc.json')
+
+
+class TestFileRunner(ChannelEventsTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.events = load_fixture(FIXTURE)
+        self.expected = self.run_and_get_events(FIXTURE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_ndjson(self, filename):
+        path = os.path.join(self.tmpdir, filename)
+        with open(path, 'w') as f:
+            for event in self.events:
+                f.write(json.dumps(event) + '\n')
+        return path
+
+    def test_ndjson(self):
+        """
+        Test NDJSON files are replayed like the JSON list fixtures.
+        """
+        path = self.write_ndjson('replay.ndjson')
+        self.assertEqual(self.expected, self.run_and_get_events(path))
+
+    def test_ndjson_sniffed(self):
+        """
+        Test NDJSON is detected without a known file extension.
+        """
+        path = self.write_ndjson('replay.log')
+        self.assertEqual(self.expected, self.run_and_get_events(path))
+
+        # Lines cut off by the chunk which is sniffed.
+        with mock.patch.object(file_runner, 'CHUNK_SIZE', 7):
+            self.assertEqual(self.expected, self.run_and_get_events(path))
+
+    def test_json_array_single_line(self):
+        """
+        Test a JSON list on a single line is streamed, not read at once.
+        """
+        data = json.dumps(self.events).encode('utf-8')
+        raw = io.BytesIO(data)
+        runner = file_runner.FileRunner([], TestReporter())
+
+        with mock.patch.object(file_runner, 'CHUNK_SIZE', 1024), \
+                mock.patch.object(file_runner, 'open_event_log',
+                                  return_value=(raw, 'replay.log')):
+            events = runner._load_events_from_disk('replay.log')
+
+            self.assertEqual(self.events[0], next(events))
+            self.assertLess(raw.tell(), len(data))
+            self.assertEqual(self.events[1:], list(events))
+
+    def test_compressed(self):
+        """
+        Test compressed replay logs are decompressed based on the extension.
+        """
+        with open(FIXTURE, 'rb') as f:
+            data = f.read()
+
+        for extension, compress in (
+                ('.json.gz', gzip.compress),
+                ('.json.bz2', bz2.compress),
+                ('.json.xz', lzma.compress),
+        ):
+            path = os.path.join(self.tmpdir, 'replay' + extension)
+            with open(path, 'wb') as f:
+                f.write(compress(data))
+
+            self.assertEqual(
+                self.expected, self.run_and_get_events(path), extension)
+
+    def test_compressed_ndjson(self):
+        path = self.write_ndjson('replay.ndjson')
+        with open(path, 'rb') as f_in:
+            with gzip.open(path + '.gz', 'wb') as f_out:
+                f_out.write(f_in.read())
+
+        self.assertEqual(
+            self.expected, self.run_and_get_events(path + '.gz'))
+
+    def test_json_array_chunk_boundaries(self):
+        """
+        Test events cut off at chunk boundaries are decoded correctly.
+        """
+        with mock.patch.object(file_runner, 'CHUNK_SIZE', 7):
+            with open(FIXTURE) as f:
+                events = list(file_runner.iter_json_array(f))
+
+        self.assertEqual(self.events, events)
+
+    def test_json_array_empty(self):
+        self.assertEqual([], list(file_runner.iter_json_array(
+            io.StringIO(' [ ]\n'))))
+
+    def test_json_array_truncated(self):
+        f = io.StringIO('[{"Event": "FullyBooted"}, {"Event": "Full')
+        events = file_runner.iter_json_array(f)
+
+        self.assertEqual({'Event': 'FullyBooted'}, next(events))
+        with self.assertRaises(ValueError):
+            next(events)
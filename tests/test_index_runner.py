@@ -0,0 +1,207 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from cacofonisk.runners.index_runner import (INDEX_EXTENSION, EventIndex,
+                                             IndexedFileRunner,
+                                             IndexFileError)
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture)
+
+AB_SUCCESS = os.path.join(FIXTURE_DIR, 'simple', 'ab_success_a_hangup.json')
+AB_REJECT = os.path.join(FIXTURE_DIR, 'simple', 'ab_reject.json')
+XFER = os.path.join(FIXTURE_DIR, 'xfer_attended', 'xfer_abacbc.json')
+
+
+class TestIndexedFileRunner(ChannelEventsTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+        # A single log with three recordings, with a non-ASCII caller name
+        # to check byte offsets.
+        events = []
+        for filename in (AB_REJECT, XFER, AB_SUCCESS):
+            events.extend(load_fixture(filename))
+        for event in events:
+            if event.get('CallerIDName') == 'Andrew Garza':
+                event['CallerIDName'] = 'André Garza'
+        self.events = events
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_json(self, filename):
+        path = os.path.join(self.tmpdir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.events, f, indent=4, ensure_ascii=False)
+        return path
+
+    def write_ndjson(self, filename):
+        path = os.path.join(self.tmpdir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            for event in self.events:
+                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+        return path
+
+    def replay(self, path, linkedids):
+        reporter = TestReporter()
+        IndexedFileRunner(path, reporter, linkedids).run()
+        return reporter.events
+
+    def assertReplays(self, fixture, events):
+        """
+        Compare by channel names, the log has a different caller name.
+        """
+        expected = [
+            self._pluck_channel_name_from_event(event)
+            for event in self.run_and_get_events(fixture)]
+        self.assertEqualChannels(expected, events)
+
+    def test_build(self):
+        for path in (self.write_json('log.json'),
+                     self.write_ndjson('log.ndjson')):
+            index = EventIndex.build(path)
+            self.assertEqual(len(self.events), len(index))
+
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            for number, event in enumerate(self.events):
+                start = index.offsets[number]
+                end = start + index.lengths[number]
+                self.assertEqual(event, json.loads(data[start:end]))
+
+    def test_replay_single_call(self):
+        """
+        Test a single call from a larger log replays like its own fixture.
+        """
+        for path in (self.write_json('log.json'),
+                     self.write_ndjson('log.ndjson')):
+            events = self.replay(path, ['195176c06ab8-1529936170.42'])
+            self.assertReplays(AB_SUCCESS, events)
+            self.assertEqual(
+                'André Garza', events[0][1]['caller'].caller_id.name)
+
+    def test_replay_transfer(self):
+        """
+        Test the calls of a transfer can be replayed together.
+        """
+        path = self.write_ndjson('log.ndjson')
+
+        events = self.replay(path, [
+            '195176c06ab8-1529941216.590',
+            '195176c06ab8-1529941225.617',
+        ])
+
+        self.assertReplays(XFER, events)
+
+    def test_saved_index(self):
+        path = self.write_ndjson('log.ndjson')
+        EventIndex.build(path).save(path + INDEX_EXTENSION)
+
+        with EventIndex.load(path + INDEX_EXTENSION) as index:
+            self.assertEqual(
+                EventIndex.build(path).select(['195176c06ab8-1529936241.98']),
+                index.select(['195176c06ab8-1529936241.98']))
+
+        # The index file is unmapped when the index is closed.
+        with self.assertRaises(ValueError):
+            index.select(['195176c06ab8-1529936241.98'])
+
+        events = self.replay(path, ['195176c06ab8-1529936241.98'])
+        self.assertReplays(AB_REJECT, events)
+
+    def test_index_saved(self):
+        """
+        Test an index which was built on the fly is used the next time.
+        """
+        path = self.write_ndjson('log.ndjson')
+        self.replay(path, ['195176c06ab8-1529936241.98'])
+
+        self.assertTrue(os.path.exists(path + INDEX_EXTENSION))
+
+        with mock.patch.object(
+                EventIndex, 'build', side_effect=AssertionError):
+            events = self.replay(path, ['195176c06ab8-1529936241.98'])
+
+        self.assertReplays(AB_REJECT, events)
+
+    def test_rotated_log(self):
+        """
+        Test the index is rebuilt when the log is replaced.
+        """
+        path = self.write_ndjson('log.ndjson')
+        EventIndex.build(path).save(path + INDEX_EXTENSION)
+
+        self.events = load_fixture(AB_SUCCESS)
+        self.write_ndjson('log.ndjson')
+
+        with self.assertLogs('cacofonisk.runners.index_runner', 'WARNING'):
+            events = self.replay(path, ['195176c06ab8-1529936170.42'])
+
+        self.assertEqual(self.run_and_get_events(AB_SUCCESS), events)
+        with EventIndex.load(path + INDEX_EXTENSION, path) as index:
+            self.assertEqual(len(load_fixture(AB_SUCCESS)), len(index))
+
+    def test_replaced_same_size(self):
+        """
+        Test a log of the same size and time is not mistaken for the old.
+        """
+        path = self.write_ndjson('log.ndjson')
+        stat = os.stat(path)
+        EventIndex.build(path).save(path + INDEX_EXTENSION)
+
+        for event in self.events:
+            if event.get('CallerIDName') == 'André Garza':
+                event['CallerIDName'] = 'Andrés Garz'
+        self.write_ndjson('log.ndjson')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertEqual(stat.st_size, os.stat(path).st_size)
+        with self.assertRaises(IndexFileError):
+            EventIndex.load(path + INDEX_EXTENSION, path)
+
+    def test_invalid_index(self):
+        path = self.write_ndjson('log.ndjson')
+        EventIndex.build(path).save(path + INDEX_EXTENSION)
+
+        with open(path + INDEX_EXTENSION, 'r+b') as f:
+            f.truncate(200)
+
+        with self.assertRaises(IndexFileError):
+            EventIndex.load(path + INDEX_EXTENSION)
+
+        with self.assertLogs('cacofonisk.runners.index_runner', 'WARNING'):
+            events = self.replay(path, ['195176c06ab8-1529936241.98'])
+
+        self.assertReplays(AB_REJECT, events)
+
+    def test_non_ascii_ids(self):
+        """
+        Test non-ASCII ids are indexed, whether escaped in the JSON or not.
+        """
+        for event in self.events:
+            if event.get('Linkedid') == '195176c06ab8-1529936241.98':
+                event['Linkedid'] = 'café-☺'
+        expected = {
+            number for number, event in enumerate(self.events)
+            if event.get('Linkedid') == 'café-☺'}
+
+        for ensure_ascii in (True, False):
+            path = os.path.join(self.tmpdir, 'log.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.events, f, indent=4, ensure_ascii=ensure_ascii)
+
+            selected = EventIndex.build(path).select(['café-☺'])
+            self.assertLessEqual(expected, set(selected), ensure_ascii)
+
+    def test_unknown_call(self):
+        path = self.write_ndjson('log.ndjson')
+        self.assertEqual([], self.replay(path, ['no-such-linkedid']))
+
+    def test_compressed(self):
+        with self.assertRaises(ValueError):
+            EventIndex.build(os.path.join(self.tmpdir, 'log.json.gz'))
@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+from cacofonisk.callerid import CallerId
+from cacofonisk.channel import Channel
+from cacofonisk.utils.interning import Interner
+from tests.test_channel import NEWCHANNEL
+
+
+class TestInterner(TestCase):
+
+    def test_shared(self):
+        intern = Interner(4)
+        first = intern(''.join(['15', '001']))
+
+        self.assertIs(first, intern(''.join(['15', '001'])))
+        self.assertIsNone(intern(None))
+        self.assertEqual(1, len(intern))
+
+    def test_evict_least_recently_used(self):
+        intern = Interner(2)
+        first = intern(''.join(['2', '01']))
+        intern('202')
+        intern(''.join(['2', '01']))
+        intern('203')
+
+        # 202 was forgotten, 201 was used more recently.
+        self.assertEqual(2, len(intern))
+        self.assertIs(first, intern(''.join(['2', '01'])))
+
+        second = ''.join(['2', '02'])
+        self.assertIs(second, intern(second))
+
+    def test_clear(self):
+        intern = Interner(2)
+        intern('201')
+        intern.clear()
+
+        self.assertEqual(0, len(intern))
+
+
+class TestSharedValues(TestCase):
+
+    def test_caller_id(self):
+        caller_id = CallerId('Andrew Garza', '201')
+
+        self.assertIs(caller_id, CallerId('Andrew Garza', '201'))
+        self.assertIs(
+            caller_id, CallerId('Andrew Garza', '202').replace(num='201'))
+
+    def test_channel(self):
+        a_chan = Channel(NEWCHANNEL)
+        b_chan = Channel(dict(
+            NEWCHANNEL,
+            Channel='SIP/150010002-00000005',
+            Uniqueid='195176c06ab8-1529936170.43',
+            Exten=''.join(['20', '2']),
+            AccountCode=''.join(['150', '01'])))
+
+        self.assertIs(a_chan.caller_id, b_chan.caller_id)
+        self.assertIs(a_chan.linkedid, b_chan.linkedid)
+        self.assertIs(a_chan.exten, b_chan.exten)
+        self.assertIs(a_chan.account_code, b_chan.account_code)
+
+        b_chan.exten = ''.join(['20', '3'])
+        a_chan.exten = ''.join(['20', '3'])
+        self.assertIs(a_chan.exten, b_chan.exten)
@@ -0,0 +1,96 @@
+import os
+
+from cacofonisk import EventHandler
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture)
+
+FIXTURE = os.path.join(FIXTURE_DIR, 'xfer_attended', 'xfer_abacbc.json')
+
+NOISE = {'Event': 'VarSet', 'Variable': 'foo', 'Value': 'bar'}
+
+
+class OrderReporter(TestReporter):
+    """
+    A TestReporter which records the raw events in between the hooks.
+    """
+
+    def on_event(self, event):
+        self.events.append(('on_event', event['Event']))
+
+
+class BatchReporter(TestReporter):
+    BATCH_EVENTS = True
+
+    def __init__(self):
+        super(BatchReporter, self).__init__()
+        self.batches = []
+
+    def on_event(self, event):
+        raise AssertionError('Batch reporters get on_events()')
+
+    def on_events(self, events):
+        self.batches.append(events)
+
+
+class OnEventHandler(EventHandler):
+
+    def __init__(self, *args, **kwargs):
+        super(OnEventHandler, self).__init__(*args, **kwargs)
+        self.names = []
+
+    def on_event(self, event):
+        self.names.append(event['Event'])
+        super(OnEventHandler, self).on_event(event)
+
+
+class AllEventsHandler(EventHandler):
+    FILTER_EVENTS = False
+
+
+class TestOnEvents(ChannelEventsTestCase):
+
+    def test_same_as_on_event(self):
+        """
+        Test a batch gives the same reporter calls as single events.
+        """
+        events = load_fixture(FIXTURE)
+
+        expected = OrderReporter()
+        handler = EventHandler(expected)
+        for event in events:
+            handler.on_event(event)
+
+        reporter = OrderReporter()
+        EventHandler(reporter).on_events(iter(events + [NOISE]))
+
+        self.assertEqual(expected.events, reporter.events)
+
+    def test_batch_reporter(self):
+        events = load_fixture(FIXTURE)
+
+        reporter = BatchReporter()
+        handler = EventHandler(reporter)
+        handler.on_events(events + [NOISE])
+        handler.on_event(events[0])
+
+        self.assertEqual([len(events), 1], [
+            len(batch) for batch in reporter.batches])
+        self.assertEqual(events, reporter.batches[0])
+        self.assertEqual(self.run_and_get_events(FIXTURE), reporter.events)
+
+    def test_on_event_override(self):
+        """
+        Test subclasses which override on_event get every handled event.
+        """
+        events = load_fixture(FIXTURE)
+
+        handler = OnEventHandler(TestReporter())
+        handler.on_events(events + [NOISE])
+
+        self.assertEqual([event['Event'] for event in events], handler.names)
+
+    def test_no_filter(self):
+        reporter = OrderReporter()
+        AllEventsHandler(reporter).on_events([NOISE])
+
+        self.assertEqual([('on_event', 'VarSet')], reporter.events)
@@ -0,0 +1,60 @@
+from cacofonisk import EventHandler
+from tests.replaytest import FIXTURES, ChannelEventsTestCase, TestReporter
+
+
+class ProjectingTestReporter(TestReporter):
+    """
+    A TestReporter which only needs the Channel field of Hangup events.
+    """
+    EVENT_FIELDS = {'Hangup': ('Channel',)}
+
+    def __init__(self):
+        super(ProjectingTestReporter, self).__init__()
+        self.raw_events = []
+
+    def on_event(self, event):
+        self.raw_events.append(event)
+
+
+class TestProjection(ChannelEventsTestCase):
+
+    def test_same_events(self):
+        """
+        Test projected events result in the same reporter calls.
+        """
+        for filename in FIXTURES:
+            expected = self.run_and_get_events(filename)
+            events = self.run_and_get_events(
+                filename, ProjectingTestReporter())
+            self.assertEqual(expected, events, filename)
+
+    def test_projected_fields(self):
+        reporter = ProjectingTestReporter()
+        self.run_and_get_events(
+            'fixtures/simple/ab_success_a_hangup.json', reporter)
+
+        event_fields = EventHandler.event_fields()
+
+        for event in reporter.raw_events:
+            allowed = set(event_fields[event['Event']])
+            allowed.update(('Event', 'Timestamp'))
+            if event['Event'] == 'Hangup':
+                allowed.add('Channel')
+                self.assertIn('Channel', event)
+
+            self.assertLessEqual(set(event), allowed)
+
+    def test_no_projection(self):
+        """
+        Test events are left alone if the reporter needs all fields.
+        """
+        handler = EventHandler(TestReporter())
+        event = {'Event': 'Newstate', 'Uniqueid': '1', 'Language': 'en'}
+
+        self.assertIs(event, handler.project(event))
+
+    def test_user_event(self):
+        handler = EventHandler(ProjectingTestReporter())
+        event = {'Event': 'UserEvent', 'Uniqueid': '1', 'Foo': 'bar'}
+
+        self.assertIs(event, handler.project(event))
@@ -0,0 +1,74 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from cacofonisk.runners.ami_protocol import encode_message
+from cacofonisk.runners.raw_runner import RawAmiFileRunner, iter_ami_text
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture)
+
+FIXTURE = os.path.join(FIXTURE_DIR, 'xfer_blind', 'xfer_blind_abbcac.json')
+
+
+class TestRawAmiFileRunner(ChannelEventsTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+        self.events = load_fixture(FIXTURE)
+
+        # A capture has the banner and responses to actions in between
+        # the events.
+        messages = [
+            {'Response': 'Success', 'ActionID': '1',
+             'Message': 'Authentication accepted'},
+        ] + self.events[:10] + [
+            {'Event': 'CoreShowChannel', 'ActionID': '2',
+             'Channel': 'SIP/150010001-00000004'},
+            {'Response': 'Follows', 'ActionID': '3'},
+        ] + self.events[10:]
+
+        self.capture = b'Asterisk Call Manager/5.0.1\r\n' + b''.join(
+            encode_message(message) for message in messages)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, filename, data):
+        path = os.path.join(self.tmpdir, filename)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def replay(self, path):
+        reporter = TestReporter()
+        RawAmiFileRunner(path, reporter).run()
+        return reporter.events
+
+    def test_iter_ami_text(self):
+        lines = self.capture.decode('utf-8').splitlines(keepends=True)
+        self.assertEqual(self.events, list(iter_ami_text(lines)))
+
+    def test_no_trailing_empty_line(self):
+        lines = ['Event: FullyBooted\n', 'Status: Fully Booted\n']
+        self.assertEqual(
+            [{'Event': 'FullyBooted', 'Status': 'Fully Booted'}],
+            list(iter_ami_text(lines)))
+
+    def test_replay(self):
+        """
+        Test a raw capture replays like the JSON fixture.
+        """
+        expected = self.run_and_get_events(FIXTURE)
+
+        path = self.write('capture.txt', self.capture)
+        self.assertEqual(expected, self.replay(path))
+
+        # Captures may have lost their carriage returns.
+        path = self.write(
+            'capture-lf.txt', self.capture.replace(b'\r\n', b'\n'))
+        self.assertEqual(expected, self.replay(path))
+
+        path = self.write('capture.txt.gz', gzip.compress(self.capture))
+        self.assertEqual(expected, self.replay(path))
@@ -0,0 +1,78 @@
+import os
+
+from cacofonisk import EventHandler
+from tests.replaytest import (FIXTURE_DIR, ChannelEventsTestCase,
+                              TestReporter, load_fixture)
+from tests.test_channel import NEWCHANNEL
+
+FIXTURE = os.path.join(FIXTURE_DIR, 'simple', 'ab_success_a_hangup.json')
+
+START = 1529936170.0
+
+
+class ReapingEventHandler(EventHandler):
+    REAP_AFTER = 60
+
+
+def load_events():
+    """
+    Load a call which loses its last events, with a second between events.
+    """
+    events = load_fixture(FIXTURE)
+
+    for number, event in enumerate(events):
+        event['Timestamp'] = '{:.6f}'.format(START + number)
+
+    # Lose everything after the Local channels hung up.
+    return events[:42]
+
+
+def new_channel(timestamp):
+    return dict(
+        NEWCHANNEL,
+        Timestamp='{:.6f}'.format(timestamp),
+        Channel='SIP/150010003-00000006',
+        Uniqueid='195176c06ab8-1529936270.50',
+        Linkedid='195176c06ab8-1529936270.50')
+
+
+class TestReaper(ChannelEventsTestCase):
+
+    def test_reap(self):
+        reporter = TestReporter()
+        handler = ReapingEventHandler(reporter)
+        handler.on_events(load_events())
+        reported = list(reporter.events)
+
+        self.assertEqual(2, len(handler._channels))
+        self.assertEqual(1, len(handler._bridges))
+
+        with self.assertLogs('cacofonisk.handlers', 'WARNING'):
+            handler.on_events([new_channel(START + 200)])
+
+        self.assertEqual({'channels': 2, 'bridges': 1}, handler.reaped)
+        self.assertEqual(
+            ['195176c06ab8-1529936270.50'], list(handler._channels))
+        self.assertEqual(0, len(handler._bridges))
+        self.assertEqual(1, handler.active_call_count)
+        self.assertEqual(reported, reporter.events)
+
+    def test_keep_active(self):
+        handler = ReapingEventHandler(TestReporter())
+        events = load_events()
+        handler.on_events(events)
+
+        # The caller changes its CallerID much later.
+        event = dict(events[4], Timestamp='{:.6f}'.format(START + 90))
+        handler.on_events([event, new_channel(START + 120)])
+
+        self.assertEqual({'channels': 1}, handler.reaped)
+        self.assertIn(events[2]['Uniqueid'], handler._channels)
+        self.assertEqual(1, len(handler._bridges))
+
+    def test_disabled(self):
+        handler = EventHandler(TestReporter())
+        handler.on_events(load_events() + [new_channel(START + 100000)])
+
+        self.assertEqual(3, len(handler._channels))
+        self.assertEqual({}, handler.reaped)
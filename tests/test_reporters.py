@@ -1,7 +1,8 @@
+import datetime
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from cacofonisk import BaseReporter
+from cacofonisk import BaseReporter, EventHandler
 from cacofonisk.callerid import CallerId
 from cacofonisk.channel import SimpleChannel
 from cacofonisk.reporters import MultiReporter
@@ -49,6 +50,37 @@ class MultiReporterTestCase(TestCase):
             uniqueid='195176c06ab8-1529936170.50',
         )
 
+    def test_event_fields(self):
+        self.mock_reporter.EVENT_FIELDS = None
+        self.assertIsNone(self.multi_reporter.EVENT_FIELDS)
+
+        first = BaseReporter()
+        first.EVENT_FIELDS = {'Hangup': ('Channel',), 'Newstate': None}
+        second = BaseReporter()
+        second.EVENT_FIELDS = {'Hangup': ('Exten',), 'Newstate': ('Exten',)}
+
+        self.assertEqual(
+            {'Hangup': ('Channel', 'Exten'), 'Newstate': None},
+            MultiReporter([first, second]).EVENT_FIELDS)
+
+    def test_set_event_timestamp(self):
+        self.multi_reporter.set_event_timestamp('1529936170.42')
+        self.mock_reporter.set_event_timestamp.assert_called_once_with(
+            '1529936170.42')
+
+        self.mock_reporter.USES_TIMESTAMP = False
+        self.assertFalse(self.multi_reporter.USES_TIMESTAMP)
+
+    def test_set_event_timestamp_fallback(self):
+        """
+        Test reporters without set_event_timestamp get set_timestamp.
+        """
+        reporter = MagicMock(spec=['on_event', 'set_timestamp', 'close'])
+        MultiReporter([reporter]).set_event_timestamp('1529936170.42')
+
+        reporter.set_timestamp.assert_called_once_with(datetime.datetime(
+            2018, 6, 25, 14, 16, 10, 420000, tzinfo=datetime.timezone.utc))
+
     def test_close(self):
         self.multi_reporter.close()
         self.mock_reporter.close.assert_called_once_with()
@@ -58,6 +90,26 @@ class MultiReporterTestCase(TestCase):
         self.multi_reporter.on_event(event_dict)
         self.mock_reporter.on_event.assert_called_once_with(event_dict)
 
+    def test_plain_reporter(self):
+        """
+        Test reporters with only the hooks they use work as children.
+        """
+        reporter = MagicMock(spec=['on_event', 'set_timestamp', 'close'])
+        multi_reporter = MultiReporter([reporter])
+
+        self.assertIsNone(multi_reporter.EVENT_FIELDS)
+        self.assertTrue(multi_reporter.USES_TIMESTAMP)
+
+        event_dict = {'Linkedid': '195176c06ab8-1529936170.42'}
+        multi_reporter.on_event(event_dict)
+        reporter.on_event.assert_called_once_with(event_dict)
+
+    def test_on_event_batch_reporter(self):
+        self.mock_reporter.BATCH_EVENTS = True
+        event_dict = {'Linkedid': '195176c06ab8-1529936170.42'}
+        self.multi_reporter.on_event(event_dict)
+        self.mock_reporter.on_events.assert_called_once_with([event_dict])
+
     def test_on_user_event(self):
         event_dict = {'Linkedid': '195176c06ab8-1529936170.42'}
         self.multi_reporter.on_user_event(self.a_party, event_dict)
@@ -97,3 +149,68 @@ class MultiReporterTestCase(TestCase):
         self.multi_reporter.on_hangup(self.a_party, 'busy')
         self.mock_reporter.on_hangup.assert_called_once_with(
             self.a_party, 'busy')
+
+
+class EagerReporter(BaseReporter):
+
+    def __init__(self):
+        self.timestamps = []
+
+    def set_timestamp(self, timestamp):
+        super(EagerReporter, self).set_timestamp(timestamp)
+        self.timestamps.append(timestamp)
+
+
+class TimestampTestCase(TestCase):
+
+    EVENT = {'Event': 'FullyBooted', 'Timestamp': '1529936170.420000'}
+    EXPECTED = datetime.datetime(
+        2018, 6, 25, 14, 16, 10, 420000, tzinfo=datetime.timezone.utc)
+
+    def test_lazy(self):
+        reporter = BaseReporter()
+
+        with patch('cacofonisk.reporters.datetime_from_timestamp') as convert:
+            EventHandler(reporter).on_event(self.EVENT)
+            convert.assert_not_called()
+
+        self.assertEqual(self.EXPECTED, reporter.timestamp)
+
+    def test_override(self):
+        """
+        Test reporters which override set_timestamp get a datetime.
+        """
+        reporter = EagerReporter()
+        EventHandler(reporter).on_event(self.EVENT)
+
+        self.assertEqual([self.EXPECTED], reporter.timestamps)
+
+    def test_timestamp_from_event(self):
+        """
+        Test an overridden timestamp_from_event is still used.
+        """
+        class LocalTimeEventHandler(EventHandler):
+            def timestamp_from_event(self, event):
+                return datetime.datetime(2018, 6, 25, 16, 16, 10)
+
+        reporter = BaseReporter()
+        LocalTimeEventHandler(reporter).on_event(self.EVENT)
+
+        self.assertEqual(
+            datetime.datetime(2018, 6, 25, 16, 16, 10), reporter.timestamp)
+
+    def test_no_timestamp(self):
+        reporter = BaseReporter()
+        EventHandler(reporter).on_event({'Event': 'FullyBooted'})
+
+        self.assertLess(
+            datetime.datetime.now(datetime.timezone.utc) - reporter.timestamp,
+            datetime.timedelta(seconds=10))
+
+    def test_opt_out(self):
+        reporter = EagerReporter()
+        reporter.USES_TIMESTAMP = False
+        EventHandler(reporter).on_event(self.EVENT)
+
+        self.assertEqual([], reporter.timestamps)
+        self.assertIsNone(reporter.timestamp)
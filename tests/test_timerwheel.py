@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from cacofonisk.utils.timerwheel import TimerWheel
+
+
+class TestTimerWheel(TestCase):
+
+    def test_expire(self):
+        wheel = TimerWheel(60, resolution=1)
+        wheel.expire(1000)
+        wheel.touch('a', 1000)
+        wheel.touch('b', 1010)
+
+        self.assertEqual([], wheel.expire(1059))
+        self.assertEqual(['a'], wheel.expire(1060))
+        self.assertEqual([], wheel.expire(1065))
+        self.assertEqual(['b'], wheel.expire(1070))
+        self.assertEqual(0, len(wheel))
+
+    def test_touch(self):
+        wheel = TimerWheel(60, resolution=1)
+        wheel.expire(1000)
+        wheel.touch('a', 1000)
+        wheel.touch('a', 1030)
+
+        self.assertEqual([], wheel.expire(1060))
+        self.assertIn('a', wheel)
+        self.assertEqual(['a'], wheel.expire(1090))
+
+    def test_discard(self):
+        wheel = TimerWheel(60)
+        wheel.expire(1000)
+        wheel.touch('a', 1000)
+        wheel.discard('a')
+
+        self.assertEqual([], wheel.expire(2000))
+
+    def test_jump(self):
+        """
+        Test keys expire after a jump of many turns of the wheel.
+        """
+        wheel = TimerWheel(60, resolution=1)
+        wheel.expire(1000)
+        for number in range(100):
+            wheel.touch(number, 1000 + number)
+
+        self.assertEqual(list(range(100)), sorted(wheel.expire(100000)))
+
+    def test_clear(self):
+        wheel = TimerWheel(60)
+        wheel.touch('a', 1000)
+        wheel.clear()
+
+        self.assertEqual(0, len(wheel))
+        self.assertEqual([], wheel.expire(2000))